@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+from main import (
+    create_flight_api,
+    get_hedge_proxy,
+    report_results,
+    run_cent_per_mile_analysis_with_flight_api,
+)
+from scraperninja.batch.batch_runner import BatchRunner
+from scraperninja.batch.job_journal import JobJournal
+from scraperninja.batch.job_scheduler import (
+    FifoJobScheduler,
+    PriorityJobScheduler,
+    RouteCppHistory,
+)
+from scraperninja.model.batch_job import BatchJob
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.model.proxy_settings import proxySettings
+from scraperninja.profiling import profiled_run
+from scraperninja.scraper.flight_search import (
+    BrowserMemoryBudget,
+    CoalescingFlightSearchResponseApi,
+    HedgedFlightSearchResponseApi,
+    RecyclingFlightSearchResponseApi,
+)
+from scraperninja.scraper.proxy_manager import NoProxyAvailableError, ProxyManager
+from scraperninja.scraper.slice_store import SliceStore
+
+
+def load_jobs(jobs_file_path: str) -> List[BatchJob]:
+    jobs: Dict[str, BatchJob] = {}
+    with open(jobs_file_path) as jobs_file:
+        for line in jobs_file:
+            if not line.strip():
+                continue
+            job = BatchJob.from_json_line(line)
+            if job.job_id in jobs:
+                # Same id, same report and journal entry: run it once
+                logging.warning(f"Skipping duplicate job {job.job_id}")
+                continue
+            jobs[job.job_id] = job
+    return list(jobs.values())
+
+
+def mib_to_bytes(mib: Optional[int]) -> Optional[int]:
+    return None if mib is None else mib * 2**20
+
+
+async def run_batch(
+    jobs: List[BatchJob],
+    args: argparse.Namespace,
+    proxy_manager: ProxyManager,
+    journal: JobJournal,
+):
+    # Every job runs its Revenue and Award searches in parallel tabs
+    max_tabs = args.concurrency * 2
+    memory_budget = BrowserMemoryBudget(mib_to_bytes(args.max_host_memory_mb))
+    # Shared by every engine so a slice repeated across jobs is parsed once
+    slice_store = SliceStore(archive_dir=args.slice_archive_dir)
+    slice_store.index_archive()
+
+    def create_recycling_flight_api(
+        use_camoufox_browser: bool,
+        exclude_proxies: Callable[[], List[Optional[str]]] = list,
+    ) -> RecyclingFlightSearchResponseApi:
+        # Each browser runs on the proxy the manager hands out at its launch, a
+        # failed search blocks it and moves the next searches to another proxy
+        return RecyclingFlightSearchResponseApi(
+            lambda proxy_url: create_flight_api(
+                use_camoufox_browser,
+                proxy_url,
+                max_tabs,
+                use_http_engine=args.use_http_engine,
+                slice_store=slice_store,
+                chrome_server=args.chrome_server,
+                camoufox_server=args.camoufox_server,
+            ),
+            max_searches=args.recycle_after_searches,
+            max_rss_bytes=mib_to_bytes(args.max_browser_memory_mb),
+            memory_budget=memory_budget,
+            proxy_manager=proxy_manager,
+            exclude_proxies=exclude_proxies,
+        )
+
+    engine = create_recycling_flight_api(args.use_camoufox_browser)
+    if args.hedge:
+        try:
+            # Only hedge when the hedge can get a proxy or an engine of its own
+            get_hedge_proxy(
+                proxy_manager, proxy_manager.get_proxy(), args.hedge_with_other_engine
+            )
+        except NoProxyAvailableError as e:
+            logging.warning(f"Not hedging: {e}")
+        else:
+            primary_engine = engine
+            hedge_engine = create_recycling_flight_api(
+                args.use_camoufox_browser != args.hedge_with_other_engine,
+                exclude_proxies=lambda: [primary_engine.proxy_url],
+            )
+            # Hedge below the coalescing layer so a hedged search is shared as well
+            engine = HedgedFlightSearchResponseApi(primary_engine, [hedge_engine])
+
+    def write_job_results(job: BatchJob, flight_records: List[FlightRecord]):
+        report_results(
+            job.params,
+            flight_records,
+            output_file_path=os.path.join(args.output_dir, f"{job.job_id}.json"),
+        )
+
+    scheduler = (
+        PriorityJobScheduler(
+            RouteCppHistory.from_reports(args.cpp_history_dir or args.output_dir)
+        )
+        if args.prioritize
+        else FifoJobScheduler()
+    )
+
+    async with CoalescingFlightSearchResponseApi(engine) as flight_api:
+        runner = BatchRunner(
+            flight_api,
+            run_cent_per_mile_analysis_with_flight_api,
+            concurrency=args.concurrency,
+            journal=journal,
+            scheduler=scheduler,
+            job_deadline_seconds=args.deadline_seconds,
+        )
+        await runner.run(jobs, on_result=write_job_results)
+
+    logging.info(
+        f"Batch finished: {len(jobs) - len(runner.failed_job_ids)} succeeded, "
+        f"{len(runner.failed_job_ids)} failed {runner.failed_job_ids}, "
+        f"{flight_api.searches_started} browser searches, "
+        f"{flight_api.searches_coalesced} coalesced, "
+        f"{slice_store.misses} slices parsed, {slice_store.hits} reused"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run many cent per mile analyses sharing one browser"
+    )
+    parser.add_argument(
+        "--jobs-file",
+        "-j",
+        required=True,
+        help="JSON lines file, one analysis per line with the main.py parameters "
+        '(e.g. {"origin": "LAX", "destination": "JFK", "date": "2025-12-15"}) '
+        "and an optional job_id, which defaults to the route, date and a digest of "
+        "the searched parameters",
+    )
+    parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="Directory receiving one <job_id>.json report per job",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Job journal recording every job state change and its results "
+        "(default: <output-dir>/journal.jsonl)",
+    )
+    parser.add_argument(
+        "--resume",
+        default=False,
+        action="store_true",
+        help="Continue the run recorded in the journal: skip done jobs and run the "
+        "pending, interrupted and failed ones again",
+    )
+    parser.add_argument(
+        "--prioritize",
+        default=False,
+        action="store_true",
+        help="Run near departures and routes with a high past CPP first, with aging "
+        "so no job starves and a penalty on routes already running",
+    )
+    parser.add_argument(
+        "--cpp-history-dir",
+        help="Directory of past reports ranking the routes for --prioritize "
+        "(default: --output-dir)",
+    )
+    parser.add_argument(
+        "--slice-archive-dir",
+        help="Archive every distinct slice payload once, across runs, named by its "
+        "slice hash and pricing fingerprint, keeping the most recent 200k",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-k",
+        type=int,
+        default=2,
+        help="Number of jobs running at the same time (default: 2)",
+    )
+    parser.add_argument(
+        "--deadline-seconds",
+        type=float,
+        help="Wall time budget of each job, including retries: every search and "
+        "backoff is cut short so the job ends within it",
+    )
+    parser.add_argument(
+        "--debug",
+        default=False,
+        action="store_true",
+        help="Verbose debug output",
+    )
+    parser.add_argument(
+        "--use-camoufox-browser",
+        default=False,
+        action="store_true",
+        help="Use CamouFox browser for scraping",
+    )
+    parser.add_argument(
+        "--chrome-server",
+        metavar="HOST:PORT",
+        help="Open fresh contexts on a running browser_server.py chrome server "
+        "instead of launching Chrome",
+    )
+    parser.add_argument(
+        "--camoufox-server",
+        metavar="WS_ENDPOINT",
+        help="Open fresh contexts on a running browser_server.py camoufox server "
+        "instead of launching CamouFox",
+    )
+    parser.add_argument(
+        "--use-http-engine",
+        default=False,
+        action="store_true",
+        help="Call the itinerary api over http with the cookies of a warmed up "
+        "browser, falling back to the browser when blocked",
+    )
+    parser.add_argument(
+        "--hedge",
+        default=False,
+        action="store_true",
+        help="Start a duplicate search on a second browser and proxy when a search "
+        "is slower than the 95th percentile of recent searches, first result wins",
+    )
+    parser.add_argument(
+        "--hedge-with-other-engine",
+        default=False,
+        action="store_true",
+        help="Run the --hedge duplicate search on the other browser engine",
+    )
+    parser.add_argument(
+        "--recycle-after-searches",
+        type=int,
+        default=200,
+        help="Relaunch a browser after this many searches (default: 200)",
+    )
+    parser.add_argument(
+        "--max-browser-memory-mb",
+        type=int,
+        help="Relaunch a browser once its processes use this much memory, only for "
+        "browsers launched by the batch, not those of a browser server",
+    )
+    parser.add_argument(
+        "--max-host-memory-mb",
+        type=int,
+        help="Delay browser launches while the host has this much memory in use, "
+        "browser servers included",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FOLDED_STACKS_PATH",
+        help="Sample the CPU and write folded stacks for flamegraph.pl or speedscope",
+    )
+    parser.add_argument(
+        "--trace-malloc",
+        metavar="REPORT_PATH",
+        help="Trace allocations and write the top allocations of each phase "
+        "(parse, merge)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    proxy_manager = ProxyManager(proxySettings.proxy_urls_list)
+    journal_path = args.journal or os.path.join(args.output_dir, "journal.jsonl")
+    with (
+        JobJournal(journal_path, resume=args.resume) as journal,
+        profiled_run(args.profile, args.trace_malloc),
+    ):
+        jobs = load_jobs(args.jobs_file)
+        remaining_jobs = [job for job in jobs if not journal.is_done(job.job_id)]
+        if args.resume:
+            logging.info(
+                f"Resuming {journal_path}: {len(jobs) - len(remaining_jobs)} jobs "
+                f"already done, {len(remaining_jobs)} to run"
+            )
+        asyncio.run(run_batch(remaining_jobs, args, proxy_manager, journal))
@@ -0,0 +1,126 @@
+"""
+Memory-per-search and throughput of K concurrent searches run as tabs of one
+browser versus one browser per search. Needs real browsers and network access.
+
+Usage: uv run python -m benchmarks.browser_pool_benchmark -o LAX -d JFK \
+    --date 2025-12-15 -k 4 [--use-camoufox-browser]
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from datetime import date, timedelta
+from typing import Callable, List
+
+from scraperninja.constants import BASE_AMERICAN_AIRLINES_URL
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+)
+from scraperninja.scraper.flight_search import (
+    BaseFlightSearchResponseApi,
+    CamouFoxBrowserNetworkFlightSearchResponseApi,
+    ChromeBrowserNetworkFlightSearchResponseApi,
+)
+from scraperninja.scraper.process_memory import children_rss_bytes
+
+RSS_SAMPLE_INTERVAL_SECONDS = 0.25
+
+
+def search_urls(origin: str, destination: str, start: str, count: int) -> List[str]:
+    # Distinct dates so no search is served from an engine cache
+    first_date = date.fromisoformat(start)
+    return [
+        FlightSearchRequest(
+            orig=origin,
+            dest=destination,
+            date=(first_date + timedelta(days=i)).isoformat(),
+            adult=1,
+            search_type=PaymentType.REVENUE,
+        ).to_url(f"{BASE_AMERICAN_AIRLINES_URL}/booking/search")
+        for i in range(count)
+    ]
+
+
+async def sample_peak_rss(stop: asyncio.Event) -> int:
+    peak = 0
+    while not stop.is_set():
+        peak = max(peak, children_rss_bytes())
+        await asyncio.sleep(RSS_SAMPLE_INTERVAL_SECONDS)
+    return peak
+
+
+async def run_searches(
+    engines: List[BaseFlightSearchResponseApi], urls: List[str]
+) -> None:
+    await asyncio.gather(
+        *(
+            engines[i % len(engines)].search_flight_details(url, direct_only=False)
+            for i, url in enumerate(urls)
+        )
+    )
+
+
+async def measure(
+    name: str,
+    engine_factory: Callable[[], BaseFlightSearchResponseApi],
+    engine_count: int,
+    urls: List[str],
+) -> None:
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_peak_rss(stop))
+    start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        engines = [
+            await stack.enter_async_context(engine_factory())
+            for _ in range(engine_count)
+        ]
+        searches_start = time.perf_counter()
+        await run_searches(engines, urls)
+        searches_elapsed = time.perf_counter() - searches_start
+    elapsed = time.perf_counter() - start
+    stop.set()
+    peak_rss = await sampler
+
+    print(
+        f"{name:<18} {len(urls)} searches | searches {searches_elapsed:>6.1f}s | "
+        f"incl. launch {elapsed:>6.1f}s | "
+        f"{len(urls) * 60 / elapsed:>5.1f} searches/min | "
+        f"peak browser RSS {peak_rss / 2**20:>7,.0f} MiB "
+        f"({peak_rss / len(urls) / 2**20:,.0f} MiB/search)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--origin", required=True)
+    parser.add_argument("-d", "--destination", required=True)
+    parser.add_argument("--date", required=True)
+    parser.add_argument("-k", "--concurrency", type=int, default=4)
+    parser.add_argument("--use-camoufox-browser", action="store_true")
+    args = parser.parse_args()
+
+    engine_cls = (
+        CamouFoxBrowserNetworkFlightSearchResponseApi
+        if args.use_camoufox_browser
+        else ChromeBrowserNetworkFlightSearchResponseApi
+    )
+    urls = search_urls(args.origin, args.destination, args.date, args.concurrency)
+
+    asyncio.run(
+        measure(
+            "tab pool",
+            lambda: engine_cls(max_tabs=args.concurrency),
+            engine_count=1,
+            urls=urls,
+        )
+    )
+    asyncio.run(
+        measure(
+            "browser per search",
+            lambda: engine_cls(max_tabs=1),
+            engine_count=args.concurrency,
+            urls=urls,
+        )
+    )
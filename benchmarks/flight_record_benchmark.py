@@ -0,0 +1,94 @@
+"""
+Memory / throughput comparison between the pydantic FlightTimingAndPrices model
+and the slotted FlightRecord for a batch of merged flight results.
+
+Usage: uv run python -m benchmarks.flight_record_benchmark [-n 100000]
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.domain.flight import (
+    FlightCashPrice,
+    FlightMilesPrice,
+    FlightTiming,
+    FlightTimingAndPrices,
+)
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.model.money import Money
+
+Parts = Tuple[FlightTiming, FlightCashPrice, FlightMilesPrice]
+
+
+def build_parts(count: int) -> List[Parts]:
+    departure = datetime(2025, 12, 15, 6, 0)
+    return [
+        (
+            FlightTiming(
+                flight_number=f"AA{i}",
+                departure_time=departure + timedelta(minutes=i % 1440),
+                arrival_time=departure + timedelta(minutes=i % 1440 + 330),
+            ),
+            FlightCashPrice(price=Money(amount=199.0 + i % 500, currency="USD")),
+            FlightMilesPrice(
+                points_required=12_500 + i % 50_000,
+                tax=Money(amount=5.6, currency="USD"),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def build_pydantic(parts: List[Parts]) -> list:
+    return [
+        FlightTimingAndPrices.model_validate(
+            {
+                **timing.model_dump(),
+                **cash.model_dump(),
+                **miles.model_dump(),
+            }
+        )
+        for timing, cash, miles in parts
+    ]
+
+
+def build_records(parts: List[Parts]) -> list:
+    return [
+        FlightRecord.from_parts(timing, cash, miles, product_type=ProductType.COACH)
+        for timing, cash, miles in parts
+    ]
+
+
+def measure(name: str, build: Callable[[List[Parts]], list], parts: List[Parts]):
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = build(parts)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for result in results:
+        result.to_report()
+    report_elapsed = time.perf_counter() - start
+
+    count = len(parts)
+    print(
+        f"{name:<22} build {count / elapsed:>12,.0f} rec/s | "
+        f"report {count / report_elapsed:>12,.0f} rec/s | "
+        f"retained {retained / count:>7,.0f} B/rec | peak {peak / 2**20:>8,.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    parts = build_parts(args.count)
+    measure("FlightTimingAndPrices", build_pydantic, parts)
+    measure("FlightRecord", build_records, parts)
@@ -0,0 +1,150 @@
+"""
+Throughput of the http engine versus the browser engines against a local stand-in
+for the AA booking site. The stand-in serves a search page whose script posts to
+the itinerary api, which answers with the recorded fixture after
+--server-latency-ms. The http engine still launches a browser to harvest a
+session, that launch is not part of the measured searches.
+
+Usage: uv run python -m benchmarks.http_engine_benchmark -n 40 -k 4 \
+    [--engines http chrome camoufox]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+)
+from scraperninja.scraper.flight_search import (
+    BaseFlightSearchResponseApi,
+    CamouFoxBrowserNetworkFlightSearchResponseApi,
+    ChromeBrowserNetworkFlightSearchResponseApi,
+    HttpFlightSearchResponseApi,
+)
+
+FIXTURE_PATH = (
+    Path(__file__).parent.parent / "tests" / "fixtures" / "itinerary_response.json"
+)
+SEARCH_PAGE = """<html><body><div class="hero"></div><script>
+fetch("/booking/api/search/itinerary", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({search: location.search}),
+});
+</script></body></html>"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    itinerary_body = FIXTURE_PATH.read_bytes()
+    latency_seconds = 0.0
+
+    def do_GET(self):
+        self.__respond("text/html", SEARCH_PAGE.encode())
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency_seconds)
+        self.__respond("application/json", self.itinerary_body)
+
+    def __respond(self, content_type: str, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(latency_seconds: float) -> str:
+    StandInHandler.latency_seconds = latency_seconds
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def search_urls(base_url: str, count: int) -> List[str]:
+    # Distinct dates so no search is served from an engine cache
+    return [
+        FlightSearchRequest(
+            orig="LAX",
+            dest="JFK",
+            date=(date(2025, 12, 15) + timedelta(days=i)).isoformat(),
+            adult=1,
+            search_type=PaymentType.REVENUE,
+        ).to_url(f"{base_url}/booking/search")
+        for i in range(count)
+    ]
+
+
+async def measure(
+    name: str,
+    engine: BaseFlightSearchResponseApi,
+    urls: List[str],
+    concurrency: int,
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(url: str):
+        async with semaphore:
+            return await engine.search_flight_details(url, direct_only=False)
+
+    async with engine:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(search(url) for url in urls))
+        elapsed = time.perf_counter() - start
+
+    assert all(results), f"{name} returned an empty search"
+    print(
+        f"{name:<10} {len(urls)} searches in {elapsed:>6.2f}s | "
+        f"{len(urls) / elapsed:>7.1f} searches/s | "
+        f"{elapsed / len(urls) * 1000 * concurrency:>7.0f} ms average latency"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--searches", type=int, default=40)
+    parser.add_argument("-k", "--concurrency", type=int, default=4)
+    parser.add_argument("--server-latency-ms", type=int, default=200)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=["http", "chrome", "camoufox"],
+        default=["http", "chrome", "camoufox"],
+    )
+    args = parser.parse_args()
+
+    base_url = start_stand_in_server(args.server_latency_ms / 1000)
+    itinerary_url = f"{base_url}/booking/api/search/itinerary"
+    engine_factories: Dict[str, Callable[[], BaseFlightSearchResponseApi]] = {
+        "http": lambda: HttpFlightSearchResponseApi(
+            ChromeBrowserNetworkFlightSearchResponseApi(),
+            max_connections=args.concurrency,
+            itinerary_url=itinerary_url,
+        ),
+        "chrome": lambda: ChromeBrowserNetworkFlightSearchResponseApi(
+            max_tabs=args.concurrency, itinerary_url=itinerary_url
+        ),
+        "camoufox": lambda: CamouFoxBrowserNetworkFlightSearchResponseApi(
+            max_tabs=args.concurrency, itinerary_url=itinerary_url
+        ),
+    }
+
+    for engine_name in args.engines:
+        asyncio.run(
+            measure(
+                engine_name,
+                engine_factories[engine_name](),
+                search_urls(base_url, args.searches),
+                args.concurrency,
+            )
+        )
@@ -0,0 +1,446 @@
+"""
+Offline load test of the job scheduling, retry and proxy logic against simulated
+engines. Latency, launch time, block probability (per proxy and per request rate
+on a proxy) and payload size are drawn from the production stats in --stats (see
+ProductionStats for the format and its defaults). The event loop runs on virtual
+time, so thousands of jobs simulate in seconds.
+
+Modes:
+  cli    every job is one main.py run: proxies from a shared ProxyManager,
+         retries and per-proxy sessions of run_cent_per_mile_analysis_with_retries
+  batch  one batch.py run: BatchRunner over a coalescing, recycling engine
+
+Usage: uv run python -m benchmarks.load_simulation -n 2000 -k 8 \
+    [--mode cli batch] [--proxies 4] [--routes 3] [--prioritize] \
+    [--stats stats.json]
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import math
+import random
+import selectors
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from main import (
+    run_cent_per_mile_analysis_with_flight_api,
+    run_cent_per_mile_analysis_with_retries,
+)
+from scraperninja.batch.batch_runner import BatchRunner
+from scraperninja.batch.job_scheduler import (
+    FifoJobScheduler,
+    PriorityJobScheduler,
+    job_route,
+)
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.batch_job import BatchJob
+from scraperninja.scraper.flight_search import (
+    BaseFlightSearchResponseApi,
+    CoalescingFlightSearchResponseApi,
+    RecyclingFlightSearchResponseApi,
+)
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    filter_direct_flights,
+    parse_itinerary_response,
+)
+from scraperninja.scraper.proxy_manager import ProxyManager
+from scraperninja.scraper.slice_store import SliceStore
+
+FIXTURE_PATH = (
+    Path(__file__).parent.parent / "tests" / "fixtures" / "itinerary_response.json"
+)
+AIRPORTS = ["LAX", "JFK", "SFO", "ORD", "DFW", "MIA", "SEA", "BOS", "PHX", "CLT"]
+
+
+class ProductionStats(BaseModel):
+    """
+    Recorded production numbers driving the simulated engines. The defaults are
+    placeholders in the range seen on the live site, replace them with the
+    numbers of real runs. Latencies are drawn from the recorded samples when
+    given, from a log-normal distribution otherwise.
+    """
+
+    search_latency_samples_seconds: List[float] = []
+    search_latency_median_seconds: float = 4.0
+    search_latency_sigma: float = 0.5
+    launch_median_seconds: float = 6.0
+    launch_sigma: float = 0.3
+    block_probability: float = 0.02
+    proxy_block_probability: Dict[str, float] = {}
+    block_probability_per_request_per_minute: float = 0.002
+    slices_per_response: List[int] = [40, 60, 80]
+
+
+class VirtualTimeSelector(selectors.DefaultSelector):
+    """Jumps the clock to the next timer instead of waiting for it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None:
+            return super().select(None)
+        events = super().select(0)
+        if not events:
+            self.now += timeout
+        return events
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self) -> None:
+        self.virtual_time_selector = VirtualTimeSelector()
+        super().__init__(self.virtual_time_selector)
+
+    def time(self) -> float:
+        return self.virtual_time_selector.now
+
+
+@dataclass
+class ProxyUsage:
+    searches: int = 0
+    blocked: int = 0
+    busy_seconds: float = 0.0
+    recent_searches: Deque[float] = field(default_factory=deque)
+
+
+@dataclass
+class SimulationStats:
+    launches: int = 0
+    wasted_launches: int = 0
+    search_latencies: List[float] = field(default_factory=list)
+    job_latencies: List[float] = field(default_factory=list)
+    # Batch mode: from the start of the run until a worker picks the job up
+    queue_waits: List[float] = field(default_factory=list)
+    max_running_per_route: int = 0
+    failed_jobs: int = 0
+    proxy_usage: Dict[Optional[str], ProxyUsage] = field(
+        default_factory=lambda: defaultdict(ProxyUsage)
+    )
+
+
+class SimulatedFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Stand-in browser engine: launches and searches take simulated time, and a
+    search is blocked with the probability of its proxy at its current request
+    rate. Unblocked searches return the fixture slice repeated to the drawn
+    payload size, parsed through the shared slice store like the real engines.
+    """
+
+    template_slice = json.loads(FIXTURE_PATH.read_text())["slices"][0]
+
+    def __init__(
+        self,
+        proxy_url: Optional[str],
+        production_stats: ProductionStats,
+        simulation_stats: SimulationStats,
+        rng: random.Random,
+        slice_store: SliceStore,
+    ) -> None:
+        self.proxy_url = proxy_url
+        self.production_stats = production_stats
+        self.simulation_stats = simulation_stats
+        self.rng = rng
+        self.slice_store = slice_store
+        self.searches_served = 0
+
+    async def __aenter__(self):
+        self.simulation_stats.launches += 1
+        await asyncio.sleep(
+            self.rng.lognormvariate(
+                math.log(self.production_stats.launch_median_seconds),
+                self.production_stats.launch_sigma,
+            )
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.searches_served == 0:
+            self.simulation_stats.wasted_launches += 1
+        return False
+
+    def block_probability(self, usage: ProxyUsage) -> float:
+        now = asyncio.get_running_loop().time()
+        while usage.recent_searches and usage.recent_searches[0] < now - 60:
+            usage.recent_searches.popleft()
+        usage.recent_searches.append(now)
+        proxy_key = str(self.proxy_url)
+        return min(
+            1.0,
+            self.production_stats.proxy_block_probability.get(
+                proxy_key, self.production_stats.block_probability
+            )
+            + self.production_stats.block_probability_per_request_per_minute
+            * len(usage.recent_searches),
+        )
+
+    def search_latency(self) -> float:
+        if self.production_stats.search_latency_samples_seconds:
+            return self.rng.choice(self.production_stats.search_latency_samples_seconds)
+        return self.rng.lognormvariate(
+            math.log(self.production_stats.search_latency_median_seconds),
+            self.production_stats.search_latency_sigma,
+        )
+
+    async def search_flight_details(
+        self,
+        search_url: str,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        usage = self.simulation_stats.proxy_usage[self.proxy_url]
+        usage.searches += 1
+        blocked = self.rng.random() < self.block_probability(usage)
+        latency = self.search_latency()
+        await asyncio.sleep(latency)
+        usage.busy_seconds += latency
+        self.simulation_stats.search_latencies.append(latency)
+        if blocked:
+            usage.blocked += 1
+            raise ValueError(f"No itinerary response captured for {search_url}")
+
+        self.searches_served += 1
+        slice_count = self.rng.choice(self.production_stats.slices_per_response)
+        payload = {"slices": []}
+        for index in range(slice_count):
+            # Distinct flights, shared across searches so the store parses each once
+            simulated_slice = copy.copy(self.template_slice)
+            simulated_slice["hash"] = f"simulated-{index}"
+            payload["slices"].append(simulated_slice)
+        flights = parse_itinerary_response(payload, self.slice_store)
+        return filter_direct_flights(flights, direct_only)
+
+
+def simulated_jobs(
+    count: int, rng: random.Random, today: date, route_count: Optional[int] = None
+) -> List[BatchJob]:
+    routes = [(a, b) for a in AIRPORTS for b in AIRPORTS if a != b][:route_count]
+    jobs = []
+    for index in range(count):
+        origin, destination = rng.choice(routes)
+        departure = today + timedelta(days=rng.randint(1, 90))
+        jobs.append(
+            BatchJob(
+                job_id=f"job-{index}",
+                params=AnalysisParams(
+                    origin=origin,
+                    destination=destination,
+                    date=departure.isoformat(),
+                ),
+            )
+        )
+    return jobs
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    sorted_values = sorted(values)
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+async def simulate_cli_runs(
+    jobs: List[BatchJob],
+    args: argparse.Namespace,
+    proxy_manager: ProxyManager,
+    engine_factory,
+    simulation_stats: SimulationStats,
+):
+    loop = asyncio.get_running_loop()
+    running = asyncio.Semaphore(args.concurrency)
+
+    async def run(job: BatchJob):
+        async with running:
+            start = loop.time()
+            try:
+                await run_cent_per_mile_analysis_with_retries(
+                    job.params,
+                    proxy_manager,
+                    session_factory=lambda _, proxy_url: engine_factory(proxy_url),
+                )
+            except Exception:
+                simulation_stats.failed_jobs += 1
+                return
+            simulation_stats.job_latencies.append(loop.time() - start)
+
+    await asyncio.gather(*(run(job) for job in jobs))
+
+
+async def simulate_batch_run(
+    jobs: List[BatchJob],
+    args: argparse.Namespace,
+    proxy_manager: ProxyManager,
+    engine_factory,
+    simulation_stats: SimulationStats,
+    today: date,
+):
+    loop = asyncio.get_running_loop()
+    engine = RecyclingFlightSearchResponseApi(
+        engine_factory,
+        max_searches=args.recycle_after_searches,
+        proxy_manager=proxy_manager,
+    )
+    scheduler = (
+        PriorityJobScheduler(today=today, clock=loop.time)
+        if args.prioritize
+        else FifoJobScheduler()
+    )
+    started_at: Dict[str, float] = {}
+    running_by_route: Counter = Counter()
+    run_start = loop.time()
+    next_job, job_finished = scheduler.next_job, scheduler.job_finished
+
+    def timed_next_job() -> Optional[BatchJob]:
+        # Counted from the first attempt, retries and backoff included
+        job = next_job()
+        if job is not None:
+            started_at[job.job_id] = loop.time()
+            simulation_stats.queue_waits.append(loop.time() - run_start)
+            route = job_route(job)
+            running_by_route[route] += 1
+            simulation_stats.max_running_per_route = max(
+                simulation_stats.max_running_per_route, running_by_route[route]
+            )
+        return job
+
+    def counted_job_finished(job: BatchJob):
+        running_by_route[job_route(job)] -= 1
+        job_finished(job)
+
+    scheduler.next_job = timed_next_job
+    scheduler.job_finished = counted_job_finished
+
+    def on_result(job: BatchJob, _):
+        simulation_stats.job_latencies.append(loop.time() - started_at[job.job_id])
+
+    async with CoalescingFlightSearchResponseApi(engine) as flight_api:
+        runner = BatchRunner(
+            flight_api,
+            run_cent_per_mile_analysis_with_flight_api,
+            concurrency=args.concurrency,
+            scheduler=scheduler,
+        )
+        await runner.run(jobs, on_result=on_result)
+    simulation_stats.failed_jobs = len(runner.failed_job_ids)
+
+
+def report(
+    mode: str,
+    job_count: int,
+    simulation_stats: SimulationStats,
+    virtual_seconds: float,
+    wall_seconds: float,
+):
+    done = job_count - simulation_stats.failed_jobs
+    searches = sum(usage.searches for usage in simulation_stats.proxy_usage.values())
+    blocked = sum(usage.blocked for usage in simulation_stats.proxy_usage.values())
+    print(
+        f"{mode:<6} {job_count} jobs: {done} done, {simulation_stats.failed_jobs} "
+        f"failed | {virtual_seconds / 3600:.2f}h simulated in {wall_seconds:.1f}s | "
+        f"{done * 3600 / virtual_seconds:,.0f} jobs/h"
+    )
+    print(
+        f"       job latency p50 {percentile(simulation_stats.job_latencies, 0.5):.1f}s"
+        f" p99 {percentile(simulation_stats.job_latencies, 0.99):.1f}s | "
+        f"search latency p50 "
+        f"{percentile(simulation_stats.search_latencies, 0.5):.1f}s p99 "
+        f"{percentile(simulation_stats.search_latencies, 0.99):.1f}s"
+    )
+    print(
+        f"       {searches} searches, {blocked} blocked "
+        f"({blocked / max(searches, 1):.1%}) | {simulation_stats.launches} browser "
+        f"launches, {simulation_stats.wasted_launches} wasted (no successful search)"
+    )
+    if simulation_stats.queue_waits:
+        # Shows the aging (max wait) and the running route penalty at work
+        print(
+            f"       queue wait p50 "
+            f"{percentile(simulation_stats.queue_waits, 0.5):.1f}s max "
+            f"{max(simulation_stats.queue_waits):.1f}s | at most "
+            f"{simulation_stats.max_running_per_route} jobs of one route at once"
+        )
+    for proxy_url, usage in sorted(
+        simulation_stats.proxy_usage.items(), key=lambda item: str(item[0])
+    ):
+        print(
+            f"       proxy {str(proxy_url):<10} {usage.searches:>6} searches, "
+            f"{usage.blocked:>5} blocked, "
+            f"{usage.busy_seconds / virtual_seconds:.2f} searches in flight on average"
+        )
+
+
+def simulate(mode: str, args: argparse.Namespace, production_stats: ProductionStats):
+    rng = random.Random(args.seed)
+    today = date(2025, 12, 1)
+    jobs = simulated_jobs(args.jobs, rng, today, args.routes)
+    simulation_stats = SimulationStats()
+    slice_store = SliceStore()
+
+    def engine_factory(proxy_url: Optional[str]) -> SimulatedFlightSearchResponseApi:
+        return SimulatedFlightSearchResponseApi(
+            proxy_url, production_stats, simulation_stats, rng, slice_store
+        )
+
+    async def run() -> float:
+        loop = asyncio.get_running_loop()
+        epoch = datetime(2025, 12, 1)
+        proxy_manager = ProxyManager(
+            [f"proxy-{index}" for index in range(1, args.proxies + 1)],
+            clock=lambda: epoch + timedelta(seconds=loop.time()),
+        )
+        if mode == "cli":
+            await simulate_cli_runs(
+                jobs, args, proxy_manager, engine_factory, simulation_stats
+            )
+        else:
+            await simulate_batch_run(
+                jobs, args, proxy_manager, engine_factory, simulation_stats, today
+            )
+        return loop.time()
+
+    wall_start = datetime.now()
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        virtual_seconds = runner.run(run())
+    wall_seconds = (datetime.now() - wall_start).total_seconds()
+    report(mode, len(jobs), simulation_stats, virtual_seconds, wall_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-n", "--jobs", type=int, default=2000)
+    parser.add_argument("-k", "--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--mode", nargs="+", choices=["cli", "batch"], default=["cli", "batch"]
+    )
+    parser.add_argument("--proxies", type=int, default=4)
+    parser.add_argument(
+        "--routes", type=int, help="Draw the jobs from this many routes (default: 90)"
+    )
+    parser.add_argument("--prioritize", action="store_true")
+    parser.add_argument("--recycle-after-searches", type=int, default=200)
+    parser.add_argument("--stats", help="ProductionStats JSON file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    # Every failed attempt logs an error, thousands of them at this scale
+    if not args.debug:
+        logging.disable(logging.CRITICAL)
+    production_stats = (
+        ProductionStats.model_validate_json(Path(args.stats).read_text())
+        if args.stats
+        else ProductionStats()
+    )
+    for mode in args.mode:
+        simulate(mode, args, production_stats)
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import logging
+
+from camoufox.server import launch_server
+from selenium_driverless import webdriver
+
+from scraperninja.scraper.flight_search import (
+    ChromeBrowserNetworkFlightSearchResponseApi,
+)
+
+
+async def serve_chrome(port: int):
+    options = ChromeBrowserNetworkFlightSearchResponseApi.browser_options()
+    options.add_argument(f"--remote-debugging-port={port}")
+    async with webdriver.Chrome(options=options):
+        logging.info(
+            f"Chrome server ready, attach with --chrome-server 127.0.0.1:{port}"
+        )
+        # Serve until interrupted, engines open and dispose of their own contexts
+        await asyncio.Event().wait()
+
+
+def serve_camoufox(port: int, ws_path: str):
+    logging.info(
+        f"Starting Camoufox server, attach with "
+        f"--camoufox-server ws://localhost:{port}/{ws_path}"
+    )
+    # Same fingerprint options as CamouFoxBrowserNetworkFlightSearchResponseApi.
+    # geoip follows the proxy, which is set per context, so it is left off
+    launch_server(
+        port=port,
+        ws_path=ws_path,
+        humanize=True,
+        headless=False,
+        i_know_what_im_doing=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a long-lived browser that main.py and batch.py attach to "
+        "instead of launching their own"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["chrome", "camoufox"],
+        default="chrome",
+        help="Browser to serve (default: chrome)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="Port to listen on (default: 9222 for chrome, 9223 for camoufox)",
+    )
+    parser.add_argument(
+        "--ws-path",
+        default="camoufox",
+        help="Websocket path of the camoufox server (default: camoufox)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.engine == "chrome":
+        try:
+            asyncio.run(serve_chrome(args.port or 9222))
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve_camoufox(args.port or 9223, args.ws_path)
@@ -2,126 +2,275 @@ import argparse
 import asyncio
 import json
 import logging
-from typing import List, Optional
+from functools import partial
+from typing import Callable, List, Optional
 
-from tenacity import Retrying, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
 
+from scraperninja.batch.batch_runner import AnalysisFunction
 from scraperninja.model.analysis_params import AnalysisParams
 from scraperninja.model.api.flight_search_request import (
-    FlightSearchRequest,
     PaymentType,
+    SliceRequest,
 )
-from scraperninja.model.domain.flight import FlightTimingAndPrices
+from scraperninja.model.domain.flight_record import FlightRecord
 from scraperninja.model.proxy_settings import proxySettings
+from scraperninja.profiling import profile_phase, profiled_run
 from scraperninja.scraper.american_airline_flight_scraper import (
     AmericanAirlineFlightScraper,
 )
+from scraperninja.scraper.date_sweep import DateSweep, DateSweepResult
+from scraperninja.scraper.deadline import Deadline, DeadlineExceededError
 from scraperninja.scraper.flight_search import (
+    BaseFlightSearchResponseApi,
     CamouFoxBrowserNetworkFlightSearchResponseApi,
     ChromeBrowserNetworkFlightSearchResponseApi,
+    HedgedFlightSearchResponseApi,
+    HttpFlightSearchResponseApi,
+    ProxySessionCache,
 )
-from scraperninja.scraper.proxy_manager import ProxyManager
+from scraperninja.scraper.proxy_manager import NoProxyAvailableError, ProxyManager
+from scraperninja.scraper.slice_store import SliceStore
 
 
 async def run_cent_per_mile_analysis_with_retries(
     params: AnalysisParams,
     proxy_manager: ProxyManager,
+    analyze: Optional[AnalysisFunction] = None,
+    deadline: Optional[Deadline] = None,
+    session_factory: Optional[
+        Callable[[bool, Optional[str]], BaseFlightSearchResponseApi]
+    ] = None,
 ):
+    stop = stop_after_attempt(3)
+    if deadline:
+        # No backoff that would end past the deadline
+        stop = stop | deadline.stop_retrying
+
+    # Shared by every session, retries and hedges reuse the slices already parsed
+    slice_store = SliceStore(archive_dir=params.slice_archive_dir)
+    slice_store.index_archive()
+
+    def create_session(use_camoufox_browser: bool, proxy_url: Optional[str]):
+        # One tab for the Revenue search and one for the Award search
+        return create_flight_api(
+            use_camoufox_browser,
+            proxy_url,
+            max_tabs=2,
+            use_http_engine=params.use_http_engine,
+            slice_store=slice_store,
+            chrome_server=params.chrome_server,
+            camoufox_server=params.camoufox_server,
+        )
+
+    session_factory = session_factory or create_session
+    # A retry through a proxy that is still healthy reuses its warmed browser
+    sessions = ProxySessionCache(
+        partial(session_factory, params.use_camoufox_browser), proxy_manager
+    )
+    hedge_sessions = (
+        ProxySessionCache(
+            partial(session_factory, not params.use_camoufox_browser), proxy_manager
+        )
+        if params.hedge_with_other_engine
+        else sessions
+    )
+    # One wrapper for the whole run so the hedge delay learns from every attempt
+    hedged_flight_api: Optional[HedgedFlightSearchResponseApi] = None
+
+    async def analyze_through(
+        proxy_url: Optional[str], hedge_proxy_urls: List[Optional[str]]
+    ):
+        nonlocal hedged_flight_api
+        flight_api = await sessions.get(proxy_url)
+        if hedge_proxy_urls:
+            # Not entered, the sessions are opened and closed by their caches
+            hedges = [await hedge_sessions.get(url) for url in hedge_proxy_urls]
+            if hedged_flight_api is None:
+                hedged_flight_api = HedgedFlightSearchResponseApi(flight_api, hedges)
+            flight_api = hedged_flight_api.use_sessions(flight_api, hedges)
+        return await (analyze or run_cent_per_mile_analysis_with_flight_api)(
+            params, flight_api, deadline
+        )
+
     try:
-        for attempt in Retrying(
-            stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=1, min=5, max=60),
-        ):
-            proxy_url = proxy_manager.get_proxy()
-            with attempt:
-                try:
-                    return await _run_cent_per_mile_analysis(params, proxy_url)
-                except Exception as e:
-                    logging.error(f"Error during analysis with proxy {proxy_url}: {e}")
-                    proxy_manager.block_proxy_for_duration(proxy_url)
-                    raise e
+        async with sessions, hedge_sessions:
+            async for attempt in AsyncRetrying(
+                stop=stop,
+                wait=wait_exponential(multiplier=1, min=5, max=60),
+            ):
+                proxy_url = proxy_manager.get_proxy()
+                hedge_proxy_urls: List[Optional[str]] = []
+                if params.hedge:
+                    try:
+                        hedge_proxy_urls.append(
+                            get_hedge_proxy(
+                                proxy_manager, proxy_url, params.hedge_with_other_engine
+                            )
+                        )
+                    except NoProxyAvailableError as e:
+                        logging.warning(f"Not hedging with proxy {proxy_url}: {e}")
+                with attempt:
+                    try:
+                        analysis = analyze_through(proxy_url, hedge_proxy_urls)
+                        if deadline is None:
+                            return await analysis
+                        return await deadline.wait(analysis)
+                    except Exception as e:
+                        logging.error(
+                            f"Error during analysis with proxy {proxy_url}: {e}"
+                        )
+                        # Running out of budget says nothing about the proxy
+                        if not isinstance(e, DeadlineExceededError):
+                            proxy_manager.block_proxy_for_duration(proxy_url)
+                        raise e
     except Exception as final_exception:
         logging.critical(f"All retries failed: {final_exception}")
         raise final_exception
+    finally:
+        if hedged_flight_api is not None:
+            hedged_flight_api.log_stats()
     return []
 
 
-async def _run_cent_per_mile_analysis(
-    params: AnalysisParams,
+def get_hedge_proxy(
+    proxy_manager: ProxyManager,
     proxy_url: Optional[str],
-):
-    flight_api = (
-        CamouFoxBrowserNetworkFlightSearchResponseApi(proxy_url)
-        if params.use_camoufox_browser
-        else ChromeBrowserNetworkFlightSearchResponseApi(proxy_url)
-    )
-    async with flight_api as flightResponseApi:
-        scraper = AmericanAirlineFlightScraper(flightResponseApi)
-
-        cash_search_req = FlightSearchRequest(
-            orig=params.origin,
-            dest=params.destination,
-            date=params.date,
-            adult=params.passengers,
-            search_type=PaymentType.REVENUE,
+    hedge_with_other_engine: bool,
+) -> Optional[str]:
+    """
+    Proxy for the hedge of searches going out through `proxy_url`. Raises
+    NoProxyAvailableError when the hedge would repeat the search on the same engine
+    and egress, which only adds load instead of cutting the tail latency.
+    """
+    try:
+        return proxy_manager.get_proxy(exclude=[proxy_url])
+    except NoProxyAvailableError:
+        if hedge_with_other_engine:
+            # The other engine is a browser of its own even on the same egress
+            return proxy_url
+        raise
+
+
+def create_flight_api(
+    use_camoufox_browser: bool,
+    proxy_url: Optional[str],
+    max_tabs: int,
+    use_http_engine: bool = False,
+    slice_store: Optional[SliceStore] = None,
+    chrome_server: Optional[str] = None,
+    camoufox_server: Optional[str] = None,
+) -> BaseFlightSearchResponseApi:
+    if use_camoufox_browser:
+        browser_api_cls = CamouFoxBrowserNetworkFlightSearchResponseApi
+        browser_server = camoufox_server
+    else:
+        browser_api_cls = ChromeBrowserNetworkFlightSearchResponseApi
+        browser_server = chrome_server
+    browser_api = browser_api_cls(
+        proxy_url,
+        max_tabs=max_tabs,
+        slice_store=slice_store,
+        browser_server=browser_server,
+    )
+    if use_http_engine:
+        return HttpFlightSearchResponseApi(
+            browser_api, proxy_url, slice_store=slice_store
         )
+    return browser_api
+
 
+async def run_cent_per_mile_analysis_with_flight_api(
+    params: AnalysisParams,
+    flight_api: BaseFlightSearchResponseApi,
+    deadline: Optional[Deadline] = None,
+) -> List[FlightRecord]:
+    scraper = AmericanAirlineFlightScraper(flight_api, deadline)
+    # A multi-slice request costs one navigation per payment type, every slice
+    # found in it is then read back from the engine cache. Slices missing from the
+    # response are searched one way
+    cash_search_req = params.to_search_request(PaymentType.REVENUE)
+    miles_search_req = params.to_search_request(PaymentType.AWARD)
+
+    async def scrape_revenue(slice_index: int):
         logging.info(f"Searching flights timings: {cash_search_req}")
         flight_timings = await scraper.scrape_flight_timing(
             cash_search_req,
             direct_only=params.direct_only,
+            slice_index=slice_index,
         )
         logging.info(f"Searching flights prices: {cash_search_req}")
-        flight_cash_prices = await scraper.scrape_cash_prices(
+        flight_cash_prices = await scraper.scrape_cash_prices_by_product_type(
             cash_search_req,
-            product_type=params.cabin_class,
+            product_types=params.cabin_classes,
             direct_only=params.direct_only,
+            per_passenger=params.per_passenger,
+            min_seats=params.passengers,
+            slice_index=slice_index,
         )
+        return flight_timings, flight_cash_prices
 
-        miles_search_req = FlightSearchRequest(
-            orig=params.origin,
-            dest=params.destination,
-            date=params.date,
-            adult=params.passengers,
-            search_type=PaymentType.AWARD,
-        )
-
+    async def scrape_award(slice_index: int):
         logging.info(f"Searching flights miles redemption: {miles_search_req}")
-        flight_miles_prices = await scraper.scrape_miles_prices(
+        return await scraper.scrape_miles_prices_by_product_type(
             miles_search_req,
-            product_type=params.cabin_class,
+            product_types=params.cabin_classes,
             direct_only=params.direct_only,
+            min_seats=params.passengers,
+            slice_index=slice_index,
         )
-        all_flight_prices: List[FlightTimingAndPrices] = []
-
-    for flight_number in flight_timings.keys():
-        flight_timing = flight_timings.get(flight_number)
-        cash_price = flight_cash_prices.get(flight_number)
-        mile_price = flight_miles_prices.get(flight_number)
-        if not flight_timing or not cash_price or not mile_price:
-            logging.warning(
-                f"Skipping flight {flight_number} due to missing data: "
-                f"timing={flight_timing}, cash_price={cash_price}, "
-                f"mile_price={mile_price}"
-            )
-            continue
-
-        all_flight_prices.append(
-            FlightTimingAndPrices.model_validate(
-                {
-                    **flight_timing.model_dump(),
-                    **cash_price.model_dump(),
-                    **mile_price.model_dump(),
-                }
-            )
+
+    all_flight_prices: List[FlightRecord] = []
+    for slice_index in range(len(cash_search_req.requested_slices)):
+        # Revenue and Award searches are independent, run them in parallel tabs
+        (
+            (flight_timings, flight_cash_prices),
+            flight_miles_prices,
+        ) = await asyncio.gather(
+            scrape_revenue(slice_index),
+            scrape_award(slice_index),
         )
 
+        with profile_phase("merge"):
+            for cabin_class in params.cabin_classes:
+                all_flight_prices.extend(
+                    AmericanAirlineFlightScraper.build_flight_records(
+                        flight_timings,
+                        flight_cash_prices[cabin_class],
+                        flight_miles_prices[cabin_class],
+                        product_type=cabin_class,
+                        slice_index=slice_index,
+                    )
+                )
+
+    if params.per_passenger:
+        return [
+            flight_price.for_passengers(params.passengers)
+            for flight_price in all_flight_prices
+        ]
     return all_flight_prices
 
 
+async def run_date_sweep_with_flight_api(
+    params: AnalysisParams,
+    flight_api: BaseFlightSearchResponseApi,
+    deadline: Optional[Deadline] = None,
+) -> DateSweepResult:
+    # Both tabs search dates of the same wave
+    return await DateSweep(
+        flight_api,
+        params,
+        window_days=params.sweep_days,
+        target_cpp=params.target_cpp,
+        cash_margin=params.sweep_cash_margin,
+        concurrency=2,
+        deadline=deadline,
+    ).run()
+
+
 def report_results(
     params: AnalysisParams,
-    flight_prices: List[FlightTimingAndPrices],
+    flight_prices: List[FlightRecord],
     output_file_path: Optional[str] = None,
 ):
     flights_formatted = [flight.to_report() for flight in flight_prices]
@@ -130,12 +279,28 @@ def report_results(
             "origin": params.origin,
             "destination": params.destination,
             "date": params.date,
+            "slices": [
+                requested_slice.model_dump()
+                for requested_slice in params.to_search_request(
+                    PaymentType.REVENUE
+                ).requested_slices
+            ],
             "passengers": params.passengers,
-            "cabin_class": params.cabin_class.value,
+            "cabin_classes": [
+                cabin_class.value for cabin_class in params.cabin_classes
+            ],
         },
         "flights": flights_formatted,
         "total_results": len(flight_prices),
     }
+    if params.allow_origin_nearby or params.allow_dest_nearby:
+        flights_by_airport_pair = AmericanAirlineFlightScraper.group_by_airport_pair(
+            flight_prices
+        )
+        formatted_json["flights_by_airport_pair"] = {
+            f"{origin}-{destination}": [flight.to_report() for flight in flights]
+            for (origin, destination), flights in flights_by_airport_pair.items()
+        }
 
     logging.info("\n##### SCRAPER RESULTS #####")
     logging.info(f"Found {len(flight_prices)} flights")
@@ -148,6 +313,50 @@ def report_results(
     logging.info("\n##### SCRAPER RESULTS END #####")
 
 
+def report_date_sweep(
+    params: AnalysisParams,
+    sweep_result: DateSweepResult,
+    output_file_path: Optional[str] = None,
+):
+    best_flights = sweep_result.best_flight_records()
+    formatted_json = {
+        "search_metadata": {
+            "origin": params.origin,
+            "destination": params.destination,
+            "date": params.date,
+            "sweep_days": params.sweep_days,
+            "target_cpp": params.target_cpp,
+            "sweep_cash_margin": params.sweep_cash_margin,
+            "passengers": params.passengers,
+            "cabin_classes": [
+                cabin_class.value for cabin_class in params.cabin_classes
+            ],
+        },
+        "award_searches": sweep_result.award_searches,
+        "revenue_searches": sweep_result.revenue_searches,
+        "stopped_early": sweep_result.stopped_early,
+        "failed_dates": sweep_result.failed_dates,
+        "dates": [day.to_report() for day in sweep_result.days],
+        "flights": [flight.to_report() for flight in best_flights],
+        "total_results": len(best_flights),
+    }
+
+    logging.info("\n##### DATE SWEEP RESULTS #####")
+    for day in sweep_result.days:
+        logging.info(
+            f"{day.date}: best CPP {day.best_cpp}, min points {day.min_points}"
+            + (f" ({day.skipped_reason})" if day.skipped_reason else "")
+            + (f" (failed: {day.error})" if day.error else "")
+        )
+    if output_file_path:
+        logging.info(f"Writing results to {output_file_path}")
+        with open(output_file_path, "w") as f:
+            json.dump(formatted_json, f, indent=4, default=str)
+    else:
+        logging.info(f"Results: {formatted_json}")
+    logging.info("\n##### DATE SWEEP RESULTS END #####")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Run flight analysis for cent per mile calculations"
@@ -164,6 +373,18 @@ if __name__ == "__main__":
     parser.add_argument(
         "--date", required=True, help="Flight date in YYYY-MM-DD format"
     )
+    parser.add_argument(
+        "--return-date",
+        help="Return flight date in YYYY-MM-DD format, searched as a round trip",
+    )
+    parser.add_argument(
+        "--leg",
+        nargs=3,
+        action="append",
+        default=[],
+        metavar=("ORIGIN", "DESTINATION", "DATE"),
+        help="Additional multi-city leg, can be repeated",
+    )
     parser.add_argument(
         "--passengers",
         "-p",
@@ -174,9 +395,11 @@ if __name__ == "__main__":
     parser.add_argument(
         "--cabin-class",
         "-c",
+        dest="cabin_classes",
+        nargs="+",
         choices=["COACH", "PREMIUM_ECONOMY", "BUSINESS", "FIRST"],
-        default="COACH",
-        help="Cabin class (default: COACH)",
+        default=["COACH"],
+        help="Cabin classes, all priced from the same searches (default: COACH)",
     )
     parser.add_argument(
         "-f",
@@ -195,14 +418,133 @@ if __name__ == "__main__":
         action="store_true",
         help="Only include direct flights in the results",
     )
+    parser.add_argument(
+        "--origin-nearby",
+        dest="allow_origin_nearby",
+        default=False,
+        action="store_true",
+        help="Also search airports near the origin (metro area) in the same search",
+    )
+    parser.add_argument(
+        "--destination-nearby",
+        dest="allow_dest_nearby",
+        default=False,
+        action="store_true",
+        help="Also search airports near the destination in the same search",
+    )
+    parser.add_argument(
+        "--per-passenger",
+        default=False,
+        action="store_true",
+        help="Search for a single passenger and scale prices to --passengers, "
+        "so every passenger count shares the same search and cache entry",
+    )
     parser.add_argument(
         "--use-camoufox-browser",
         default=False,
         action="store_true",
         help="Use CamouFox browser for scraping",
     )
+    parser.add_argument(
+        "--chrome-server",
+        metavar="HOST:PORT",
+        help="Open a fresh context on a running browser_server.py chrome server "
+        "instead of launching Chrome",
+    )
+    parser.add_argument(
+        "--camoufox-server",
+        metavar="WS_ENDPOINT",
+        help="Open a fresh context on a running browser_server.py camoufox server "
+        "instead of launching CamouFox",
+    )
+    parser.add_argument(
+        "--use-http-engine",
+        default=False,
+        action="store_true",
+        help="Call the itinerary api over http with the cookies of a warmed up "
+        "browser, falling back to the browser when blocked",
+    )
+    parser.add_argument(
+        "--slice-archive-dir",
+        help="Archive every distinct slice payload once, across runs, keeping the "
+        "most recent 200k",
+    )
+    parser.add_argument(
+        "--hedge",
+        default=False,
+        action="store_true",
+        help="Start a duplicate search on a second browser and proxy when a search "
+        "is slower than the 95th percentile of recent searches, first result wins",
+    )
+    parser.add_argument(
+        "--hedge-with-other-engine",
+        default=False,
+        action="store_true",
+        help="Run the --hedge duplicate search on the other browser engine",
+    )
+    parser.add_argument(
+        "--deadline-seconds",
+        type=float,
+        help="Wall time budget of the whole analysis, including retries: every "
+        "search and backoff is cut short so the run ends within it",
+    )
+    parser.add_argument(
+        "--sweep-days",
+        type=int,
+        default=0,
+        metavar="DAYS",
+        help="Find the best award redemption within DAYS days of --date, award "
+        "searches first, revenue only for dates that can still beat the best CPP",
+    )
+    parser.add_argument(
+        "--target-cpp",
+        type=float,
+        help="Stop the --sweep-days sweep once a flight reaches this CPP",
+    )
+    parser.add_argument(
+        "--sweep-cash-margin",
+        type=float,
+        default=1.25,
+        metavar="FACTOR",
+        help="Heuristic of --sweep-days: skip a date's revenue search when its fewest "
+        "points, priced at FACTOR times the priciest cash fare seen so far, cannot "
+        "beat the best CPP (default: 1.25)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FOLDED_STACKS_PATH",
+        help="Sample the CPU and write folded stacks for flamegraph.pl or speedscope",
+    )
+    parser.add_argument(
+        "--trace-malloc",
+        metavar="REPORT_PATH",
+        help="Trace allocations and write the top allocations of each phase "
+        "(parse, merge)",
+    )
 
-    params = AnalysisParams.model_validate(vars(parser.parse_args()))
+    cli_args = vars(parser.parse_args())
+    if cli_args["sweep_days"] and (cli_args["return_date"] or cli_args["leg"]):
+        parser.error("--sweep-days only supports one way searches")
+    profile_path = cli_args.pop("profile")
+    trace_malloc_path = cli_args.pop("trace_malloc")
+    deadline_seconds = cli_args.pop("deadline_seconds")
+    return_date = cli_args.pop("return_date")
+    additional_slices = [
+        SliceRequest(orig=orig, dest=dest, date=date)
+        for orig, dest, date in cli_args.pop("leg")
+    ]
+    if return_date:
+        additional_slices.insert(
+            0,
+            SliceRequest(
+                orig=cli_args["destination"],
+                dest=cli_args["origin"],
+                date=return_date,
+            ),
+        )
+    params = AnalysisParams.model_validate(
+        {**cli_args, "additional_slices": additional_slices}
+    )
 
     logging.basicConfig(
         level=logging.DEBUG if params.debug else logging.INFO,
@@ -213,7 +555,20 @@ if __name__ == "__main__":
 
     proxy_manager = ProxyManager(proxySettings.proxy_urls_list)
 
-    results = asyncio.run(
-        run_cent_per_mile_analysis_with_retries(params, proxy_manager)
+    analyze = (
+        run_date_sweep_with_flight_api
+        if params.sweep_days
+        else run_cent_per_mile_analysis_with_flight_api
     )
-    report_results(params, results, output_file_path=params.output_file_path)
+    with profiled_run(profile_path, trace_malloc_path):
+        # Created right before the run so argument parsing is not billed
+        deadline = Deadline(deadline_seconds) if deadline_seconds else None
+        results = asyncio.run(
+            run_cent_per_mile_analysis_with_retries(
+                params, proxy_manager, analyze=analyze, deadline=deadline
+            )
+        )
+    if params.sweep_days:
+        report_date_sweep(params, results, output_file_path=params.output_file_path)
+    else:
+        report_results(params, results, output_file_path=params.output_file_path)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+
+from scraperninja.batch.job_journal import JobJournal
+from scraperninja.batch.job_scheduler import FifoJobScheduler, PriorityJobScheduler
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.batch_job import BatchJob
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.scraper.deadline import Deadline
+from scraperninja.scraper.flight_search import BaseFlightSearchResponseApi
+
+AnalysisFunction = Callable[
+    [AnalysisParams, BaseFlightSearchResponseApi, Optional[Deadline]],
+    Awaitable[List[FlightRecord]],
+]
+JobResultCallback = Callable[[BatchJob, List[FlightRecord]], None]
+
+
+class BatchRunner:
+    """
+    Runs batch jobs concurrently against one shared flight search api. Wrap the api
+    in CoalescingFlightSearchResponseApi so jobs needing the same search share it.
+    Job state changes go to the optional journal so a crashed run can be resumed.
+    Workers take their next job from the scheduler, in order by default. With
+    `job_deadline_seconds`, a job's attempts and backoff all fit in that budget,
+    counted from when a worker picks it up.
+    """
+
+    logger = logging.getLogger(f"{__name__}")
+
+    def __init__(
+        self,
+        flight_api: BaseFlightSearchResponseApi,
+        analyze: AnalysisFunction,
+        concurrency: int = 1,
+        attempts: int = 3,
+        journal: Optional[JobJournal] = None,
+        scheduler: Optional[FifoJobScheduler | PriorityJobScheduler] = None,
+        job_deadline_seconds: Optional[float] = None,
+    ) -> None:
+        self.flight_api = flight_api
+        self.analyze = analyze
+        self.concurrency = concurrency
+        self.attempts = attempts
+        self.journal = journal
+        # An empty scheduler is falsy, compare to None to keep the one passed in
+        self.scheduler = scheduler if scheduler is not None else FifoJobScheduler()
+        self.job_deadline_seconds = job_deadline_seconds
+        self.failed_job_ids: List[str] = []
+
+    async def run(
+        self,
+        jobs: Iterable[BatchJob],
+        on_result: Optional[JobResultCallback] = None,
+    ) -> Dict[str, List[FlightRecord]]:
+        jobs = list(jobs)
+        results: Dict[str, List[FlightRecord]] = {}
+        if self.journal:
+            self.journal.mark_pending(job.job_id for job in jobs)
+        for job in jobs:
+            try:
+                self.scheduler.add(job)
+            except ValueError as e:
+                # e.g. a malformed date, only this job is lost
+                self.__job_failed(job, e)
+
+        async def run_job(job: BatchJob) -> None:
+            if self.journal:
+                self.journal.mark_running(job.job_id)
+            try:
+                results[job.job_id] = await self._run_with_retries(job)
+            except Exception as e:
+                self.__job_failed(job, e)
+                return
+            if on_result:
+                on_result(job, results[job.job_id])
+            # Only journal the job as done once its report is written
+            if self.journal:
+                self.journal.mark_done(job.job_id, results[job.job_id])
+
+        async def worker() -> None:
+            while (job := self.scheduler.next_job()) is not None:
+                try:
+                    await run_job(job)
+                finally:
+                    self.scheduler.job_finished(job)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+    def __job_failed(self, job: BatchJob, error: Exception):
+        self.logger.error(f"Job {job.job_id} failed: {error}")
+        self.failed_job_ids.append(job.job_id)
+        if self.journal:
+            self.journal.mark_failed(job.job_id, error)
+
+    async def _run_with_retries(self, job: BatchJob) -> List[FlightRecord]:
+        deadline = (
+            Deadline(self.job_deadline_seconds)
+            if self.job_deadline_seconds is not None
+            else None
+        )
+        stop = stop_after_attempt(self.attempts)
+        if deadline:
+            stop = stop | deadline.stop_retrying
+        async for attempt in AsyncRetrying(
+            stop=stop,
+            wait=wait_exponential(multiplier=1, min=5, max=60),
+            reraise=True,
+        ):
+            with attempt:
+                self.logger.info(
+                    f"Running job {job.job_id}, "
+                    f"attempt {attempt.retry_state.attempt_number}"
+                )
+                if deadline is None:
+                    return await self.analyze(job.params, self.flight_api, None)
+                return await deadline.wait(
+                    self.analyze(job.params, self.flight_api, deadline)
+                )
+        return []
@@ -0,0 +1,103 @@
+import dataclasses
+import logging
+import os
+import time
+from enum import Enum
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from scraperninja.model.domain.flight_record import FlightRecord
+
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JournalEntry(BaseModel):
+    job_id: str
+    status: JobStatus
+    recorded_at: float = Field(default_factory=time.time)
+    error: Optional[str] = None
+    flights: Optional[List[dict]] = None
+
+
+class JobJournal:
+    """
+    Append-only JSON lines log of batch job state changes, flushed to disk on every
+    write so a crashed run can be resumed. The last entry of a job is its state.
+    """
+
+    logger = logging.getLogger(f"{__name__}")
+
+    def __init__(self, journal_path: str, resume: bool = False) -> None:
+        self.journal_path = journal_path
+        self.entries: Dict[str, JournalEntry] = (
+            self.__replay(journal_path) if resume else {}
+        )
+        self.journal_file = open(journal_path, "a" if resume else "w")
+        if self.journal_file.tell() > 0 and not self.__ends_with_newline(journal_path):
+            # Start after the line the crash cut short instead of extending it
+            self.journal_file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.journal_file.close()
+        return False
+
+    @staticmethod
+    def __ends_with_newline(journal_path: str) -> bool:
+        with open(journal_path, "rb") as journal_file:
+            journal_file.seek(-1, os.SEEK_END)
+            return journal_file.read(1) == b"\n"
+
+    @staticmethod
+    def __replay(journal_path: str) -> Dict[str, JournalEntry]:
+        entries: Dict[str, JournalEntry] = {}
+        if not os.path.exists(journal_path):
+            return entries
+        with open(journal_path) as journal_file:
+            for line in journal_file:
+                try:
+                    entry = JournalEntry.model_validate_json(line)
+                except ValueError:
+                    # A line torn by the crash, the job is simply run again
+                    continue
+                entries[entry.job_id] = entry
+        return entries
+
+    def is_done(self, job_id: str) -> bool:
+        entry = self.entries.get(job_id)
+        return entry is not None and entry.status == JobStatus.DONE
+
+    def mark_pending(self, job_ids: Iterable[str]):
+        for job_id in job_ids:
+            self.__record(JournalEntry(job_id=job_id, status=JobStatus.PENDING))
+
+    def mark_running(self, job_id: str):
+        self.__record(JournalEntry(job_id=job_id, status=JobStatus.RUNNING))
+
+    def mark_done(self, job_id: str, flight_records: List[FlightRecord]):
+        self.__record(
+            JournalEntry(
+                job_id=job_id,
+                status=JobStatus.DONE,
+                flights=[dataclasses.asdict(record) for record in flight_records],
+            )
+        )
+
+    def mark_failed(self, job_id: str, error: Exception):
+        self.__record(
+            JournalEntry(job_id=job_id, status=JobStatus.FAILED, error=str(error))
+        )
+
+    def __record(self, entry: JournalEntry):
+        self.entries[entry.job_id] = entry
+        self.journal_file.write(entry.model_dump_json() + "\n")
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
@@ -0,0 +1,163 @@
+import bisect
+import glob
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from collections import Counter, defaultdict, deque
+from datetime import date
+from statistics import median
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from scraperninja.model.batch_job import BatchJob
+
+Route = Tuple[str, str]
+
+
+def job_route(job: BatchJob) -> Route:
+    return job.params.origin, job.params.destination
+
+
+class FifoJobScheduler:
+    """Hands out jobs in the order they were added."""
+
+    def __init__(self) -> None:
+        self.queue: Deque[BatchJob] = deque()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def add(self, job: BatchJob):
+        self.queue.append(job)
+
+    def next_job(self) -> Optional[BatchJob]:
+        return self.queue.popleft() if self.queue else None
+
+    def job_finished(self, job: BatchJob):
+        pass
+
+
+class RouteCppHistory:
+    """Best CPP of every past report per route, ranked against the other routes."""
+
+    logger = logging.getLogger(f"{__name__}")
+
+    def __init__(self, best_cpps_by_route: Dict[Route, List[float]]) -> None:
+        self.route_cpp = {
+            route: median(best_cpps)
+            for route, best_cpps in best_cpps_by_route.items()
+            if best_cpps
+        }
+        self.sorted_cpps = sorted(self.route_cpp.values())
+
+    @staticmethod
+    def from_reports(report_dir: str) -> "RouteCppHistory":
+        """Read every report_results json file in `report_dir`."""
+        best_cpps_by_route: Dict[Route, List[float]] = defaultdict(list)
+        for report_path in glob.glob(os.path.join(report_dir, "*.json")):
+            try:
+                with open(report_path) as report_file:
+                    report = json.load(report_file)
+                metadata = report["search_metadata"]
+                route = (metadata["origin"], metadata["destination"])
+                cpps = [flight["cpp"] for flight in report["flights"] if flight["cpp"]]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if cpps:
+                best_cpps_by_route[route].append(max(cpps))
+        history = RouteCppHistory(best_cpps_by_route)
+        RouteCppHistory.logger.info(
+            f"Loaded CPP history of {len(history.route_cpp)} routes from {report_dir}"
+        )
+        return history
+
+    def percentile(self, route: Route) -> Optional[float]:
+        """Share of routes with a past CPP at most this route's, None if unseen."""
+        cpp = self.route_cpp.get(route)
+        if cpp is None:
+            return None
+        return bisect.bisect_right(self.sorted_cpps, cpp) / len(self.sorted_cpps)
+
+
+class PriorityJobScheduler:
+    """
+    Hands out the job with the highest score:
+
+        urgency_weight * (1 - days_to_departure / horizon_days)
+        + value_weight * past CPP percentile of the route (0.5 when unknown)
+        + aging_per_hour * hours waited
+        - route_penalty * jobs of the same route currently running
+
+    A job that waited (urgency_weight + value_weight + route_penalty * concurrency)
+    / aging_per_hour hours outranks any newly added job, so no job starves. Every
+    waiting job ages at the same rate, so the order within a route never changes
+    and each route keeps a static heap; only the route heads are compared, with
+    the running-job penalty.
+    """
+
+    def __init__(
+        self,
+        cpp_history: Optional[RouteCppHistory] = None,
+        urgency_weight: float = 1.0,
+        value_weight: float = 1.0,
+        aging_per_hour: float = 1.0,
+        route_penalty: float = 0.5,
+        horizon_days: int = 60,
+        today: Optional[date] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cpp_history = cpp_history
+        self.urgency_weight = urgency_weight
+        self.value_weight = value_weight
+        self.aging_per_hour = aging_per_hour
+        self.route_penalty = route_penalty
+        self.horizon_days = horizon_days
+        self.today = today
+        self.clock = clock
+        self.heaps_by_route: Dict[Route, List[Tuple[float, int, BatchJob]]] = {}
+        self.running_by_route: Counter = Counter()
+        self._insertion_order = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(len(heap) for heap in self.heaps_by_route.values())
+
+    def base_score(self, job: BatchJob) -> float:
+        today = self.today or date.today()
+        days_to_departure = max(0, (date.fromisoformat(job.params.date) - today).days)
+        urgency = max(0.0, 1 - days_to_departure / self.horizon_days)
+        percentile = (
+            self.cpp_history.percentile(job_route(job)) if self.cpp_history else None
+        )
+        value = 0.5 if percentile is None else percentile
+        return self.urgency_weight * urgency + self.value_weight * value
+
+    def add(self, job: BatchJob):
+        # score(now) = base + aging * (now - added_at), so ordering by
+        # base - aging * added_at is the same at any later time
+        aged_base = self.base_score(job) - self.aging_per_hour * self.clock() / 3600
+        heapq.heappush(
+            self.heaps_by_route.setdefault(job_route(job), []),
+            (-aged_base, next(self._insertion_order), job),
+        )
+
+    def next_job(self) -> Optional[BatchJob]:
+        best_route: Optional[Route] = None
+        best_score = float("-inf")
+        for route, heap in self.heaps_by_route.items():
+            score = -heap[0][0] - self.route_penalty * self.running_by_route[route]
+            if score > best_score:
+                best_route, best_score = route, score
+        if best_route is None:
+            return None
+
+        heap = self.heaps_by_route[best_route]
+        _, _, job = heapq.heappop(heap)
+        if not heap:
+            del self.heaps_by_route[best_route]
+        self.running_by_route[best_route] += 1
+        return job
+
+    def job_finished(self, job: BatchJob):
+        self.running_by_route[job_route(job)] -= 1
@@ -1,7 +1,12 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+    SliceRequest,
+)
 from scraperninja.model.api.flight_search_response import ProductType
 
 
@@ -9,9 +14,39 @@ class AnalysisParams(BaseModel):
     origin: str
     destination: str
     date: str
-    passengers: int
-    cabin_class: ProductType
+    passengers: int = 1
+    cabin_classes: List[ProductType] = [ProductType.COACH]
     output_file_path: Optional[str] = None
-    debug: bool
-    direct_only: bool
-    use_camoufox_browser: bool
+    debug: bool = False
+    direct_only: bool = False
+    use_camoufox_browser: bool = False
+    use_http_engine: bool = False
+    chrome_server: Optional[str] = None
+    camoufox_server: Optional[str] = None
+    slice_archive_dir: Optional[str] = None
+    per_passenger: bool = False
+    additional_slices: List[SliceRequest] = []
+    allow_origin_nearby: bool = False
+    allow_dest_nearby: bool = False
+    hedge: bool = False
+    hedge_with_other_engine: bool = False
+    sweep_days: int = 0
+    target_cpp: Optional[float] = None
+    sweep_cash_margin: float = 1.25
+
+    @property
+    def search_passengers(self) -> int:
+        """Passenger count sent to AA, normalized runs always search for one."""
+        return 1 if self.per_passenger else self.passengers
+
+    def to_search_request(self, search_type: PaymentType) -> FlightSearchRequest:
+        return FlightSearchRequest(
+            orig=self.origin,
+            dest=self.destination,
+            date=self.date,
+            adult=self.search_passengers,
+            search_type=search_type,
+            additional_slices=self.additional_slices,
+            allow_origin_nearby=self.allow_origin_nearby,
+            allow_dest_nearby=self.allow_dest_nearby,
+        )
@@ -1,7 +1,7 @@
 import json
 from enum import Enum
-from typing import List
-from urllib.parse import quote, urlencode
+from typing import List, Optional
+from urllib.parse import parse_qs, quote, urlencode, urlparse
 
 from pydantic import BaseModel
 
@@ -11,14 +11,27 @@ class PaymentType(Enum):
     AWARD = "Award"
 
 
+class TripType(Enum):
+    ONE_WAY = "OneWay"
+    ROUND_TRIP = "RoundTrip"
+    MULTI_CITY = "MultiCity"
+
+
+class SliceRequest(BaseModel):
+    orig: str
+    dest: str
+    date: str
+
+
 class FlightSearchRequest(BaseModel):
     orig: str
     dest: str
     date: str
     adult: int
     search_type: PaymentType
+    additional_slices: List[SliceRequest] = []
     pax: int = 1
-    trip_type: str = "OneWay"
+    trip_type: Optional[TripType] = None
     fare_type: str = "Lowest"
     locale: str = "en_US"
     cabin: str = ""
@@ -33,22 +46,56 @@ class FlightSearchRequest(BaseModel):
             "fareType": self.fare_type,
             "pax": self.pax,
             "adult": self.adult,
-            "type": self.trip_type,
+            "type": self.resolved_trip_type.value,
             "searchType": self.search_type.value,
             "cabin": self.cabin,
             "carriers": self.carriers,
             "travelType": self.travel_type,
         }
 
+    @property
+    def requested_slices(self) -> List[SliceRequest]:
+        return [
+            SliceRequest(orig=self.orig, dest=self.dest, date=self.date),
+            *self.additional_slices,
+        ]
+
+    def slice_request(self, slice_index: int) -> "FlightSearchRequest":
+        """One way request of a single requested slice, with the same options."""
+        requested_slice = self.requested_slices[slice_index]
+        return self.model_copy(
+            update={
+                "orig": requested_slice.orig,
+                "dest": requested_slice.dest,
+                "date": requested_slice.date,
+                "additional_slices": [],
+                "trip_type": None,
+            }
+        )
+
+    @property
+    def resolved_trip_type(self) -> TripType:
+        if self.trip_type is not None:
+            return self.trip_type
+        if not self.additional_slices:
+            return TripType.ONE_WAY
+        if len(self.additional_slices) == 1 and (
+            self.additional_slices[0].orig == self.dest
+            and self.additional_slices[0].dest == self.orig
+        ):
+            return TripType.ROUND_TRIP
+        return TripType.MULTI_CITY
+
     def slices(self) -> List[dict]:
         return [
             {
-                "orig": self.orig,
+                "orig": requested_slice.orig,
                 "origNearby": self.allow_origin_nearby,
-                "dest": self.dest,
+                "dest": requested_slice.dest,
                 "destNearby": self.allow_dest_nearby,
-                "date": self.date,
+                "date": requested_slice.date,
             }
+            for requested_slice in self.requested_slices
         ]
 
     def to_url(self, base_url) -> str:
@@ -56,3 +103,71 @@ class FlightSearchRequest(BaseModel):
         slices_json = json.dumps(self.slices(), separators=(",", ":"))
         slices_quoted = quote(slices_json, safe="")
         return f"{base_url}?{query}&slices={slices_quoted}"
+
+    @staticmethod
+    def from_url(url: str) -> "FlightSearchRequest":
+        """Inverse of `to_url`, for engines that only receive the search url."""
+        query = {
+            key: values[0] for key, values in parse_qs(urlparse(url).query).items()
+        }
+        first_slice, *other_slices = json.loads(query["slices"])
+        return FlightSearchRequest(
+            orig=first_slice["orig"],
+            dest=first_slice["dest"],
+            date=first_slice["date"],
+            adult=int(query["adult"]),
+            search_type=PaymentType(query["searchType"]),
+            additional_slices=[
+                SliceRequest(orig=s["orig"], dest=s["dest"], date=s["date"])
+                for s in other_slices
+            ],
+            pax=int(query["pax"]),
+            trip_type=TripType(query["type"]),
+            fare_type=query["fareType"],
+            locale=query["locale"],
+            cabin=query.get("cabin", ""),
+            carriers=query["carriers"],
+            travel_type=query["travelType"],
+            allow_origin_nearby=first_slice["origNearby"],
+            allow_dest_nearby=first_slice["destNearby"],
+        )
+
+    def to_itinerary_payload(self) -> dict:
+        """Body the AA booking page posts to the itinerary search api."""
+        return {
+            "metadata": {
+                "selectedProducts": [],
+                "tripType": self.resolved_trip_type.value,
+                "udo": {},
+            },
+            "passengers": [{"type": "adult", "count": self.adult}],
+            "requestHeader": {"clientId": "AAcom"},
+            "slices": [
+                {
+                    "allCarriers": self.carriers == "ALL",
+                    "cabin": self.cabin,
+                    "departureDate": requested_slice.date,
+                    "destination": requested_slice.dest,
+                    "destinationNearbyAirports": self.allow_dest_nearby,
+                    "maxStops": None,
+                    "origin": requested_slice.orig,
+                    "originNearbyAirports": self.allow_origin_nearby,
+                }
+                for requested_slice in self.requested_slices
+            ],
+            "tripOptions": {
+                "corporateBarcode": None,
+                "fareType": self.fare_type,
+                "locale": self.locale,
+                "pointOfSale": None,
+                "searchType": self.search_type.value,
+            },
+            "loyaltyInfo": None,
+            "version": "",
+            "queryParams": {
+                "sliceIndex": 0,
+                "sessionId": "",
+                "solutionSet": "",
+                "solutionId": "",
+            },
+        }
@@ -218,22 +218,45 @@ class FlightSearchResponse(BaseModel):
     def is_direct_flight(self) -> bool:
         return len(self.segments) == 1
 
-    def get_cheapest_cash_price(
-        self, product_type: ProductType
-    ) -> Optional[FlightCashPrice]:
-        relevantPricingDetails = [
+    def _available_pricing_details(
+        self, product_type: ProductType, min_seats: int
+    ) -> List[PricingDetail]:
+        # AA only reports seatsRemaining when inventory is running low, 0 means
+        # the fare is not seat-limited unless the product is sold out altogether
+        return [
             pricingDetail
             for pricingDetail in self.pricingDetail
             if pricingDetail.productType == product_type
+            and pricingDetail.productAvailable
+            and (
+                pricingDetail.seatsRemaining == 0
+                or pricingDetail.seatsRemaining >= min_seats
+            )
         ]
+
+    def get_cheapest_cash_price(
+        self,
+        product_type: ProductType,
+        per_passenger: bool = False,
+        min_seats: int = 1,
+    ) -> Optional[FlightCashPrice]:
+        relevantPricingDetails = self._available_pricing_details(
+            product_type, min_seats
+        )
         sorted_prices = sorted(relevantPricingDetails)
-        cheapest_price = sorted_prices[0].slicePricing if sorted_prices else None
+        cheapest_price = sorted_prices[0] if sorted_prices else None
 
         if not cheapest_price:
             return None
 
+        if per_passenger:
+            return FlightCashPrice(price=cheapest_price.perPassengerDisplayTotal)
+
+        if not cheapest_price.slicePricing:
+            return None
+
         return FlightCashPrice(
-            price=cheapest_price.allPassengerDisplayTotal,
+            price=cheapest_price.slicePricing.allPassengerDisplayTotal,
         )
 
     def get_flight_timing(self) -> Optional[FlightTiming]:
@@ -247,17 +270,19 @@ class FlightSearchResponse(BaseModel):
                 "flight_number": segment.flight.flight_number_with_carrier_code,
                 "departure_time": segment.departureDateTime,
                 "arrival_time": segment.arrivalDateTime,
+                "origin": self.origin.code,
+                "destination": self.destination.code,
             }
         )
 
     def get_miles_required(
-        self, product_type: ProductType
+        self,
+        product_type: ProductType,
+        min_seats: int = 1,
     ) -> Optional[FlightMilesPrice]:
-        relevantPricingDetails = [
-            pricingDetail
-            for pricingDetail in self.pricingDetail
-            if pricingDetail.productType == product_type
-        ]
+        relevantPricingDetails = self._available_pricing_details(
+            product_type, min_seats
+        )
         sorted_prices = sorted(relevantPricingDetails)
         cheapest_price = sorted_prices[0] if sorted_prices else None
 
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+from pydantic import BaseModel
+
+from scraperninja.model.analysis_params import AnalysisParams
+
+# How a job runs, not what it searches: changing them keeps the job's default id
+RUN_OPTION_FIELDS = {
+    "output_file_path",
+    "debug",
+    "use_camoufox_browser",
+    "use_http_engine",
+    "chrome_server",
+    "camoufox_server",
+    "slice_archive_dir",
+    "hedge",
+    "hedge_with_other_engine",
+}
+
+
+class BatchJob(BaseModel):
+    job_id: str
+    params: AnalysisParams
+
+    @staticmethod
+    def from_json_line(line: str) -> "BatchJob":
+        """
+        Parse one jobs file line: the AnalysisParams fields plus an optional job_id,
+        which defaults to `default_job_id` so it survives lines being reordered.
+        """
+        job_dict = json.loads(line)
+        job_id = job_dict.pop("job_id", None)
+        params = AnalysisParams.model_validate(job_dict)
+        return BatchJob(
+            job_id=BatchJob.default_job_id(params) if job_id is None else str(job_id),
+            params=params,
+        )
+
+    @staticmethod
+    def default_job_id(params: AnalysisParams) -> str:
+        """Route and date followed by a digest of everything the job searches."""
+        searched = params.model_dump(mode="json", exclude=RUN_OPTION_FIELDS)
+        digest = hashlib.sha256(
+            json.dumps(searched, sort_keys=True).encode()
+        ).hexdigest()
+        return f"{params.origin}-{params.destination}-{params.date}-{digest[:10]}"
@@ -0,0 +1,25 @@
+import time
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class BrowserSession(BaseModel):
+    """Cookies and user agent of a warmed up browser, replayed by plain http."""
+
+    cookies: Dict[str, str]
+    user_agent: str
+    harvested_at: float
+
+    @staticmethod
+    def from_cookie_list(cookies: list, user_agent: str) -> "BrowserSession":
+        """Build from the cookie dicts both browser drivers return."""
+        return BrowserSession(
+            cookies={cookie["name"]: cookie["value"] for cookie in cookies},
+            user_agent=user_agent,
+            harvested_at=time.monotonic(),
+        )
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.harvested_at
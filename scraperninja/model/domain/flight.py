@@ -11,6 +11,8 @@ class FlightTiming(BaseModel):
     flight_number: str
     departure_time: datetime
     arrival_time: datetime
+    origin: Optional[str] = None
+    destination: Optional[str] = None
 
 
 class FlightCashPrice(BaseModel):
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional
+
+from scraperninja.constants import TIME_FORMAT_HH_MM
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.domain.flight import (
+    FlightCashPrice,
+    FlightMilesPrice,
+    FlightTiming,
+    FlightTimingAndPrices,
+)
+from scraperninja.model.money import Money
+
+
+@dataclass(slots=True)
+class FlightRecord:
+    """
+    Compact, slotted equivalent of FlightTimingAndPrices. Money is flattened into
+    plain amount/currency fields so large batches avoid nested pydantic objects;
+    convert with `to_model` only at the API boundary.
+    """
+
+    flight_number: str
+    departure_time: datetime
+    arrival_time: datetime
+    cash_amount: float
+    cash_currency: str
+    points_required: Optional[int]
+    tax_amount: float
+    tax_currency: str
+    product_type: ProductType
+    slice_index: int = 0
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+
+    @classmethod
+    def from_parts(
+        cls,
+        timing: FlightTiming,
+        cash_price: FlightCashPrice,
+        miles_price: FlightMilesPrice,
+        product_type: ProductType,
+        slice_index: int = 0,
+    ) -> "FlightRecord":
+        return cls(
+            flight_number=timing.flight_number,
+            departure_time=timing.departure_time,
+            arrival_time=timing.arrival_time,
+            cash_amount=cash_price.price.amount,
+            cash_currency=cash_price.price.currency,
+            points_required=miles_price.points_required,
+            tax_amount=miles_price.tax.amount,
+            tax_currency=miles_price.tax.currency,
+            product_type=product_type,
+            slice_index=slice_index,
+            origin=timing.origin,
+            destination=timing.destination,
+        )
+
+    def for_passengers(self, passengers: int) -> "FlightRecord":
+        """Scale a per passenger record to the totals for `passengers` travellers."""
+        return replace(
+            self,
+            cash_amount=self.cash_amount * passengers,
+            points_required=(
+                self.points_required * passengers
+                if self.points_required is not None
+                else None
+            ),
+            tax_amount=self.tax_amount * passengers,
+        )
+
+    @property
+    def cpp(self) -> Optional[float]:
+        """Calculate the cents per point (CPP) value for the flight."""
+        if not self.points_required or self.points_required == 0:
+            return None
+        if self.cash_currency != self.tax_currency:
+            raise ValueError("Money operations require the same currency")
+        return (self.cash_amount - self.tax_amount) * 100 / self.points_required
+
+    def to_model(self) -> FlightTimingAndPrices:
+        return FlightTimingAndPrices(
+            flight_number=self.flight_number,
+            departure_time=self.departure_time,
+            arrival_time=self.arrival_time,
+            origin=self.origin,
+            destination=self.destination,
+            price=Money(amount=self.cash_amount, currency=self.cash_currency),
+            points_required=self.points_required,
+            tax=Money(amount=self.tax_amount, currency=self.tax_currency),
+        )
+
+    def to_report(self):
+        if self.cash_currency != "USD" or self.tax_currency != "USD":
+            raise NotImplementedError("Currency conversion not implemented")
+        cpp = self.cpp
+        return {
+            "flight_number": self.flight_number,
+            "cabin_class": self.product_type.value,
+            "slice_index": self.slice_index,
+            "origin": self.origin,
+            "destination": self.destination,
+            "departure_time": self.departure_time.strftime(TIME_FORMAT_HH_MM),
+            "arrival_time": self.arrival_time.strftime(TIME_FORMAT_HH_MM),
+            "points_required": self.points_required,
+            "cash_price_usd": self.cash_amount,
+            "taxes_fees_usd": self.tax_amount,
+            "cpp": cpp if cpp else None,
+        }
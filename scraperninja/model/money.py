@@ -14,6 +14,10 @@ class Money(BaseModel):
             return self.amount
         raise NotImplementedError("Currency conversion not implemented")
 
+    def __le__(self, other: "Money") -> bool:
+        self.check_same_currency(other)
+        return self.amount <= other.amount
+
     # TODO: Implement currency conversion if needed
     def check_same_currency(self, other: "Money"):
         if self.currency != other.currency:
@@ -0,0 +1,175 @@
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Phase of the main thread, read by the sampler thread. Phases are only marked
+# around synchronous code so concurrent tasks cannot interleave inside one.
+_current_phase: Optional[str] = None
+_allocation_tracer: Optional["AllocationTracer"] = None
+# Leave the profiler's own bookkeeping out of the allocation report
+_PROFILER_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+class SamplingProfiler:
+    """
+    Samples the main thread stack every `interval_seconds` from a background thread
+    and writes the folded stacks flamegraph.pl and speedscope read. Samples taken
+    inside a `profile_phase` are rooted under a `[phase]` frame.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005) -> None:
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self._target_thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self.__sample, name="sampling-profiler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __sample(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_qualname} "
+                    f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if _current_phase is not None:
+                stack.append(f"[{_current_phase}]")
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(
+            f"Wrote {sum(self.stacks.values())} CPU samples to {path}, "
+            f"render with flamegraph.pl or speedscope"
+        )
+
+
+class AllocationTracer:
+    """
+    Traces allocations with tracemalloc over the whole run. Every `profile_phase`
+    only reads the traced totals, accumulating the memory each phase still holds
+    when it ends and its peak; the allocating source lines come from the one
+    snapshot taken at the end of the run, tracing having started empty.
+    """
+
+    def __init__(self, frames: int = 1) -> None:
+        self.frames = frames
+        self.retained_by_phase: Counter = Counter()
+        self.peak_by_phase: Dict[str, int] = {}
+        self.calls_by_phase: Counter = Counter()
+        self.final_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self):
+        tracemalloc.start(self.frames)
+
+    def stop(self):
+        self.final_snapshot = tracemalloc.take_snapshot().filter_traces(
+            _PROFILER_FILTERS
+        )
+        tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            self.retained_by_phase[name] += after - current
+            self.peak_by_phase[name] = max(
+                self.peak_by_phase.get(name, 0), peak - current
+            )
+            self.calls_by_phase[name] += 1
+
+    def write_report(self, path: str, top: int = 20):
+        with open(path, "w") as f:
+            for name, calls in self.calls_by_phase.items():
+                f.write(
+                    f"## {name}: {calls} calls, "
+                    f"peak {self.peak_by_phase[name] / 1024:,.1f} KiB above start, "
+                    f"{self.retained_by_phase[name] / 1024:,.1f} KiB retained\n"
+                )
+            f.write("\n")
+            if self.final_snapshot is None:
+                return
+            f.write("## still allocated at the end of the run\n")
+            for stat in self.final_snapshot.statistics("lineno")[:top]:
+                f.write(f"{stat.size / 1024:>12,.1f} KiB  {stat.traceback}\n")
+        logger.info(f"Wrote allocation report to {path}")
+
+
+@contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """
+    Mark a synchronous section (no awaits inside) for the CPU and allocation
+    reports. Does nothing unless the run was started with profiling.
+    """
+    global _current_phase
+    previous_phase, _current_phase = _current_phase, name
+    try:
+        if _allocation_tracer is None:
+            yield
+        else:
+            with _allocation_tracer.phase(name):
+                yield
+    finally:
+        _current_phase = previous_phase
+
+
+@contextmanager
+def profiled_run(
+    profile_path: Optional[str] = None,
+    trace_malloc_path: Optional[str] = None,
+) -> Iterator[None]:
+    """Profile the wrapped run, writing whichever outputs have a path."""
+    global _allocation_tracer
+    if not profile_path and not trace_malloc_path:
+        yield
+        return
+    profiler = SamplingProfiler() if profile_path else None
+    tracer = AllocationTracer() if trace_malloc_path else None
+    if tracer is not None:
+        tracer.start()
+        _allocation_tracer = tracer
+    if profiler is not None:
+        profiler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info(f"Profiled run took {time.perf_counter() - start:.1f}s")
+        if profiler is not None:
+            profiler.stop()
+            profiler.write_folded(profile_path)
+        if tracer is not None:
+            _allocation_tracer = None
+            tracer.stop()
+            tracer.write_report(trace_malloc_path)
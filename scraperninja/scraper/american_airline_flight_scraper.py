@@ -1,10 +1,16 @@
-from typing import Dict
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
 from scraperninja.constants import (
     BASE_AMERICAN_AIRLINES_URL,
 )
-from scraperninja.model.api.flight_search_request import FlightSearchRequest
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    SliceRequest,
+)
 from scraperninja.model.api.flight_search_response import (
+    FlightSearchResponse,
     ProductType,
 )
 from scraperninja.model.domain.flight import (
@@ -12,79 +18,262 @@ from scraperninja.model.domain.flight import (
     FlightMilesPrice,
     FlightTiming,
 )
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.scraper.deadline import Deadline
 from scraperninja.scraper.flight_search import BaseFlightSearchResponseApi
 
 
 class AmericanAirlineFlightScraper:
     """
     Opens a browser session for American Airlines and records all network traffic to
-    capture api calls to fetch flight details and prices.
+    capture api calls to fetch flight details and prices. With a deadline, every
+    search is cancelled once the job's budget runs out and the engines shorten
+    their own timeouts to it.
     """
 
-    def __init__(self, flight_api: BaseFlightSearchResponseApi) -> None:
+    def __init__(
+        self,
+        flight_api: BaseFlightSearchResponseApi,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
         self.flight_api = flight_api
+        self.deadline = deadline
 
     @staticmethod
     def __resolve_search_url(req: FlightSearchRequest) -> str:
         return req.to_url(f"{BASE_AMERICAN_AIRLINES_URL}/booking/search")
 
+    @staticmethod
+    def __matches_slice(
+        req: FlightSearchRequest,
+        requested_slice: SliceRequest,
+        flight: FlightSearchResponse,
+    ) -> bool:
+        return (
+            flight.departureDateTime.startswith(requested_slice.date)
+            and (
+                req.allow_origin_nearby
+                or requested_slice.orig in (flight.origin.code, flight.origin.city)
+            )
+            and (
+                req.allow_dest_nearby
+                or requested_slice.dest
+                in (flight.destination.code, flight.destination.city)
+            )
+        )
+
+    @classmethod
+    def split_flights_by_slice(
+        cls,
+        req: FlightSearchRequest,
+        flights: List[FlightSearchResponse],
+    ) -> List[List[FlightSearchResponse]]:
+        """Group the flights of a multi-slice search by the requested slice."""
+        requested_slices = req.requested_slices
+        if len(requested_slices) == 1:
+            return [flights]
+
+        flights_by_slice: List[List[FlightSearchResponse]] = [
+            [] for _ in requested_slices
+        ]
+        for flight in flights:
+            slice_index = next(
+                (
+                    index
+                    for index, requested_slice in enumerate(requested_slices)
+                    if cls.__matches_slice(req, requested_slice, flight)
+                ),
+                None,
+            )
+            if slice_index is None:
+                logging.warning(
+                    f"Skipping flight {flight.all_flight_numbers_str}, it does not "
+                    f"match any requested slice"
+                )
+                continue
+            flights_by_slice[slice_index].append(flight)
+
+        return flights_by_slice
+
+    async def __search(
+        self,
+        req: FlightSearchRequest,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        search = self.flight_api.search_flight_details(
+            self.__resolve_search_url(req),
+            direct_only=direct_only,
+        )
+        if self.deadline is None:
+            return await search
+        # The engine call runs as a task created in this scope, so it sees the
+        # deadline through remaining_timeout
+        with self.deadline.scope():
+            return await self.deadline.wait(search)
+
+    async def _search_slice(
+        self,
+        req: FlightSearchRequest,
+        direct_only: bool,
+        slice_index: int,
+    ) -> List[FlightSearchResponse]:
+        flights_by_slice = self.split_flights_by_slice(
+            req, await self.__search(req, direct_only)
+        )
+        if slice_index > 0 and not flights_by_slice[slice_index]:
+            # The itinerary api answers the slice of its queryParams.sliceIndex,
+            # the first one for a new search, so the later slices of a multi-slice
+            # search may be missing from it: search that leg on its own
+            logging.info(
+                f"No flights of slice {slice_index} in the multi-slice response, "
+                f"searching it one way"
+            )
+            return await self.__search(req.slice_request(slice_index), direct_only)
+        return flights_by_slice[slice_index]
+
     async def scrape_cash_prices(
         self,
         req: FlightSearchRequest,
         product_type: ProductType,
         direct_only: bool,
+        per_passenger: bool = False,
+        min_seats: int = 1,
+        slice_index: int = 0,
     ):
-        flight_cash_price_by_flight_number: Dict[str, FlightCashPrice] = {}
-        cash_flights_responses = await self.flight_api.search_flight_details(
-            self.__resolve_search_url(req),
+        cash_prices_by_product_type = await self.scrape_cash_prices_by_product_type(
+            req,
+            product_types=[product_type],
             direct_only=direct_only,
+            per_passenger=per_passenger,
+            min_seats=min_seats,
+            slice_index=slice_index,
+        )
+        return cash_prices_by_product_type[product_type]
+
+    async def scrape_cash_prices_by_product_type(
+        self,
+        req: FlightSearchRequest,
+        product_types: List[ProductType],
+        direct_only: bool,
+        per_passenger: bool = False,
+        min_seats: int = 1,
+        slice_index: int = 0,
+    ):
+        """
+        Extract every requested cabin's cash price from a single search. With
+        `per_passenger` the price of a single traveller is returned, fares with
+        fewer than `min_seats` seats remaining are skipped.
+        """
+        flight_cash_price_by_product_type: Dict[
+            ProductType, Dict[str, FlightCashPrice]
+        ] = {product_type: {} for product_type in product_types}
+        cash_flights_responses = await self._search_slice(
+            req,
+            direct_only=direct_only,
+            slice_index=slice_index,
         )
 
         for flight in cash_flights_responses:
-            flight_cash_price = flight.get_cheapest_cash_price(
-                product_type=product_type,
-            )
-            if not flight_cash_price:
-                continue
-            flight_cash_price_by_flight_number[flight.all_flight_numbers_str] = (
-                flight_cash_price
-            )
+            for product_type in product_types:
+                flight_cash_price = flight.get_cheapest_cash_price(
+                    product_type=product_type,
+                    per_passenger=per_passenger,
+                    min_seats=min_seats,
+                )
+                if not flight_cash_price:
+                    continue
+                cash_prices = flight_cash_price_by_product_type[product_type]
+                # Nearby airport searches can return the same itinerary more than
+                # once, keep its cheapest fare
+                known_price = cash_prices.get(flight.all_flight_numbers_str)
+                if known_price and known_price.price <= flight_cash_price.price:
+                    continue
+                cash_prices[flight.all_flight_numbers_str] = flight_cash_price
 
-        return flight_cash_price_by_flight_number
+        return flight_cash_price_by_product_type
 
     async def scrape_miles_prices(
         self,
         req: FlightSearchRequest,
         product_type: ProductType,
         direct_only: bool,
+        min_seats: int = 1,
+        slice_index: int = 0,
     ):
-        flight_miles_price_by_flight_number: Dict[str, FlightMilesPrice] = {}
-        miles_flight_responses = await self.flight_api.search_flight_details(
-            self.__resolve_search_url(req),
+        miles_prices_by_product_type = await self.scrape_miles_prices_by_product_type(
+            req,
+            product_types=[product_type],
+            direct_only=direct_only,
+            min_seats=min_seats,
+            slice_index=slice_index,
+        )
+        return miles_prices_by_product_type[product_type]
+
+    async def scrape_miles_prices_by_product_type(
+        self,
+        req: FlightSearchRequest,
+        product_types: List[ProductType],
+        direct_only: bool,
+        min_seats: int = 1,
+        slice_index: int = 0,
+    ):
+        """
+        Extract every requested cabin's per passenger award price from a single
+        search, skipping fares with fewer than `min_seats` seats remaining.
+        """
+        flight_miles_price_by_product_type: Dict[
+            ProductType, Dict[str, FlightMilesPrice]
+        ] = {product_type: {} for product_type in product_types}
+        miles_flight_responses = await self._search_slice(
+            req,
             direct_only=direct_only,
+            slice_index=slice_index,
         )
 
         for flight in miles_flight_responses:
-            flight_miles_required = flight.get_miles_required(
-                product_type=product_type,
-            )
-            if flight_miles_required is None:
-                continue
-            flight_miles_price_by_flight_number[flight.all_flight_numbers_str] = (
-                flight_miles_required
-            )
+            for product_type in product_types:
+                flight_miles_required = flight.get_miles_required(
+                    product_type=product_type,
+                    min_seats=min_seats,
+                )
+                if flight_miles_required is None:
+                    continue
+                miles_prices = flight_miles_price_by_product_type[product_type]
+                if not self.is_cheaper_award(
+                    flight_miles_required,
+                    miles_prices.get(flight.all_flight_numbers_str),
+                ):
+                    continue
+                miles_prices[flight.all_flight_numbers_str] = flight_miles_required
+
+        return flight_miles_price_by_product_type
 
-        return flight_miles_price_by_flight_number
+    @staticmethod
+    def is_cheaper_award(
+        price: FlightMilesPrice,
+        known_price: Optional[FlightMilesPrice],
+    ) -> bool:
+        """Compare award prices by points, a fare without points sorts last."""
+        if known_price is None:
+            return True
+        if price.points_required is None:
+            return False
+        return (
+            known_price.points_required is None
+            or price.points_required < known_price.points_required
+        )
 
     async def scrape_flight_timing(
         self,
         req: FlightSearchRequest,
         direct_only: bool,
+        slice_index: int = 0,
     ):
         flight_timing_by_flight_number: Dict[str, FlightTiming] = {}
-        flight_responses = await self.flight_api.search_flight_details(
-            self.__resolve_search_url(req),
+        flight_responses = await self._search_slice(
+            req,
             direct_only=direct_only,
+            slice_index=slice_index,
         )
 
         for flight in flight_responses:
@@ -96,3 +285,50 @@ class AmericanAirlineFlightScraper:
             )
 
         return flight_timing_by_flight_number
+
+    @staticmethod
+    def build_flight_records(
+        flight_timings: Dict[str, FlightTiming],
+        flight_cash_prices: Dict[str, FlightCashPrice],
+        flight_miles_prices: Dict[str, FlightMilesPrice],
+        product_type: ProductType,
+        slice_index: int = 0,
+    ) -> List[FlightRecord]:
+        flight_records: List[FlightRecord] = []
+        for flight_number, flight_timing in flight_timings.items():
+            cash_price = flight_cash_prices.get(flight_number)
+            mile_price = flight_miles_prices.get(flight_number)
+            if not cash_price or not mile_price:
+                logging.warning(
+                    f"Skipping {product_type.value} flight {flight_number} due to "
+                    "missing data: "
+                    f"timing={flight_timing}, cash_price={cash_price}, "
+                    f"mile_price={mile_price}"
+                )
+                continue
+
+            flight_records.append(
+                FlightRecord.from_parts(
+                    flight_timing,
+                    cash_price,
+                    mile_price,
+                    product_type=product_type,
+                    slice_index=slice_index,
+                )
+            )
+
+        return flight_records
+
+    @staticmethod
+    def group_by_airport_pair(
+        flight_records: List[FlightRecord],
+    ) -> Dict[Tuple[str, str], List[FlightRecord]]:
+        """Group records by the airports actually flown, for nearby airport runs."""
+        flight_records_by_airport_pair: Dict[Tuple[str, str], List[FlightRecord]] = (
+            defaultdict(list)
+        )
+        for flight_record in flight_records:
+            flight_records_by_airport_pair[
+                (flight_record.origin or "", flight_record.destination or "")
+            ].append(flight_record)
+        return dict(flight_records_by_airport_pair)
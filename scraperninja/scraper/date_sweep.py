@@ -0,0 +1,295 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Dict, List, Optional
+
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.api.flight_search_request import PaymentType
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.domain.flight import FlightMilesPrice
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.scraper.american_airline_flight_scraper import (
+    AmericanAirlineFlightScraper,
+)
+from scraperninja.scraper.deadline import Deadline, DeadlineExceededError
+from scraperninja.scraper.flight_search import BaseFlightSearchResponseApi
+
+
+@dataclass
+class DateSweepDay:
+    date: str
+    min_points: Optional[int] = None
+    estimated_max_cpp: Optional[float] = None
+    revenue_searched: bool = False
+    skipped_reason: Optional[str] = None
+    error: Optional[str] = None
+    flight_records: List[FlightRecord] = field(default_factory=list)
+
+    @property
+    def best_cpp(self) -> Optional[float]:
+        cpps = [record.cpp for record in self.flight_records if record.cpp]
+        return max(cpps) if cpps else None
+
+    def to_report(self) -> dict:
+        return {
+            "date": self.date,
+            "min_points": self.min_points,
+            "estimated_max_cpp": self.estimated_max_cpp,
+            "revenue_searched": self.revenue_searched,
+            "skipped_reason": self.skipped_reason,
+            "error": self.error,
+            "flights": len(self.flight_records),
+            "best_cpp": self.best_cpp,
+        }
+
+
+@dataclass
+class DateSweepResult:
+    days: List[DateSweepDay]
+    award_searches: int
+    revenue_searches: int
+    stopped_early: bool
+
+    @property
+    def failed_dates(self) -> List[str]:
+        return [day.date for day in self.days if day.error is not None]
+
+    def best_flight_records(self, limit: int = 10) -> List[FlightRecord]:
+        flight_records = [
+            record for day in self.days for record in day.flight_records if record.cpp
+        ]
+        return sorted(flight_records, key=lambda record: record.cpp, reverse=True)[
+            :limit
+        ]
+
+
+class DateSweep:
+    """
+    Best CPP over `params.date` +/- `window_days` on one warmed flight api, past
+    dates left out. Dates are swept from the requested date outwards in waves of
+    `concurrency` dates: award searches first, then revenue searches only for
+    dates whose estimated max CPP can still beat the best CPP found so far. The
+    sweep stops once `target_cpp` is reached. A date whose searches fail is
+    reported with its error and the sweep goes on; it only fails when every date
+    did.
+
+    Award searches carry no cash price, so the estimate divides a cash ceiling by
+    the fewest points of the date: the most expensive cash fare seen so far in
+    that cabin times `cash_margin`. This is a heuristic, not a bound: a date
+    whose fares are more than `cash_margin` times pricier than any seen can be
+    skipped wrongly. Until a cabin has a revenue search, its dates are never
+    skipped.
+    """
+
+    logger = logging.getLogger(f"{__name__}")
+    DEADLINE_ERROR = "deadline exceeded"
+
+    def __init__(
+        self,
+        flight_api: BaseFlightSearchResponseApi,
+        params: AnalysisParams,
+        window_days: int,
+        target_cpp: Optional[float] = None,
+        cash_margin: float = 1.25,
+        concurrency: int = 2,
+        deadline: Optional[Deadline] = None,
+        today: Optional[date] = None,
+    ) -> None:
+        if params.additional_slices:
+            raise ValueError("Date sweeps only support one way searches")
+        self.scraper = AmericanAirlineFlightScraper(flight_api, deadline)
+        self.params = params
+        self.window_days = window_days
+        self.target_cpp = target_cpp
+        self.cash_margin = cash_margin
+        self.concurrency = concurrency
+        self.today = today
+        self.max_cash_by_cabin: Dict[ProductType, float] = {}
+        self.best_cpp = 0.0
+        self.award_searches = 0
+        self.revenue_searches = 0
+        self._last_error: Optional[Exception] = None
+
+    def sweep_dates(self) -> List[str]:
+        """
+        The requested date first, then alternately one day earlier and later,
+        leaving out the dates before today which can no longer be booked.
+        """
+        today = self.today or date.today()
+        center = date.fromisoformat(self.params.date)
+        offsets = [0]
+        for distance in range(1, self.window_days + 1):
+            offsets.extend([-distance, distance])
+        return [
+            (center + timedelta(days=offset)).isoformat()
+            for offset in offsets
+            if center + timedelta(days=offset) >= today
+        ]
+
+    async def run(self) -> DateSweepResult:
+        days: List[DateSweepDay] = []
+        dates = self.sweep_dates()
+        stopped_early = False
+        for wave_start in range(0, len(dates), self.concurrency):
+            wave = [
+                DateSweepDay(date=sweep_date)
+                for sweep_date in dates[wave_start : wave_start + self.concurrency]
+            ]
+            days.extend(wave)
+            await self.__sweep_wave(wave)
+            if any(day.error == self.DEADLINE_ERROR for day in wave):
+                stopped_early = wave_start + self.concurrency < len(dates)
+                self.logger.warning("Deadline exceeded, ending the sweep")
+                break
+            if self.target_cpp is not None and self.best_cpp >= self.target_cpp:
+                stopped_early = wave_start + self.concurrency < len(dates)
+                self.logger.info(
+                    f"Target CPP {self.target_cpp} reached with {self.best_cpp:.2f}"
+                )
+                break
+
+        result = DateSweepResult(
+            days=days,
+            award_searches=self.award_searches,
+            revenue_searches=self.revenue_searches,
+            stopped_early=stopped_early,
+        )
+        self.logger.info(
+            f"Swept {len(days)} of {len(dates)} dates with {self.award_searches} "
+            f"award and {self.revenue_searches} revenue searches, "
+            f"{len(result.failed_dates)} failed {result.failed_dates}"
+        )
+        if days and len(result.failed_dates) == len(days):
+            # Nothing to report, let the caller retry the whole sweep
+            raise self._last_error
+        return result
+
+    async def __sweep_wave(self, wave: List[DateSweepDay]):
+        miles_prices = await self.__gather_per_day(
+            wave, [self.__scrape_award(day) for day in wave]
+        )
+
+        revenue_days = []
+        for day, miles_by_cabin in zip(wave, miles_prices):
+            if day.error is not None:
+                continue
+            points = [
+                miles.points_required
+                for miles_by_flight in miles_by_cabin.values()
+                for miles in miles_by_flight.values()
+                if miles.points_required
+            ]
+            if not points:
+                day.skipped_reason = "no award space"
+                continue
+            day.min_points = min(points)
+            day.estimated_max_cpp = self.__estimate_max_cpp(miles_by_cabin)
+            if (
+                day.estimated_max_cpp is not None
+                and day.estimated_max_cpp <= self.best_cpp
+            ):
+                day.skipped_reason = (
+                    f"estimated max CPP {day.estimated_max_cpp:.2f} below best "
+                    f"{self.best_cpp:.2f}"
+                )
+                continue
+            revenue_days.append((day, miles_by_cabin))
+
+        await self.__gather_per_day(
+            [day for day, _ in revenue_days],
+            [self.__scrape_revenue(day, miles) for day, miles in revenue_days],
+        )
+
+    async def __gather_per_day(
+        self, days: List[DateSweepDay], searches: List[Awaitable]
+    ) -> list:
+        """Results of the searches of `days`, recording the error of failed days."""
+        results = await asyncio.gather(*searches, return_exceptions=True)
+        for day, result in zip(days, results):
+            if not isinstance(result, BaseException):
+                continue
+            if not isinstance(result, Exception):
+                raise result
+            self.logger.warning(f"Sweep of {day.date} failed: {result}")
+            self._last_error = result
+            day.error = (
+                self.DEADLINE_ERROR
+                if isinstance(result, DeadlineExceededError)
+                else f"{type(result).__name__}: {result}"
+            )
+        return results
+
+    def __estimate_max_cpp(
+        self, miles_by_cabin: Dict[ProductType, Dict[str, FlightMilesPrice]]
+    ) -> Optional[float]:
+        bounds = []
+        for cabin, miles_by_flight in miles_by_cabin.items():
+            points = [
+                miles.points_required
+                for miles in miles_by_flight.values()
+                if miles.points_required
+            ]
+            if not points:
+                continue
+            max_cash = self.max_cash_by_cabin.get(cabin)
+            if max_cash is None:
+                return None
+            bounds.append(max_cash * self.cash_margin * 100 / min(points))
+        return max(bounds) if bounds else None
+
+    async def __scrape_award(
+        self, day: DateSweepDay
+    ) -> Dict[ProductType, Dict[str, FlightMilesPrice]]:
+        self.award_searches += 1
+        return await self.scraper.scrape_miles_prices_by_product_type(
+            self.__search_request(day, PaymentType.AWARD),
+            product_types=self.params.cabin_classes,
+            direct_only=self.params.direct_only,
+            min_seats=self.params.passengers,
+        )
+
+    async def __scrape_revenue(
+        self,
+        day: DateSweepDay,
+        miles_by_cabin: Dict[ProductType, Dict[str, FlightMilesPrice]],
+    ):
+        self.revenue_searches += 1
+        day.revenue_searched = True
+        cash_search_req = self.__search_request(day, PaymentType.REVENUE)
+        flight_timings = await self.scraper.scrape_flight_timing(
+            cash_search_req, direct_only=self.params.direct_only
+        )
+        cash_by_cabin = await self.scraper.scrape_cash_prices_by_product_type(
+            cash_search_req,
+            product_types=self.params.cabin_classes,
+            direct_only=self.params.direct_only,
+            per_passenger=self.params.per_passenger,
+            min_seats=self.params.passengers,
+        )
+
+        for cabin in self.params.cabin_classes:
+            day.flight_records.extend(
+                AmericanAirlineFlightScraper.build_flight_records(
+                    flight_timings,
+                    cash_by_cabin[cabin],
+                    miles_by_cabin[cabin],
+                    product_type=cabin,
+                )
+            )
+            cash_amounts = [cash.price.amount for cash in cash_by_cabin[cabin].values()]
+            if cash_amounts:
+                self.max_cash_by_cabin[cabin] = max(
+                    self.max_cash_by_cabin.get(cabin, 0.0), *cash_amounts
+                )
+        self.best_cpp = max(self.best_cpp, day.best_cpp or 0.0)
+        if self.params.per_passenger:
+            day.flight_records = [
+                record.for_passengers(self.params.passengers)
+                for record in day.flight_records
+            ]
+
+    def __search_request(self, day: DateSweepDay, search_type: PaymentType):
+        return self.params.model_copy(update={"date": day.date}).to_search_request(
+            search_type
+        )
@@ -0,0 +1,100 @@
+import asyncio
+import contextlib
+import time
+from contextvars import ContextVar, copy_context
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from tenacity import RetryCallState
+
+T = TypeVar("T")
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "deadline", default=None
+)
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+class Deadline:
+    """
+    Wall time budget of one job. The entry point creates it and hands it down to
+    the retries and the scraper, which scopes it around every engine call so the
+    engines read it back with `remaining_timeout`. Each step waits at most for its
+    usual timeout and never past the end of the budget.
+    """
+
+    def __init__(
+        self,
+        budget_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget_seconds = budget_seconds
+        self.clock = clock
+        self.expires_at = clock() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap_seconds: Optional[float] = None) -> float:
+        """Seconds a step may take, raises DeadlineExceededError once expired."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline of {self.budget_seconds}s exceeded")
+        return remaining if cap_seconds is None else min(cap_seconds, remaining)
+
+    async def wait(
+        self, awaitable: Awaitable[T], cap_seconds: Optional[float] = None
+    ) -> T:
+        """Await under the deadline, cancelling the awaitable when it runs out."""
+        try:
+            timeout = self.timeout(cap_seconds)
+        except DeadlineExceededError:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            if self.expired:
+                raise DeadlineExceededError(
+                    f"Deadline of {self.budget_seconds}s exceeded"
+                ) from None
+            raise
+
+    def stop_retrying(self, retry_state: RetryCallState) -> bool:
+        """Tenacity stop condition: no retry whose backoff would outlive the budget."""
+        return (retry_state.upcoming_sleep or 0) >= self.remaining()
+
+    @contextlib.contextmanager
+    def scope(self) -> Iterator["Deadline"]:
+        token = _current_deadline.set(self)
+        try:
+            yield self
+        finally:
+            _current_deadline.reset(token)
+
+    @staticmethod
+    def current() -> Optional["Deadline"]:
+        return _current_deadline.get()
+
+
+def remaining_timeout(cap_seconds: Optional[float] = None) -> Optional[float]:
+    """`cap_seconds` shortened to the deadline in scope, if any."""
+    deadline = Deadline.current()
+    return cap_seconds if deadline is None else deadline.timeout(cap_seconds)
+
+
+def without_deadline(function: Callable[..., T], *args: Any) -> T:
+    """
+    Call `function` in a copy of the context with no deadline in scope. A task it
+    creates is not bound by the budget of the caller that happened to start it.
+    """
+    context = copy_context()
+    context.run(_current_deadline.set, None)
+    return context.run(function, *args)
@@ -1,16 +1,44 @@
+import importlib
+
 from scraperninja.scraper.flight_search.base_flight_search_response_api import (
     BaseFlightSearchResponseApi,
 )
 
-from .camou_fox_browser_flight_search_api import (
-    CamouFoxBrowserNetworkFlightSearchResponseApi,
-)
-from .chrome_browser_flight_search_api import (
-    ChromeBrowserNetworkFlightSearchResponseApi,
+from .coalescing_flight_search_api import CoalescingFlightSearchResponseApi
+from .hedged_flight_search_api import HedgedFlightSearchResponseApi, HedgeStats
+from .http_flight_search_api import HttpFlightSearchResponseApi
+from .proxy_session_cache import ProxySessionCache
+from .recycling_flight_search_api import (
+    BrowserMemoryBudget,
+    RecyclingFlightSearchResponseApi,
 )
 
+# Imported on first use: the browser packages need their browsers installed
+# (camoufox fetch) to import, which the wrappers above do not
+_BROWSER_ENGINE_MODULES = {
+    "CamouFoxBrowserNetworkFlightSearchResponseApi": (
+        ".camou_fox_browser_flight_search_api"
+    ),
+    "ChromeBrowserNetworkFlightSearchResponseApi": ".chrome_browser_flight_search_api",
+}
+
+
+def __getattr__(name: str):
+    module_name = _BROWSER_ENGINE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
+
+
 __all__ = [
     "BaseFlightSearchResponseApi",
+    "BrowserMemoryBudget",
     "CamouFoxBrowserNetworkFlightSearchResponseApi",
     "ChromeBrowserNetworkFlightSearchResponseApi",
+    "CoalescingFlightSearchResponseApi",
+    "HedgedFlightSearchResponseApi",
+    "HedgeStats",
+    "HttpFlightSearchResponseApi",
+    "ProxySessionCache",
+    "RecyclingFlightSearchResponseApi",
 ]
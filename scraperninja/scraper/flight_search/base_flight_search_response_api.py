@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.domain.browser_session import BrowserSession
+from scraperninja.profiling import profile_phase
+from scraperninja.scraper.slice_store import SliceStore
 
 
 class BaseFlightSearchResponseApi(ABC):
@@ -12,3 +15,36 @@ class BaseFlightSearchResponseApi(ABC):
         direct_only: bool,
     ) -> List["FlightSearchResponse"]:
         pass
+
+    async def harvest_session(self) -> BrowserSession:
+        """Re-warm the browser and return its cookies, for browser engines only."""
+        raise NotImplementedError(f"{type(self).__name__} has no browser session")
+
+
+def parse_itinerary_response(
+    itinerary_response: dict,
+    slice_store: Optional[SliceStore] = None,
+) -> List[FlightSearchResponse]:
+    """
+    Parse the slices of an itinerary api response body, reusing the slices the
+    store has already parsed.
+    """
+    with profile_phase("parse"):
+        if slice_store is not None:
+            return [
+                slice_store.parse(slice_dict)
+                for slice_dict in itinerary_response["slices"]
+            ]
+        return [
+            FlightSearchResponse.model_validate(slice_dict)
+            for slice_dict in itinerary_response["slices"]
+        ]
+
+
+def filter_direct_flights(
+    flights: List[FlightSearchResponse],
+    direct_only: bool,
+) -> List[FlightSearchResponse]:
+    if not direct_only:
+        return flights
+    return [flight for flight in flights if flight.is_direct_flight]
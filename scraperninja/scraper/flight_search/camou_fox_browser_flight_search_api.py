@@ -1,40 +1,59 @@
 import asyncio
+import json
 import logging
-from typing import Callable, Iterable, List, Optional
+from collections import defaultdict, deque
+from functools import cached_property, partial
+from typing import Callable, Deque, Dict, List, Optional, Pattern, Set
 
-from playwright.sync_api import Page, Request, Response
+from playwright.async_api import async_playwright
+from playwright.sync_api import BrowserContext, Page, Request, Route
 from pydantic import BaseModel
 from scrapling.fetchers import AsyncStealthySession
 
 from scraperninja.constants import (
     BASE_AMERICAN_AIRLINES_URL,
+    DEFAULT_TIMEOUT_MILISECONDS,
     MAIN_PAGE_CSS_SELECTOR,
-    RESULT_GRID_CONTAINER_CLASS_SELECTOR,
     SEARCH_ITINERARY_URL,
 )
 from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.domain.browser_session import BrowserSession
 from scraperninja.model.proxy_settings import proxySettings
+from scraperninja.scraper.deadline import remaining_timeout
 from scraperninja.scraper.flight_search.base_flight_search_response_api import (
     BaseFlightSearchResponseApi,
+    filter_direct_flights,
+    parse_itinerary_response,
 )
-
-NetworkRequestPredicate = Callable[[Request], bool]
-NetworkResponsePredicate = Callable[[Response], bool]
+from scraperninja.scraper.slice_store import SliceStore
 
 
 class CamouFoxBrowserNetworkFlightSearchResponseApi(BaseFlightSearchResponseApi):
     """
     American Airlines browser network scraper implementation for flight search
     responses. Uses StealthySession and PageNetworkSpy to capture flight data.
+    Up to `max_tabs` searches run concurrently as tabs of the same browser context,
+    the session's PageNetworkSpy hands each tab the itinerary response of its own
+    search. With `browser_server` (the websocket endpoint
+    of a `browser_server.py --engine camoufox`), the context is a fresh one of that
+    browser instead of a browser of its own.
     """
 
-    def __init__(self, proxy_url: Optional[str] = None) -> None:
-        self.network_spy = PageNetworkSpy(
-            req_predicates=[searchItineraryFilter],
-            res_predicates=[searchItineraryFilter],
+    def __init__(
+        self,
+        proxy_url: Optional[str] = None,
+        max_tabs: int = 1,
+        itinerary_url: str = SEARCH_ITINERARY_URL,
+        slice_store: Optional[SliceStore] = None,
+        browser_server: Optional[str] = None,
+    ) -> None:
+        session_cls = (
+            partial(AttachedStealthySession, browser_server)
+            if browser_server
+            else AsyncStealthySession
         )
-        self.session = AsyncStealthySession(
-            page_action=self.network_spy.spy,
+        self.session = session_cls(
+            max_pages=max_tabs,
             humanize=True,
             os_randomize=True,
             google_search=True,
@@ -42,17 +61,31 @@ class CamouFoxBrowserNetworkFlightSearchResponseApi(BaseFlightSearchResponseApi)
             headless=False,
             proxy=proxy_url,
         )
+        self.itinerary_url = itinerary_url
+        self.slice_store = slice_store
         self.cache = {}
+        self.network_spy = PageNetworkSpy(itinerary_url, page_key=self._search_url_of)
 
     async def __aenter__(self):
         await self.session.__aenter__()
+        # On the context, so the route is in place before any tab navigates
+        await self.network_spy.spy(self.session.context)
         await self._warm_up_session()
         return self
 
     async def __aexit__(self, _exc_type, _exc_value, _traceback):
+        logging.info(f"Itinerary capture: {self.network_spy.summary()}")
+        self.network_spy.clear()
         await self.session.__aexit__(_exc_type, _exc_value, _traceback)
         return False
 
+    def _search_url_of(self, page: Page) -> Optional[str]:
+        """The url a search tab was opened for, as marked in the session page pool."""
+        for page_info in self.session.page_pool.pages:
+            if page_info.page is page:
+                return page_info.url
+        return None
+
     async def _warm_up_session(self):
         """Pre-warm the session by visiting AA homepage to establish proper context."""
         logging.info("Warming up session with AA homepage")
@@ -64,80 +97,202 @@ class CamouFoxBrowserNetworkFlightSearchResponseApi(BaseFlightSearchResponseApi)
         except Exception as e:
             logging.warning(f"Session warm-up failed, continuing anyway: {e}")
 
+    async def _release_pages(self, search_url: str):
+        """
+        The session only closes a page when fetch succeeds, so failed or cancelled
+        searches would otherwise keep their tab slot forever.
+        """
+        for page_info in list(self.session.page_pool.pages):
+            if page_info.url != search_url:
+                continue
+            self.session.page_pool.pages.remove(page_info)
+            try:
+                await page_info.page.close()
+            except Exception as e:
+                logging.debug(f"Failed to close page of {search_url}: {e}")
+
+    async def harvest_session(self) -> BrowserSession:
+        user_agent = []
+
+        async def read_user_agent(page: Page):
+            user_agent.append(await page.evaluate("navigator.userAgent"))
+
+        try:
+            await self.session.fetch(
+                BASE_AMERICAN_AIRLINES_URL,
+                page_action=read_user_agent,
+                wait_selector=MAIN_PAGE_CSS_SELECTOR,
+            )
+        except Exception as e:
+            logging.warning(f"Re-warming the session failed: {e}")
+        if not user_agent:
+            raise ValueError("Could not read the browser user agent")
+        return BrowserSession.from_cookie_list(
+            await self.session.context.cookies(), user_agent=user_agent[0]
+        )
+
+    async def _capture_itinerary(self, search_url: str, page: Page):
+        """
+        Page action keeping the tab open until the itinerary response of the search
+        is captured, as it may only be requested after the page load.
+        """
+        try:
+            await self.network_spy.wait_for_response(
+                search_url,
+                timeout_seconds=remaining_timeout(DEFAULT_TIMEOUT_MILISECONDS / 1000),
+            )
+        except asyncio.TimeoutError:
+            logging.warning(f"No itinerary response captured on {page.url}")
+
     async def search_flight_details(
         self,
         search_url: str,
         direct_only: bool,
     ) -> List[FlightSearchResponse]:
-        if (search_url, direct_only) in self.cache:
-            return self.cache[(search_url, direct_only)]
+        if search_url in self.cache:
+            return filter_direct_flights(self.cache[search_url], direct_only)
         logging.info(f"Fetching search URL: {search_url}")
-        # We need to clear here since we are spying multiple times in the same session
-        # and it does not automatically clear
-        self.network_spy.clear()
-        logging.info("Waiting for result grid results to appear")
-        await self.session.fetch(
-            search_url,
-            wait_selector=RESULT_GRID_CONTAINER_CLASS_SELECTOR,
+        # Registered before the navigation, the tab's itinerary response resolves it
+        captured = self.network_spy.expect_response(search_url)
+        logging.info("Waiting for the itinerary response to be captured")
+        fetch = asyncio.ensure_future(
+            self.session.fetch(
+                search_url,
+                page_action=partial(self._capture_itinerary, search_url),
+                wait_selector=None,
+                timeout=remaining_timeout(DEFAULT_TIMEOUT_MILISECONDS / 1000) * 1000,
+            )
         )
-
-        if not self.network_spy.responses:
+        try:
+            # The session only runs the page action once the page has loaded, so
+            # race the capture against the fetch rather than waiting for the load
+            await asyncio.wait({fetch, captured}, return_when=asyncio.FIRST_COMPLETED)
+            if not captured.done():
+                # The navigation failed or the page action gave up waiting
+                await fetch
+        finally:
+            self.network_spy.forget(search_url)
+            if not fetch.done():
+                # Closing the tab below cuts the rest of the page load short
+                fetch.cancel()
+                await asyncio.gather(fetch, return_exceptions=True)
+            if fetch.cancelled() or fetch.exception() is not None:
+                # Includes cancellation, e.g. the losing side of a hedged search
+                await self._release_pages(search_url)
+
+        if captured.cancelled():
             raise ValueError("No responses captured by PageNetworkSpy")
 
         logging.info("Flight search completed. Processing captured responses...")
 
-        all_flight_details_during_day_response = self.network_spy.responses[
-            0
-        ].json_payload
-        all_flight_information_during_day = [
-            FlightSearchResponse.model_validate(slice_dict)
-            for slice_dict in all_flight_details_during_day_response["slices"]
-        ]
+        all_flight_information_during_day = parse_itinerary_response(
+            captured.result().json_payload, self.slice_store
+        )
+
+        # Cache the unfiltered slices so direct-only searches share the entry
+        self.cache[search_url] = all_flight_information_during_day
+        return filter_direct_flights(all_flight_information_during_day, direct_only)
 
-        if direct_only:
-            return [
-                flight
-                for flight in all_flight_information_during_day
-                if flight.is_direct_flight
-            ]
 
-        self.cache[(search_url, direct_only)] = all_flight_information_during_day
-        return all_flight_information_during_day
+class AttachedStealthySession(AsyncStealthySession):
+    """
+    AsyncStealthySession on a new context of a running Camoufox server. The
+    fingerprint belongs to the server's browser, the proxy to the context. Closing
+    the session closes the context and leaves the browser running.
+    """
+
+    def __init__(self, ws_endpoint: str, **session_options) -> None:
+        super().__init__(**session_options)
+        self.ws_endpoint = ws_endpoint
+
+    async def __create__(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.firefox.connect(self.ws_endpoint)
+        self.context = await self.browser.new_context(
+            proxy=self.launch_options.get("proxy")
+        )
+        if self.init_script:
+            await self.context.add_init_script(path=self.init_script)
+        if self.cookies:
+            await self.context.add_cookies(self.cookies)
 
 
 class NetworkSpiedRequest(BaseModel):
     url: str
     method: str
-    body: Optional[dict] = None
+    body_bytes: Optional[bytes] = None
+
+    @property
+    def body(self) -> Optional[dict]:
+        return json.loads(self.body_bytes) if self.body_bytes else None
 
 
 class NetworkSpiedResponse(BaseModel):
     url: str
     status: int
-    json_payload: dict
+    body: bytes
+
+    @cached_property
+    def json_payload(self) -> dict:
+        """Decoded on first access, responses nobody reads are never parsed."""
+        return json.loads(self.body)
 
 
 class PageNetworkSpy:
+    """
+    Captures the requests and responses matching `url_pattern` (an exact url or
+    glob, a regex or a url predicate, as for `route`) on every page of a browser
+    context. Only matching requests are routed to Python at all, the rest of the
+    page traffic never leaves the browser. A response is handed to the waiter of
+    its page's `page_key` (e.g. the search the tab was opened for) and its body is
+    read only when someone waits for it. Bodies are kept as raw bytes, the newest
+    `max_captured` requests and responses are kept for debugging and the counters
+    cover the whole session.
+    """
+
     logger = logging.getLogger(f"{__name__}")
 
     def __init__(
         self,
-        req_predicates: Iterable[NetworkRequestPredicate] = [],
-        res_predicates: Iterable[NetworkResponsePredicate] = [],
+        url_pattern: str | Pattern[str] | Callable[[str], bool],
+        page_key: Callable[[Page], Optional[str]],
+        max_captured: int = 8,
     ) -> None:
-        self.requests: list[NetworkSpiedRequest] = []
-        self.responses: list[NetworkSpiedResponse] = []
-        self.req_predicates = req_predicates
-        self.res_predicates = res_predicates
-
-    async def spy(self, page: Page):
-        def handle_response_sync(response: Response) -> None:
-            asyncio.create_task(self.__handle_response(response))
+        self.url_pattern = url_pattern
+        self.page_key = page_key
+        self.requests: Deque[NetworkSpiedRequest] = deque(maxlen=max_captured)
+        self.responses: Deque[NetworkSpiedResponse] = deque(maxlen=max_captured)
+        self.requests_routed = 0
+        self.responses_captured = 0
+        self.responses_failed = 0
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._pending_tasks: Dict[str, Set[asyncio.Task]] = defaultdict(set)
+
+    async def spy(self, target: BrowserContext | Page):
+        await target.route(self.url_pattern, self.__handle_route)
+
+    def expect_response(self, key: str) -> asyncio.Future:
+        """Future of the next response for `key`, register it before navigating."""
+        if key not in self._waiters:
+            self._waiters[key] = asyncio.get_running_loop().create_future()
+        return self._waiters[key]
+
+    async def wait_for_response(
+        self, key: str, timeout_seconds: float
+    ) -> NetworkSpiedResponse:
+        """Resolve with the response for `key`, or raise asyncio.TimeoutError."""
+        return await asyncio.wait_for(
+            asyncio.shield(self.expect_response(key)), timeout=timeout_seconds
+        )
 
-        page.on("request", self.__handle_request)
-        page.on("response", handle_response_sync)
+    def summary(self) -> str:
+        return (
+            f"{self.requests_routed} requests routed, {self.responses_captured} "
+            f"responses captured, {self.responses_failed} failed"
+        )
 
     def debug_print(self):
+        self.logger.debug(self.summary())
         self.logger.debug("############# Network requests #############")
         for req in self.requests:
             self.logger.debug(req)
@@ -146,44 +301,60 @@ class PageNetworkSpy:
         for res in self.responses:
             self.logger.debug(res)
 
-    def __handle_request(self, request: Request):
-        should_keep = all([predicate(request) for predicate in self.req_predicates])
-        if not should_keep:
-            self.logger.debug(
-                f"Request url {request.url}, Request method {request.method}"
-                "has been skipped"
-            )
-            return
-
+    async def __handle_route(self, route: Route):
+        request = route.request
+        self.requests_routed += 1
         self.requests.append(
             NetworkSpiedRequest(
                 url=request.url,
                 method=request.method,
-                body=request.post_data_json,
+                body_bytes=request.post_data_buffer,
             )
         )
-
-    async def __handle_response(self, response: Response):
-        should_keep = all([predicate(response) for predicate in self.res_predicates])
-        if not should_keep:
-            self.logger.debug(
-                f"Request url {response.url}, Request method {response.status} "
-                "has been skipped"
-            )
+        # Let the browser send the request itself, only the response is awaited
+        await route.continue_()
+        try:
+            key = self.page_key(request.frame.page)
+        except Exception:
+            # e.g. a service worker request, which has no frame
+            key = None
+        waiter = self._waiters.get(key)
+        if waiter is None or waiter.done():
             return
+        task = asyncio.create_task(self.__handle_response(request, waiter))
+        self._pending_tasks[key].add(task)
+        task.add_done_callback(self._pending_tasks[key].discard)
 
-        self.responses.append(
-            NetworkSpiedResponse(
+    async def __handle_response(self, request: Request, waiter: asyncio.Future):
+        try:
+            response = await request.response()
+            if response is None:
+                raise ValueError("no response")
+            spied_response = NetworkSpiedResponse(
                 url=response.url,
                 status=response.status,
-                json_payload=await response.json(),
+                body=await response.body(),
             )
-        )
+        except Exception as e:
+            self.responses_failed += 1
+            self.logger.warning(f"Failed to read response body of {request.url}: {e}")
+            return
+
+        self.responses_captured += 1
+        self.responses.append(spied_response)
+        if not waiter.done():
+            waiter.set_result(spied_response)
+
+    def forget(self, key: str):
+        """Cancel the in-flight response handlers and the pending waiter of `key`."""
+        for task in self._pending_tasks.pop(key, set()):
+            task.cancel()
+        waiter = self._waiters.pop(key, None)
+        if waiter is not None and not waiter.done():
+            waiter.cancel()
 
     def clear(self):
+        for key in list(self._waiters) + list(self._pending_tasks):
+            self.forget(key)
         self.requests.clear()
         self.responses.clear()
-
-
-def searchItineraryFilter(req: Request | Response):
-    return req.url == SEARCH_ITINERARY_URL
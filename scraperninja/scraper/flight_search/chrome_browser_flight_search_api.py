@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import List, Optional
@@ -6,73 +7,139 @@ from selenium_driverless import webdriver
 from selenium_driverless.scripts.network_interceptor import (
     InterceptedRequest,
     NetworkInterceptor,
-    RequestPattern,
 )
+from selenium_driverless.types.context import Context
+from selenium_driverless.types.target import Target
 
 from scraperninja.constants import (
-    DEFAULT_SEARCH_TIMEOUT_MILISECONDS,
+    BASE_AMERICAN_AIRLINES_URL,
+    DEFAULT_TIMEOUT_MILISECONDS,
     SEARCH_ITINERARY_URL,
 )
 from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.domain.browser_session import BrowserSession
+from scraperninja.scraper.deadline import remaining_timeout
 from scraperninja.scraper.flight_search.base_flight_search_response_api import (
     BaseFlightSearchResponseApi,
+    filter_direct_flights,
+    parse_itinerary_response,
 )
+from scraperninja.scraper.slice_store import SliceStore
 
 
 class ChromeBrowserNetworkFlightSearchResponseApi(BaseFlightSearchResponseApi):
     """
     Chrome-based flight search API using selenium-driverless.
     Intercepts American Airlines network traffic to extract flight JSON responses.
+    Up to `max_tabs` searches run concurrently as tabs of the same browser, each
+    tab with its own network interceptor. With `browser_server` (the "host:port"
+    debugger address of a `browser_server.py --engine chrome`), the tabs live in a
+    fresh incognito context of that browser instead of a browser of their own.
     """
 
     logger = logging.getLogger(__name__)
 
-    def __init__(self, proxy_url: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        proxy_url: Optional[str] = None,
+        max_tabs: int = 1,
+        itinerary_url: str = SEARCH_ITINERARY_URL,
+        slice_store: Optional[SliceStore] = None,
+        browser_server: Optional[str] = None,
+    ) -> None:
         self.proxy_url = proxy_url
-        self.options = webdriver.ChromeOptions()
-        self.options.add_argument("--disable-dev-shm-usage")
-        self.options.add_argument("--no-sandbox")
-        self.options.add_argument("--disable-gpu")
-        self.options.add_argument("--window-size=1280,720")
+        self.max_tabs = max_tabs
+        self.itinerary_url = itinerary_url
+        self.slice_store = slice_store
+        self.browser_server = browser_server
+        self.options = self.browser_options()
         self.cache = {}
-        if proxy_url:
+        if browser_server:
+            self.options.debugger_address = browser_server
+        elif proxy_url:
             self.options.add_argument(f"--proxy-server={proxy_url}")
 
+    @staticmethod
+    def browser_options() -> webdriver.ChromeOptions:
+        """Chrome flags shared by launched browsers and browser servers."""
+        options = webdriver.ChromeOptions()
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1280,720")
+        return options
+
     async def __aenter__(self):
         self.driver = await webdriver.Chrome(options=self.options).__aenter__()
+        browser: webdriver.Chrome | Context = self.driver
+        if self.browser_server:
+            # Cookies and proxy are per context, so attached engines stay as
+            # isolated as launched ones
+            self.context = await self.driver.new_context(proxy_server=self.proxy_url)
+            browser = self.context
+        self.tabs: asyncio.Queue[Target] = asyncio.Queue()
+        self.tabs.put_nowait(browser.current_target)
+        for _ in range(self.max_tabs - 1):
+            self.tabs.put_nowait(await browser.new_window("tab", activate=False))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.driver.__aexit__(exc_type, exc_val, exc_tb)
+        if not self.browser_server:
+            await self.driver.__aexit__(exc_type, exc_val, exc_tb)
+            return
+        # Quitting the driver would close the shared browser, only dispose of
+        # this engine's context and disconnect
+        await self.context.quit()
+        await self.driver.base_target.close()
 
     async def _intercept_flights(self, search_url: str) -> List[dict]:
-        response_data = []
         if search_url in self.cache:
             return self.cache[search_url]
 
+        itinerary_response: asyncio.Future = asyncio.get_running_loop().create_future()
+
         async def on_response(data: InterceptedRequest):
-            if data.request.url == SEARCH_ITINERARY_URL:
-                body_text = await data.body
-                if not body_text:
-                    return
-                if isinstance(body_text, bytes):
-                    body_text = body_text.decode("utf-8")
-                response_data.append(json.loads(body_text))
-                await data.continue_response()
-
-        async with NetworkInterceptor(
-            self.driver,
-            on_response=on_response,
-            on_request=lambda data: data.continue_request(),
-            patterns=[RequestPattern.AnyResponse, RequestPattern.AnyRequest],
-        ) as interceptor:
-            await self.driver.get(
-                search_url, wait_load=True, timeout=DEFAULT_SEARCH_TIMEOUT_MILISECONDS
-            )
-            # need to iterate to allow async callbacks to complete
-            async for data in interceptor:
-                if response_data:
-                    break
+            if data.request.url != self.itinerary_url or itinerary_response.done():
+                return
+            body_text = await data.body
+            if not body_text:
+                return
+            if isinstance(body_text, bytes):
+                body_text = body_text.decode("utf-8")
+            try:
+                itinerary_response.set_result(json.loads(body_text))
+            except json.JSONDecodeError as e:
+                itinerary_response.set_exception(e)
+
+        tab = await self.tabs.get()
+        try:
+            # Only the itinerary response is paused, every other request of the
+            # page goes through without a round trip to Python
+            async with NetworkInterceptor(
+                tab,
+                on_response=on_response,
+                patterns=[
+                    {"urlPattern": self.itinerary_url, "requestStage": "Response"}
+                ],
+            ):
+                # Resolve as soon as the itinerary body is parsed instead of waiting
+                # for the page (and the results grid) to finish loading
+                await tab.get(search_url, wait_load=False)
+                try:
+                    response_data = [
+                        await asyncio.wait_for(
+                            itinerary_response,
+                            timeout=remaining_timeout(
+                                DEFAULT_TIMEOUT_MILISECONDS / 1000
+                            ),
+                        )
+                    ]
+                except asyncio.TimeoutError:
+                    raise ValueError(f"No itinerary response captured for {search_url}")
+                finally:
+                    await tab.execute_cdp_cmd("Page.stopLoading")
+        finally:
+            self.tabs.put_nowait(tab)
 
         self.cache[search_url] = response_data
         return response_data
@@ -82,14 +149,22 @@ class ChromeBrowserNetworkFlightSearchResponseApi(BaseFlightSearchResponseApi):
     ) -> List[FlightSearchResponse]:
         """Public synchronous wrapper around async interception logic."""
         response_data = await self._intercept_flights(search_url)
-
-        all_flight_details_during_day_response = response_data[0]
-        all_flights = [
-            FlightSearchResponse.model_validate(slice_dict)
-            for slice_dict in all_flight_details_during_day_response["slices"]
-        ]
-
-        if direct_only:
-            all_flights = [f for f in all_flights if f.is_direct_flight]
-
-        return all_flights
+        all_flights = parse_itinerary_response(response_data[0], self.slice_store)
+        return filter_direct_flights(all_flights, direct_only)
+
+    async def harvest_session(self) -> BrowserSession:
+        tab = await self.tabs.get()
+        try:
+            try:
+                await tab.get(
+                    BASE_AMERICAN_AIRLINES_URL,
+                    timeout=remaining_timeout(DEFAULT_TIMEOUT_MILISECONDS / 1000),
+                )
+            except Exception as e:
+                self.logger.warning(f"Re-warming the session failed: {e}")
+            return BrowserSession.from_cookie_list(
+                await tab.get_cookies(),
+                user_agent=await tab.execute_script("return navigator.userAgent"),
+            )
+        finally:
+            self.tabs.put_nowait(tab)
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.scraper.deadline import without_deadline
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    BaseFlightSearchResponseApi,
+    filter_direct_flights,
+)
+
+
+class CoalescingFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Single-flight layer in front of another flight search api. Concurrent searches
+    for the same url share one underlying browser search and every awaiter gets the
+    same payload. The unfiltered slices are always fetched and direct_only is applied
+    afterwards, so direct-only and all-flight callers share one entry.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, flight_api: BaseFlightSearchResponseApi) -> None:
+        self.flight_api = flight_api
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.searches_started = 0
+        self.searches_coalesced = 0
+
+    async def __aenter__(self):
+        await self.flight_api.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self.flight_api.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def search_flight_details(
+        self,
+        search_url: str,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        shared_search = self.in_flight.get(search_url)
+        if shared_search is None:
+            self.searches_started += 1
+            # The shared search runs outside the deadline of the caller starting it,
+            # each caller only bounds its own wait for the result
+            shared_search = without_deadline(
+                asyncio.ensure_future,
+                self.flight_api.search_flight_details(search_url, direct_only=False),
+            )
+            self.in_flight[search_url] = shared_search
+            shared_search.add_done_callback(
+                lambda finished: self.__forget(search_url, finished)
+            )
+        else:
+            self.searches_coalesced += 1
+            self.logger.debug(f"Joining in-flight search for {search_url}")
+
+        # Shield the shared search so one cancelled awaiter does not cancel it for
+        # everybody else
+        flights = await asyncio.shield(shared_search)
+        return filter_direct_flights(flights, direct_only)
+
+    def __forget(self, search_url: str, finished: asyncio.Future) -> None:
+        if self.in_flight.get(search_url) is finished:
+            del self.in_flight[search_url]
+        if not finished.cancelled():
+            # Mark the exception as retrieved even if every awaiter was cancelled
+            finished.exception()
@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+from scraperninja.constants import (
+    DEFAULT_SEARCH_TIMEOUT_MILISECONDS,
+    DEFAULT_TIMEOUT_MILISECONDS,
+)
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    BaseFlightSearchResponseApi,
+)
+
+
+@dataclass
+class HedgeStats:
+    searches: int = 0
+    hedges_started: int = 0
+    hedge_wins: int = 0
+    # A hedge only wins while the primary is still hanging, which without hedging
+    # would have lasted at least until the capture timeout
+    estimated_latency_saved_seconds: float = 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedges_started / self.searches if self.searches else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.searches} searches, {self.hedges_started} hedged "
+            f"({self.hedge_rate:.1%}), {self.hedge_wins} won by the hedge, "
+            f"~{self.estimated_latency_saved_seconds:.1f}s latency saved"
+        )
+
+
+class HedgedFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Sends every search to the primary api and, if the itinerary has not been
+    captured within the `hedge_percentile` latency of recent searches, starts the
+    same search on the next hedge api (another session, proxy or engine). The first
+    successful result wins and the other search is cancelled. Later searches of the
+    url go straight to the winning side, which has its itinerary cached.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        primary: BaseFlightSearchResponseApi,
+        hedges: List[BaseFlightSearchResponseApi],
+        hedge_percentile: float = 0.95,
+        min_samples: int = 10,
+        latency_window: int = 200,
+        initial_hedge_delay_seconds: float = DEFAULT_SEARCH_TIMEOUT_MILISECONDS / 1000,
+        max_winners: int = 1000,
+    ) -> None:
+        self.primary = primary
+        self.hedges = hedges
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_hedge_delay_seconds = initial_hedge_delay_seconds
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.stats = HedgeStats()
+        self.max_winners = max_winners
+        self.winners: OrderedDict[str, BaseFlightSearchResponseApi] = OrderedDict()
+        self._next_hedge = itertools.cycle(hedges)
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def __aenter__(self):
+        async with AsyncExitStack() as exit_stack:
+            for flight_api in [self.primary, *self.hedges]:
+                await exit_stack.enter_async_context(flight_api)
+            self._exit_stack = exit_stack.pop_all()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.log_stats()
+        if self._exit_stack is not None:
+            await self._exit_stack.__aexit__(exc_type, exc_val, exc_tb)
+        return False
+
+    def use_sessions(
+        self,
+        primary: BaseFlightSearchResponseApi,
+        hedges: List[BaseFlightSearchResponseApi],
+    ) -> "HedgedFlightSearchResponseApi":
+        """
+        Hedge between other sessions, e.g. those of a retry's proxy, keeping the
+        latency history and the stats. The sessions are not entered.
+        """
+        self.primary = primary
+        self.hedges = hedges
+        self._next_hedge = itertools.cycle(hedges)
+        self.winners.clear()
+        return self
+
+    def log_stats(self):
+        self.logger.info(f"Hedged search stats: {self.stats}")
+
+    @property
+    def hedge_delay_seconds(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_hedge_delay_seconds
+        sorted_latencies = sorted(self.latencies)
+        index = math.ceil(self.hedge_percentile * len(sorted_latencies)) - 1
+        return sorted_latencies[max(0, index)]
+
+    async def search_flight_details(
+        self,
+        search_url: str,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        winner = self.winners.get(search_url)
+        if winner is not None:
+            # Neither a new search nor a latency sample, the winner answers from cache
+            self.winners.move_to_end(search_url)
+            return await winner.search_flight_details(search_url, direct_only)
+
+        self.stats.searches += 1
+        start = time.perf_counter()
+        sides = [self.primary]
+        searches = [
+            asyncio.ensure_future(
+                self.primary.search_flight_details(search_url, direct_only)
+            )
+        ]
+        try:
+            done, _ = await asyncio.wait(searches, timeout=self.hedge_delay_seconds)
+            if not done and self.hedges:
+                self.stats.hedges_started += 1
+                self.logger.info(
+                    f"No itinerary after {self.hedge_delay_seconds:.1f}s, "
+                    f"hedging {search_url}"
+                )
+                sides.append(next(self._next_hedge))
+                searches.append(
+                    asyncio.ensure_future(
+                        sides[-1].search_flight_details(search_url, direct_only)
+                    )
+                )
+            search, flights = await self.__first_successful(searches, start)
+            self.__remember_winner(search_url, sides[searches.index(search)])
+            return flights
+        finally:
+            for search in searches:
+                search.cancel()
+            # Let the loser release its tab before the next search needs one
+            await asyncio.gather(*searches, return_exceptions=True)
+
+    async def __first_successful(
+        self,
+        searches: List[asyncio.Future],
+        start: float,
+    ) -> Tuple[asyncio.Future, List[FlightSearchResponse]]:
+        pending = set(searches)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for search in done:
+                if search.exception() is not None and pending:
+                    self.logger.warning(
+                        f"Hedged search side failed: {search.exception()}"
+                    )
+                    continue
+                flights = search.result()
+                elapsed = time.perf_counter() - start
+                # When the hedge wins this is a lower bound of the primary latency
+                self.latencies.append(elapsed)
+                if search is not searches[0]:
+                    self.stats.hedge_wins += 1
+                    self.stats.estimated_latency_saved_seconds += max(
+                        0.0, DEFAULT_TIMEOUT_MILISECONDS / 1000 - elapsed
+                    )
+                return search, flights
+        raise RuntimeError("Hedged search finished without a result")
+
+    def __remember_winner(
+        self, search_url: str, flight_api: BaseFlightSearchResponseApi
+    ) -> None:
+        self.winners[search_url] = flight_api
+        self.winners.move_to_end(search_url)
+        while len(self.winners) > self.max_winners:
+            self.winners.popitem(last=False)
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import List, Optional
+
+from curl_cffi.requests import AsyncSession, RequestsError
+
+from scraperninja.constants import (
+    BASE_AMERICAN_AIRLINES_URL,
+    DEFAULT_SEARCH_TIMEOUT_MILISECONDS,
+    SEARCH_ITINERARY_URL,
+)
+from scraperninja.model.api.flight_search_request import FlightSearchRequest
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.domain.browser_session import BrowserSession
+from scraperninja.scraper.deadline import remaining_timeout
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    BaseFlightSearchResponseApi,
+    filter_direct_flights,
+    parse_itinerary_response,
+)
+from scraperninja.scraper.slice_store import SliceStore
+
+BLOCKED_STATUS_CODES = {401, 403, 429}
+
+
+class ItineraryBlockedError(Exception):
+    pass
+
+
+class HttpFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Calls the itinerary api directly with a pooled curl_cffi client impersonating
+    the browser's TLS and HTTP/2 fingerprint, replaying the cookies and user agent
+    harvested from `browser_api`. The browser is re-warmed every
+    `session_max_age_seconds`, and a blocked call falls back to a browser search
+    and refreshes the session before the next call.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        browser_api: BaseFlightSearchResponseApi,
+        proxy_url: Optional[str] = None,
+        max_connections: int = 10,
+        session_max_age_seconds: float = 600.0,
+        itinerary_url: str = SEARCH_ITINERARY_URL,
+        slice_store: Optional[SliceStore] = None,
+    ) -> None:
+        self.browser_api = browser_api
+        self.proxy_url = proxy_url
+        self.max_connections = max_connections
+        self.session_max_age_seconds = session_max_age_seconds
+        self.itinerary_url = itinerary_url
+        self.slice_store = slice_store
+        self.browser_session: Optional[BrowserSession] = None
+        self.http_searches = 0
+        self.browser_fallbacks = 0
+        self.cache = {}
+        self._harvest_lock = asyncio.Lock()
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def __aenter__(self):
+        # Closes the browser again when the harvest fails
+        async with AsyncExitStack() as exit_stack:
+            await exit_stack.enter_async_context(self.browser_api)
+            self.browser_session = await self.browser_api.harvest_session()
+            self.client = AsyncSession(
+                impersonate=self.__impersonate_target(self.browser_session.user_agent),
+                proxy=self.proxy_url,
+                max_clients=self.max_connections,
+                timeout=DEFAULT_SEARCH_TIMEOUT_MILISECONDS / 1000,
+            )
+            exit_stack.push_async_callback(self.client.close)
+            self._exit_stack = exit_stack.pop_all()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.logger.info(
+            f"{self.http_searches} searches over http, "
+            f"{self.browser_fallbacks} fell back to the browser"
+        )
+        if self._exit_stack is not None:
+            await self._exit_stack.__aexit__(exc_type, exc_val, exc_tb)
+        return False
+
+    @staticmethod
+    def __impersonate_target(user_agent: str) -> str:
+        # The TLS fingerprint has to match the browser the cookies came from
+        return "firefox" if "Firefox" in user_agent else "chrome"
+
+    async def search_flight_details(
+        self,
+        search_url: str,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        if search_url in self.cache:
+            return filter_direct_flights(self.cache[search_url], direct_only)
+
+        try:
+            itinerary_response = await self.__post_itinerary(search_url)
+        except (ItineraryBlockedError, RequestsError) as e:
+            self.logger.warning(f"Http search blocked, using the browser: {e}")
+            self.browser_fallbacks += 1
+            self.browser_session = None
+            return await self.browser_api.search_flight_details(search_url, direct_only)
+        self.http_searches += 1
+
+        all_flights = parse_itinerary_response(itinerary_response, self.slice_store)
+        self.cache[search_url] = all_flights
+        return filter_direct_flights(all_flights, direct_only)
+
+    async def __post_itinerary(self, search_url: str) -> dict:
+        browser_session = await self.__fresh_browser_session()
+        response = await self.client.post(
+            self.itinerary_url,
+            json=FlightSearchRequest.from_url(search_url).to_itinerary_payload(),
+            cookies=browser_session.cookies,
+            headers={
+                "User-Agent": browser_session.user_agent,
+                "Accept": "application/json, text/plain, */*",
+                "Origin": BASE_AMERICAN_AIRLINES_URL,
+                "Referer": search_url,
+            },
+            timeout=remaining_timeout(DEFAULT_SEARCH_TIMEOUT_MILISECONDS / 1000),
+        )
+        if response.status_code in BLOCKED_STATUS_CODES:
+            raise ItineraryBlockedError(f"status {response.status_code}")
+        try:
+            itinerary_response = response.json()
+        except ValueError:
+            raise ItineraryBlockedError(
+                f"status {response.status_code} without a json body"
+            )
+        if "slices" not in itinerary_response:
+            raise ItineraryBlockedError(
+                f"status {response.status_code} without slices: "
+                f"{str(itinerary_response)[:200]}"
+            )
+        return itinerary_response
+
+    async def __fresh_browser_session(self) -> BrowserSession:
+        async with self._harvest_lock:
+            if (
+                self.browser_session is None
+                or self.browser_session.age_seconds > self.session_max_age_seconds
+            ):
+                self.logger.info("Harvesting a fresh browser session")
+                self.browser_session = await self.browser_api.harvest_session()
+            return self.browser_session
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    BaseFlightSearchResponseApi,
+)
+from scraperninja.scraper.proxy_manager import ProxyManager
+
+ProxyFlightApiFactory = Callable[[Optional[str]], BaseFlightSearchResponseApi]
+
+
+class ProxySessionCache:
+    """
+    One launched and warmed flight api per egress proxy, so every search going
+    out through a proxy, retries included, reuses the same browser session and
+    fingerprint. A session is closed on the next lookup once the proxy manager has
+    blocked its proxy, and past `max_sessions` (at least the number of sessions
+    used at once) the least recently used one is closed.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        flight_api_factory: ProxyFlightApiFactory,
+        proxy_manager: ProxyManager,
+        max_sessions: int = 2,
+    ) -> None:
+        self.flight_api_factory = flight_api_factory
+        self.proxy_manager = proxy_manager
+        self.max_sessions = max_sessions
+        self.sessions: OrderedDict[Optional[str], BaseFlightSearchResponseApi] = (
+            OrderedDict()
+        )
+        self.sessions_launched = 0
+        self.sessions_reused = 0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def get(self, proxy_url: Optional[str]) -> BaseFlightSearchResponseApi:
+        async with self._lock:
+            for cached_proxy_url in list(self.sessions):
+                if self.proxy_manager.is_blocked(cached_proxy_url):
+                    await self.evict(cached_proxy_url)
+
+            session = self.sessions.get(proxy_url)
+            if session is not None:
+                self.sessions_reused += 1
+                self.sessions.move_to_end(proxy_url)
+                return session
+
+            while len(self.sessions) >= self.max_sessions:
+                await self.evict(next(iter(self.sessions)))
+            self.logger.info(f"Launching a session for proxy {proxy_url}")
+            session = self.flight_api_factory(proxy_url)
+            await session.__aenter__()
+            self.sessions_launched += 1
+            self.sessions[proxy_url] = session
+            return session
+
+    async def evict(self, proxy_url: Optional[str]):
+        session = self.sessions.pop(proxy_url, None)
+        if session is None:
+            return
+        self.logger.info(f"Closing the session of proxy {proxy_url}")
+        try:
+            await session.__aexit__(None, None, None)
+        except Exception as e:
+            self.logger.warning(f"Failed to close the session of {proxy_url}: {e}")
+
+    async def close(self):
+        for proxy_url in list(self.sessions):
+            await self.evict(proxy_url)
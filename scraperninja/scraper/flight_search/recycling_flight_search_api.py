@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, Optional
+
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.scraper.deadline import DeadlineExceededError
+from scraperninja.scraper.flight_search.base_flight_search_response_api import (
+    BaseFlightSearchResponseApi,
+)
+from scraperninja.scraper.flight_search.proxy_session_cache import (
+    ProxyFlightApiFactory,
+)
+from scraperninja.scraper.process_memory import (
+    child_pids,
+    host_used_memory_bytes,
+    tree_rss_bytes,
+)
+from scraperninja.scraper.proxy_manager import NoProxyAvailableError, ProxyManager
+
+
+class BrowserMemoryBudget:
+    """
+    Cap on the memory in use on the host before launching another browser. Share
+    one budget between all recycling engines: a launch waits until `memory_probe`
+    is below the cap, and launches are serialized so each engine can tell which new
+    processes are its browser. The host is measured rather than the processes
+    spawned here so browsers of an attached browser_server.py count as well.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        max_used_bytes: Optional[int] = None,
+        poll_interval_seconds: float = 1.0,
+        max_wait_seconds: float = 300.0,
+        memory_probe: Callable[[], int] = host_used_memory_bytes,
+    ) -> None:
+        self.max_used_bytes = max_used_bytes
+        self.memory_probe = memory_probe
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.launch_lock = asyncio.Lock()
+
+    async def wait_for_headroom(self):
+        if self.max_used_bytes is None:
+            return
+        start = time.perf_counter()
+        while (used := self.memory_probe()) >= self.max_used_bytes:
+            waited = time.perf_counter() - start
+            if waited >= self.max_wait_seconds:
+                raise MemoryError(
+                    f"Memory in use still at {used / 2**20:,.0f} MiB after "
+                    f"{waited:.0f}s, cap is {self.max_used_bytes / 2**20:,.0f} MiB"
+                )
+            self.logger.warning(
+                f"Memory in use at {used / 2**20:,.0f} MiB, over the "
+                f"{self.max_used_bytes / 2**20:,.0f} MiB cap, "
+                "delaying the browser launch"
+            )
+            await asyncio.sleep(self.poll_interval_seconds)
+
+
+class RecyclingFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Replaces the browser behind a flight search api once it has served
+    `max_searches` searches or its processes use more than `max_rss_bytes`, as
+    measured by `rss_probe` on the processes its launch spawned (none when it
+    attaches to a browser server, whose memory only the budget sees). New
+    searches wait while the old browser drains its in-flight searches, is closed,
+    and a fresh one is launched (and warmed up by its `__aenter__`).
+
+    With a `proxy_manager`, every browser is launched on the proxy it hands out. A
+    failed search blocks the proxy of its browser, which is then replaced by one
+    on the next available proxy, avoiding the `exclude_proxies` (e.g. those of the
+    primary when this is a hedge) as long as another proxy is healthy.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        flight_api_factory: ProxyFlightApiFactory,
+        max_searches: Optional[int] = None,
+        max_rss_bytes: Optional[int] = None,
+        memory_budget: Optional[BrowserMemoryBudget] = None,
+        proxy_manager: Optional[ProxyManager] = None,
+        exclude_proxies: Callable[[], List[Optional[str]]] = list,
+        rss_probe: Callable[[List[int]], int] = tree_rss_bytes,
+    ) -> None:
+        self.flight_api_factory = flight_api_factory
+        self.max_searches = max_searches
+        self.max_rss_bytes = max_rss_bytes
+        self.memory_budget = memory_budget or BrowserMemoryBudget()
+        self.proxy_manager = proxy_manager
+        self.exclude_proxies = exclude_proxies
+        self.rss_probe = rss_probe
+        self.proxy_url: Optional[str] = None
+        self.flight_api: Optional[BaseFlightSearchResponseApi] = None
+        self.browser_pids: List[int] = []
+        self.searches_served = 0
+        self.recycles = 0
+        self._in_flight = 0
+        self._recycling = False
+        self._state_changed = asyncio.Condition()
+
+    async def __aenter__(self):
+        await self.__launch()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.logger.info(
+            f"Browser recycled {self.recycles} times, "
+            f"{self.searches_served} searches on the current one"
+        )
+        await self.__close()
+        return False
+
+    @property
+    def browser_rss_bytes(self) -> int:
+        return self.rss_probe(self.browser_pids)
+
+    async def search_flight_details(
+        self,
+        search_url: str,
+        direct_only: bool,
+    ) -> List[FlightSearchResponse]:
+        await self.__admit()
+        proxy_url = self.proxy_url
+        try:
+            return await self.flight_api.search_flight_details(search_url, direct_only)
+        except DeadlineExceededError:
+            # Running out of budget says nothing about the proxy
+            raise
+        except Exception:
+            if self.proxy_manager is not None and not self.proxy_manager.is_blocked(
+                proxy_url
+            ):
+                self.logger.warning(f"Search failed, blocking proxy {proxy_url}")
+                self.proxy_manager.block_proxy_for_duration(proxy_url)
+            raise
+        finally:
+            async with self._state_changed:
+                self._in_flight -= 1
+                self.searches_served += 1
+                self._state_changed.notify_all()
+
+    def __recycle_reason(self) -> Optional[str]:
+        if self.flight_api is None:
+            return "no browser running"
+        if (
+            self.proxy_manager is not None
+            and self.proxy_manager.is_blocked(self.proxy_url)
+            # With every proxy blocked, stay on this one rather than relaunching
+            and self.__next_proxy() != self.proxy_url
+        ):
+            return f"proxy {self.proxy_url} blocked"
+        searches = self.searches_served + self._in_flight
+        if self.max_searches is not None and searches >= self.max_searches:
+            return f"served {searches} searches"
+        if self.max_rss_bytes is not None:
+            rss = self.browser_rss_bytes
+            if rss >= self.max_rss_bytes:
+                return f"using {rss / 2**20:,.0f} MiB"
+        return None
+
+    async def __admit(self):
+        async with self._state_changed:
+            await self._state_changed.wait_for(lambda: not self._recycling)
+            reason = self.__recycle_reason()
+            if reason is None:
+                self._in_flight += 1
+                return
+            self._recycling = True
+            try:
+                # Drain: searches already running finish on the old browser
+                await self._state_changed.wait_for(lambda: self._in_flight == 0)
+                self.logger.info(f"Recycling browser, {reason}")
+                # The captured searches go with the retired browser, the slices
+                # stay parsed in the shared slice store
+                await self.__close()
+                await self.__launch()
+                self.recycles += 1
+                self._in_flight += 1
+            finally:
+                self._recycling = False
+                self._state_changed.notify_all()
+
+    def __next_proxy(self) -> Optional[str]:
+        excluded = self.exclude_proxies()
+        if excluded:
+            try:
+                return self.proxy_manager.get_proxy(exclude=excluded)
+            except NoProxyAvailableError as e:
+                self.logger.warning(f"{e}, sharing a proxy with {excluded}")
+        return self.proxy_manager.get_proxy()
+
+    async def __launch(self):
+        if self.proxy_manager is not None:
+            self.proxy_url = self.__next_proxy()
+        flight_api = self.flight_api_factory(self.proxy_url)
+        async with self.memory_budget.launch_lock:
+            # Checked under the lock, so the memory of the browser launched just
+            # before is seen
+            await self.memory_budget.wait_for_headroom()
+            pids_before = set(child_pids(os.getpid()))
+            await flight_api.__aenter__()
+            self.browser_pids = [
+                pid for pid in child_pids(os.getpid()) if pid not in pids_before
+            ]
+        self.flight_api = flight_api
+        self.searches_served = 0
+
+    async def __close(self):
+        flight_api, self.flight_api = self.flight_api, None
+        self.browser_pids = []
+        if flight_api is None:
+            return
+        try:
+            await flight_api.__aexit__(None, None, None)
+        except Exception as e:
+            self.logger.warning(f"Failed to close the retired browser: {e}")
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+PROC_ROOT = Path("/proc")
+
+
+def process_rss_bytes(pid: int) -> int:
+    """Resident set size of a single process, 0 if it is gone or /proc is missing."""
+    try:
+        with open(PROC_ROOT / str(pid) / "status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return 0
+
+
+def child_pids(pid: int) -> List[int]:
+    children: List[int] = []
+    try:
+        for task_dir in (PROC_ROOT / str(pid) / "task").iterdir():
+            children.extend(
+                int(child) for child in (task_dir / "children").read_text().split()
+            )
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return children
+
+
+def descendant_pids(pid: int) -> List[int]:
+    descendants: List[int] = []
+    pending = child_pids(pid)
+    while pending:
+        child = pending.pop()
+        descendants.append(child)
+        pending.extend(child_pids(child))
+    return descendants
+
+
+def total_rss_bytes(pids: Iterable[int]) -> int:
+    return sum(process_rss_bytes(pid) for pid in pids)
+
+
+def tree_rss_bytes(pids: Iterable[int]) -> int:
+    """RSS of the processes `pids` and of everything they spawned."""
+    pids = list(pids)
+    descendants = [child for pid in pids for child in descendant_pids(pid)]
+    return total_rss_bytes(pids + descendants)
+
+
+def children_rss_bytes(pid: Optional[int] = None) -> int:
+    """
+    RSS of every process spawned below `pid`. Browsers (and the playwright driver)
+    run as children of the python process, so this is the browser memory footprint.
+    """
+    return total_rss_bytes(descendant_pids(os.getpid() if pid is None else pid))
+
+
+def host_used_memory_bytes() -> int:
+    """
+    Memory in use on the host (MemTotal - MemAvailable), 0 if /proc is missing.
+    Unlike `children_rss_bytes` it also covers browsers this process did not spawn,
+    e.g. a browser_server.py the engines attach to.
+    """
+    meminfo = {}
+    try:
+        with open(PROC_ROOT / "meminfo") as meminfo_file:
+            for line in meminfo_file:
+                name, value = line.split(":", 1)
+                meminfo[name] = int(value.split()[0]) * 1024
+    except (FileNotFoundError, PermissionError):
+        return 0
+    return meminfo.get("MemTotal", 0) - meminfo.get("MemAvailable", 0)
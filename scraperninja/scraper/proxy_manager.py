@@ -1,6 +1,10 @@
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+
+
+class NoProxyAvailableError(Exception):
+    pass
 
 
 class ProxyManager:
@@ -12,34 +16,57 @@ class ProxyManager:
         proxy_urls: List[str],
         prefer_no_proxy: bool = True,
         default_block_duration_seconds: int = 60 * 10,
+        clock: Callable[[], datetime] = datetime.now,
     ):
         self.all_available_proxy_urls = proxy_urls
         self.proxy_blocked_til: Dict[str, datetime] = {}
         self.prefer_no_proxy = prefer_no_proxy
         self.default_block_duration_seconds = default_block_duration_seconds
+        self.clock = clock
 
-    def get_proxy(self) -> Optional[str]:
+    def get_proxy(self, exclude: Optional[List[Optional[str]]] = None) -> Optional[str]:
+        """
+        First unblocked proxy, None being the direct connection, which is also the
+        fallback once everything is blocked. With `exclude` (e.g. a hedge that must
+        not share the primary's egress) there is no fallback, NoProxyAvailableError
+        tells whether no proxy is configured or none outside `exclude` is healthy.
+        """
         proxy_list = (
             [self.NO_PROXY_DUMMY_URL] + self.all_available_proxy_urls
             if self.prefer_no_proxy
             else self.all_available_proxy_urls + [self.NO_PROXY_DUMMY_URL]
         )
+        excluded_proxies = {
+            self.NO_PROXY_DUMMY_URL if proxy_url is None else proxy_url
+            for proxy_url in exclude or []
+        }
 
         for proxy in proxy_list:
+            if proxy in excluded_proxies:
+                continue
             if proxy not in self.proxy_blocked_til:
                 self.logger.info(f"Found unblocked proxy: {proxy}")
                 return self.__safe_return_proxy_url(proxy)
-            if datetime.now() >= self.proxy_blocked_til[proxy]:
+            if self.clock() >= self.proxy_blocked_til[proxy]:
                 del self.proxy_blocked_til[proxy]
                 self.logger.info(f"Unblocking proxy: {proxy}")
                 return self.__safe_return_proxy_url(proxy)
-        return None
+        if not exclude:
+            return None
+        if not self.all_available_proxy_urls:
+            raise NoProxyAvailableError("No proxy configured")
+        raise NoProxyAvailableError(f"No unblocked proxy besides {exclude}")
 
     def __safe_return_proxy_url(self, proxy_url: str) -> Optional[str]:
         if proxy_url == self.NO_PROXY_DUMMY_URL:
             return None
         return proxy_url
 
+    def is_blocked(self, proxy_url: Optional[str]) -> bool:
+        proxy_url_safe = self.NO_PROXY_DUMMY_URL if proxy_url is None else proxy_url
+        unblock_time = self.proxy_blocked_til.get(proxy_url_safe)
+        return unblock_time is not None and self.clock() < unblock_time
+
     def block_proxy_for_duration(
         self,
         proxy_url: Optional[str],
@@ -49,5 +76,5 @@ class ProxyManager:
             seconds if seconds is not None else self.default_block_duration_seconds
         )
         proxy_url_safe = self.NO_PROXY_DUMMY_URL if proxy_url is None else proxy_url
-        unblock_time = datetime.now() + timedelta(seconds=block_seconds)
+        unblock_time = self.clock() + timedelta(seconds=block_seconds)
         self.proxy_blocked_til[proxy_url_safe] = unblock_time
@@ -0,0 +1,132 @@
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+
+SliceKey = Tuple
+
+
+def _money(money: Optional[dict]) -> Optional[Tuple]:
+    return None if money is None else (money["amount"], money["currency"])
+
+
+class SliceStore:
+    """
+    Parsed slices keyed by the slice `hash` plus a fingerprint of the pricing
+    fields the scraper reads, so a slice seen again unchanged (repeat scrapes,
+    overlapping searches) is parsed once and shared. Fields outside the fingerprint,
+    like solutionID, change on every search and are not used downstream.
+    Optionally archives each distinct slice payload once under `archive_dir`, keeping
+    the `max_archived_slices` most recent. `index_archive` lists what previous runs
+    archived without reading it: a slice seen again is parsed from the payload in
+    hand, and only when it is needed.
+    """
+
+    logger = logging.getLogger(f"{__name__}")
+
+    def __init__(
+        self,
+        max_slices: int = 50_000,
+        archive_dir: Optional[str] = None,
+        max_archived_slices: int = 200_000,
+    ) -> None:
+        self.max_slices = max_slices
+        self.archive_dir = archive_dir
+        self.max_archived_slices = max_archived_slices
+        self.slices: OrderedDict[SliceKey, FlightSearchResponse] = OrderedDict()
+        # Archive paths by archive name, oldest first
+        self.archived: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.slices)
+
+    @staticmethod
+    def slice_key(slice_dict: dict) -> SliceKey:
+        """Cheaper than parsing: only the pricing scalars, no serialization."""
+        return (
+            slice_dict["hash"],
+            tuple(
+                (
+                    pricing_detail["productType"],
+                    pricing_detail["seatsRemaining"],
+                    pricing_detail["productAvailable"],
+                    pricing_detail["perPassengerAwardPoints"],
+                    _money(pricing_detail["perPassengerDisplayTotal"]),
+                    _money(pricing_detail["perPassengerTaxesAndFees"]),
+                    _money(pricing_detail.get("allPassengerDisplayTotal")),
+                    _money(
+                        (pricing_detail.get("slicePricing") or {}).get(
+                            "allPassengerDisplayTotal"
+                        )
+                    ),
+                )
+                for pricing_detail in slice_dict.get("pricingDetail", [])
+            ),
+        )
+
+    @staticmethod
+    def archive_name(slice_key: SliceKey) -> str:
+        return hashlib.blake2b(repr(slice_key).encode(), digest_size=16).hexdigest()
+
+    def parse(self, slice_dict: dict) -> FlightSearchResponse:
+        slice_key = self.slice_key(slice_dict)
+        flight = self.slices.get(slice_key)
+        if flight is not None:
+            self.hits += 1
+            self.slices.move_to_end(slice_key)
+            return flight
+
+        self.misses += 1
+        flight = FlightSearchResponse.model_validate(slice_dict)
+        self.slices[slice_key] = flight
+        if len(self.slices) > self.max_slices:
+            self.slices.popitem(last=False)
+        if self.archive_dir:
+            self.__archive(slice_key, slice_dict)
+        return flight
+
+    def index_archive(self) -> int:
+        """
+        Index the archived slices by name, oldest first, pruning the oldest past
+        `max_archived_slices`. No file is read.
+        """
+        if not self.archive_dir:
+            return 0
+        archive_mtimes = {}
+        for archive_path in glob.glob(os.path.join(self.archive_dir, "*", "*.json")):
+            with contextlib.suppress(OSError):
+                archive_mtimes[archive_path] = os.path.getmtime(archive_path)
+        for archive_path in sorted(archive_mtimes, key=archive_mtimes.get):
+            name = os.path.splitext(os.path.basename(archive_path))[0]
+            self.archived[name] = archive_path
+        self.__prune_archive()
+        self.logger.info(
+            f"Indexed {len(self.archived)} archived slices in {self.archive_dir}"
+        )
+        return len(self.archived)
+
+    def __archive(self, slice_key: SliceKey, slice_dict: dict):
+        name = self.archive_name(slice_key)
+        if name in self.archived:
+            return
+        archive_path = os.path.join(self.archive_dir, name[:2], f"{name}.json")
+        if not os.path.exists(archive_path):
+            os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+            with open(archive_path, "w") as archive_file:
+                json.dump(slice_dict, archive_file, separators=(",", ":"))
+        self.archived[name] = archive_path
+        self.__prune_archive()
+
+    def __prune_archive(self):
+        while len(self.archived) > self.max_archived_slices:
+            _, archive_path = self.archived.popitem(last=False)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(archive_path)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from platformdirs import user_cache_dir
+
+from scraperninja.model.api.flight_search_response import FlightSearchResponse
+from scraperninja.model.domain.browser_session import BrowserSession
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "itinerary_response.json"
+
+# scrapling reads the version of the camoufox install when imported, the tests
+# never launch a browser so a placeholder install does without `camoufox fetch`
+if not (Path(user_cache_dir("camoufox")) / "version.json").exists():
+    placeholder_cache_dir = tempfile.mkdtemp(prefix="camoufox-placeholder-")
+    os.makedirs(os.path.join(placeholder_cache_dir, "camoufox"))
+    with open(
+        os.path.join(placeholder_cache_dir, "camoufox", "version.json"), "w"
+    ) as version_file:
+        json.dump({"version": "135.0.1", "release": "beta.24"}, version_file)
+    os.environ["XDG_CACHE_HOME"] = placeholder_cache_dir
+
+# Imported once camoufox is found, the engines package pulls in scrapling
+from scraperninja.scraper.flight_search import BaseFlightSearchResponseApi  # noqa: E402
+
+
+def fixture_slices() -> List[dict]:
+    """Slices of the recorded LAX-JFK itinerary payload."""
+    return json.loads(FIXTURE_PATH.read_text())["slices"]
+
+
+def parse_slices(slices: List[dict]) -> List[FlightSearchResponse]:
+    return [FlightSearchResponse.model_validate(slice_dict) for slice_dict in slices]
+
+
+class FakeFlightSearchResponseApi(BaseFlightSearchResponseApi):
+    """
+    Engine answering `responses[search_url]`, the fixture slices by default. A
+    search takes `latency` seconds, waits for `release` when given, then raises
+    the next of `errors` (a list engines may share) if any. Answers are cached per
+    url like the browser engines do.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, List[dict]]] = None,
+        latency: float = 0.0,
+        release: Optional[asyncio.Event] = None,
+        errors: Optional[List[Exception]] = None,
+        proxy_url: Optional[str] = None,
+        harvest_error: Optional[Exception] = None,
+    ) -> None:
+        self.responses = responses
+        self.latency = latency
+        self.release = release
+        self.errors = [] if errors is None else errors
+        self.proxy_url = proxy_url
+        self.harvest_error = harvest_error
+        self.searches: List[Tuple[str, bool]] = []
+        self.cancelled = 0
+        self.cache: Dict[str, List[FlightSearchResponse]] = {}
+        self.entered = False
+        self.exited = False
+
+    @property
+    def searched_urls(self) -> List[str]:
+        return [search_url for search_url, _ in self.searches]
+
+    async def __aenter__(self):
+        self.entered = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.exited = True
+        return False
+
+    async def harvest_session(self) -> BrowserSession:
+        if self.harvest_error is not None:
+            raise self.harvest_error
+        return BrowserSession.from_cookie_list(
+            [{"name": "session", "value": "1"}], "Mozilla/5.0 Firefox/135.0"
+        )
+
+    async def search_flight_details(self, search_url: str, direct_only: bool):
+        self.searches.append((search_url, direct_only))
+        try:
+            await asyncio.sleep(self.latency)
+            if self.release is not None:
+                await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.errors:
+            raise self.errors.pop(0)
+        slices = (
+            fixture_slices() if self.responses is None else self.responses[search_url]
+        )
+        self.cache[search_url] = parse_slices(slices)
+        return self.cache[search_url]
+
+
+class FakeFlightApiFactory:
+    """Proxy flight api factory of fake engines sharing `errors` and `release`."""
+
+    def __init__(self, errors: Optional[List[Exception]] = None) -> None:
+        self.errors = [] if errors is None else errors
+        self.release: Optional[asyncio.Event] = None
+        self.flight_apis: List[FakeFlightSearchResponseApi] = []
+
+    def __call__(self, proxy_url: Optional[str]) -> FakeFlightSearchResponseApi:
+        self.flight_apis.append(
+            FakeFlightSearchResponseApi(
+                errors=self.errors, release=self.release, proxy_url=proxy_url
+            )
+        )
+        return self.flight_apis[-1]
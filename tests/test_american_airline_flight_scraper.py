@@ -0,0 +1,123 @@
+import asyncio
+import copy
+from typing import List
+
+from conftest import FakeFlightSearchResponseApi, fixture_slices, parse_slices
+
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+    SliceRequest,
+)
+from scraperninja.model.domain.flight import FlightMilesPrice
+from scraperninja.model.money import Money
+from scraperninja.scraper.american_airline_flight_scraper import (
+    AmericanAirlineFlightScraper,
+)
+
+RETURN_DATE = "2025-12-20"
+
+
+def return_slices() -> List[dict]:
+    """The fixture's LAX-JFK slices flown back JFK-LAX on the return date."""
+    slices = []
+    for slice_dict in copy.deepcopy(fixture_slices()):
+        slice_dict["origin"], slice_dict["destination"] = (
+            slice_dict["destination"],
+            slice_dict["origin"],
+        )
+        slice_dict["departureDateTime"] = slice_dict["departureDateTime"].replace(
+            "2025-12-15", RETURN_DATE
+        )
+        slice_dict["hash"] = f"return-{slice_dict['hash']}"
+        slices.append(slice_dict)
+    return slices
+
+
+def search_url(req: FlightSearchRequest) -> str:
+    return req.to_url("https://www.aa.com/booking/search")
+
+
+def round_trip_request() -> FlightSearchRequest:
+    return FlightSearchRequest(
+        orig="LAX",
+        dest="JFK",
+        date="2025-12-15",
+        adult=1,
+        search_type=PaymentType.REVENUE,
+        additional_slices=[SliceRequest(orig="JFK", dest="LAX", date=RETURN_DATE)],
+    )
+
+
+class TestAmericanAirlineFlightScraper:
+    def test_split_flights_by_slice(self):
+        """Test the flights of a multi-slice response go to the slice they fly."""
+        req = round_trip_request()
+        flights = parse_slices(return_slices() + fixture_slices())
+
+        outbound, inbound = AmericanAirlineFlightScraper.split_flights_by_slice(
+            req, flights
+        )
+
+        assert [flight.origin.code for flight in outbound] == ["LAX", "LAX"]
+        assert [flight.origin.code for flight in inbound] == ["JFK", "JFK"]
+        assert all(
+            flight.departureDateTime.startswith(RETURN_DATE) for flight in inbound
+        )
+
+    def test_split_skips_unrequested_flights(self):
+        """Test a flight matching no requested slice is dropped."""
+        req = round_trip_request()
+        req.additional_slices[0].date = "2025-12-21"
+
+        outbound, inbound = AmericanAirlineFlightScraper.split_flights_by_slice(
+            req, parse_slices(fixture_slices() + return_slices())
+        )
+
+        assert len(outbound) == 2
+        assert inbound == []
+
+    def test_missing_slice_searched_one_way(self):
+        """Test a slice absent from the multi-slice response gets its own search."""
+        req = round_trip_request()
+        flight_api = FakeFlightSearchResponseApi(
+            {
+                # Like the itinerary api, only the slice of sliceIndex 0
+                search_url(req): fixture_slices(),
+                search_url(req.slice_request(1)): return_slices(),
+            }
+        )
+        scraper = AmericanAirlineFlightScraper(flight_api)
+
+        timings = asyncio.run(scraper.scrape_flight_timing(req, False, slice_index=1))
+
+        assert flight_api.searched_urls == [
+            search_url(req),
+            search_url(req.slice_request(1)),
+        ]
+        assert len(timings) == 2
+
+    def test_slice_in_response_not_searched_again(self):
+        """Test a multi-slice response holding every slice costs a single search."""
+        req = round_trip_request()
+        flight_api = FakeFlightSearchResponseApi(
+            {search_url(req): fixture_slices() + return_slices()}
+        )
+        scraper = AmericanAirlineFlightScraper(flight_api)
+
+        timings = asyncio.run(scraper.scrape_flight_timing(req, False, slice_index=1))
+
+        assert flight_api.searched_urls == [search_url(req)]
+        assert len(timings) == 2
+
+    def test_award_without_points_sorts_last(self):
+        """Test a fare without award points never replaces a priced award fare."""
+        priced = FlightMilesPrice(points_required=12500, tax=Money.empty())
+        cheaper = FlightMilesPrice(points_required=10000, tax=Money.empty())
+        unpriced = FlightMilesPrice(points_required=None, tax=Money.empty())
+
+        assert AmericanAirlineFlightScraper.is_cheaper_award(unpriced, None)
+        assert not AmericanAirlineFlightScraper.is_cheaper_award(unpriced, priced)
+        assert AmericanAirlineFlightScraper.is_cheaper_award(priced, unpriced)
+        assert AmericanAirlineFlightScraper.is_cheaper_award(cheaper, priced)
+        assert not AmericanAirlineFlightScraper.is_cheaper_award(priced, priced)
@@ -0,0 +1,43 @@
+import json
+
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.batch_job import BatchJob
+
+
+class TestBatchJob:
+    def test_from_json_line_defaults(self):
+        """Test jobs only need a route and date, the id defaults to their content."""
+        job = BatchJob.from_json_line(
+            json.dumps({"origin": "LAX", "destination": "JFK", "date": "2025-12-15"})
+        )
+        assert job.job_id.startswith("LAX-JFK-2025-12-15-")
+        assert job.params.passengers == 1
+        assert job.params.cabin_classes == [ProductType.COACH]
+
+    def test_from_json_line_job_id(self):
+        """Test an explicit job_id is kept and not passed to AnalysisParams."""
+        job = BatchJob.from_json_line(
+            json.dumps(
+                {
+                    "job_id": "lax-jfk",
+                    "origin": "LAX",
+                    "destination": "JFK",
+                    "date": "2025-12-15",
+                    "cabin_classes": ["BUSINESS", "FIRST"],
+                }
+            )
+        )
+        assert job.job_id == "lax-jfk"
+        assert job.params.cabin_classes == [ProductType.BUSINESS, ProductType.FIRST]
+
+    def test_default_job_id_follows_search(self):
+        """Test the default id changes with what is searched, not how it runs."""
+        job_dict = {"origin": "LAX", "destination": "JFK", "date": "2025-12-15"}
+        job_id = BatchJob.from_json_line(json.dumps(job_dict)).job_id
+
+        reordered = {"date": "2025-12-15", "destination": "JFK", "origin": "LAX"}
+        assert BatchJob.from_json_line(json.dumps(reordered)).job_id == job_id
+        run_options = {**job_dict, "use_camoufox_browser": True, "debug": True}
+        assert BatchJob.from_json_line(json.dumps(run_options)).job_id == job_id
+        business = {**job_dict, "cabin_classes": ["BUSINESS"]}
+        assert BatchJob.from_json_line(json.dumps(business)).job_id != job_id
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+
+from scraperninja.batch.batch_runner import BatchRunner
+from scraperninja.batch.job_journal import JobJournal
+from scraperninja.batch.job_scheduler import PriorityJobScheduler
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.batch_job import BatchJob
+
+
+def build_job(job_id: str, departure: str) -> BatchJob:
+    return BatchJob(
+        job_id=job_id,
+        params=AnalysisParams(origin="LAX", destination="JFK", date=departure),
+    )
+
+
+class TestBatchRunner:
+    def test_malformed_job_fails_alone(self, tmp_path: Path):
+        """Test a job the scheduler rejects is failed without stopping the batch."""
+        analyzed = []
+
+        async def analyze(params, flight_api, deadline):
+            analyzed.append(params.date)
+            return []
+
+        journal_path = str(tmp_path / "journal.jsonl")
+        with JobJournal(journal_path) as journal:
+            runner = BatchRunner(
+                flight_api=None,
+                analyze=analyze,
+                concurrency=2,
+                journal=journal,
+                scheduler=PriorityJobScheduler(today=date(2025, 12, 1)),
+            )
+            results = asyncio.run(
+                runner.run(
+                    [
+                        build_job("first", "2025-12-15"),
+                        build_job("malformed", "2025-13-45"),
+                        build_job("last", "2025-12-20"),
+                    ]
+                )
+            )
+
+        assert set(results) == {"first", "last"}
+        assert sorted(analyzed) == ["2025-12-15", "2025-12-20"]
+        assert runner.failed_job_ids == ["malformed"]
+        with JobJournal(journal_path, resume=True) as journal:
+            assert journal.is_done("first") and journal.is_done("last")
+            assert not journal.is_done("malformed")
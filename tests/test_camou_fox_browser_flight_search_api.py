@@ -0,0 +1,114 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from scraperninja.scraper.flight_search import camou_fox_browser_flight_search_api
+from scraperninja.scraper.flight_search.camou_fox_browser_flight_search_api import (
+    AttachedStealthySession,
+)
+
+WS_ENDPOINT = "ws://localhost:9222/camoufox"
+PROXY = {"server": "http://proxy:8000", "username": "user", "password": "secret"}
+
+
+class FakeContext:
+    def __init__(self, proxy: Optional[dict]) -> None:
+        self.proxy = proxy
+        self.cookies: List[dict] = []
+        self.closed = False
+
+    async def add_cookies(self, cookies: List[dict]):
+        self.cookies.extend(cookies)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: List[FakeContext] = []
+        self.closed = False
+
+    async def new_context(self, proxy: Optional[dict] = None) -> FakeContext:
+        self.contexts.append(FakeContext(proxy))
+        return self.contexts[-1]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeFirefox:
+    def __init__(self) -> None:
+        self.browser = FakeBrowser()
+        self.connected_to: List[str] = []
+
+    async def connect(self, ws_endpoint: str) -> FakeBrowser:
+        self.connected_to.append(ws_endpoint)
+        return self.browser
+
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.firefox = FakeFirefox()
+        self.stopped = False
+
+    async def start(self) -> "FakePlaywright":
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch) -> FakePlaywright:
+    fake_playwright = FakePlaywright()
+    monkeypatch.setattr(
+        camou_fox_browser_flight_search_api,
+        "async_playwright",
+        lambda: fake_playwright,
+    )
+    return fake_playwright
+
+
+def attached_session(cookies: List[dict]) -> AttachedStealthySession:
+    # Past scrapling's __init__, whose launch options need a fetched Camoufox
+    session = AttachedStealthySession.__new__(AttachedStealthySession)
+    session.ws_endpoint = WS_ENDPOINT
+    session.launch_options = {"proxy": PROXY}
+    session.init_script = None
+    session.cookies = cookies
+    session.playwright = None
+    session.context = None
+    session._closed = False
+    return session
+
+
+class TestAttachedStealthySession:
+    def test_context_of_server_browser_on_proxy(self, playwright: FakePlaywright):
+        """Test the session is a new context of the server browser on its proxy."""
+        cookies = [{"name": "session", "value": "1", "url": "https://www.aa.com"}]
+        session = attached_session(cookies)
+
+        async def run():
+            async with session:
+                return session.context
+
+        context = asyncio.run(run())
+        assert playwright.firefox.connected_to == [WS_ENDPOINT]
+        assert playwright.firefox.browser.contexts == [context]
+        assert context.proxy == PROXY
+        assert context.cookies == cookies
+
+    def test_exit_leaves_browser_running(self, playwright: FakePlaywright):
+        """Test closing the session closes its context and drops the connection."""
+        session = attached_session([])
+
+        async def run():
+            async with session:
+                return session.context
+
+        context = asyncio.run(run())
+        assert context.closed
+        assert playwright.stopped
+        assert not playwright.firefox.browser.closed
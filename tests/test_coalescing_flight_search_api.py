@@ -0,0 +1,145 @@
+import asyncio
+
+from conftest import FakeFlightSearchResponseApi
+
+from scraperninja.scraper.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    remaining_timeout,
+)
+from scraperninja.scraper.flight_search import CoalescingFlightSearchResponseApi
+
+
+def blocked_engine() -> FakeFlightSearchResponseApi:
+    """Searches block until released, so tests control their overlap."""
+    return FakeFlightSearchResponseApi(release=asyncio.Event())
+
+
+class DeadlineBoundFlightSearchResponseApi(FakeFlightSearchResponseApi):
+    """Times out on the deadline in scope like the browser engines do."""
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(latency=latency)
+        self.timeouts = []
+
+    async def search_flight_details(self, search_url: str, direct_only: bool):
+        self.timeouts.append(remaining_timeout(30))
+        return await asyncio.wait_for(
+            super().search_flight_details(search_url, direct_only),
+            timeout=self.timeouts[-1],
+        )
+
+
+async def search_within(
+    flight_api: CoalescingFlightSearchResponseApi, budget_seconds: float
+):
+    deadline = Deadline(budget_seconds)
+    with deadline.scope():
+        return await deadline.wait(flight_api.search_flight_details("url", False))
+
+
+class TestCoalescingFlightSearchResponseApi:
+    def test_concurrent_searches_share_one_search(self):
+        """Test concurrent searches of a url share one underlying search."""
+
+        async def run():
+            engine = blocked_engine()
+            flight_api = CoalescingFlightSearchResponseApi(engine)
+            searches = [
+                asyncio.ensure_future(flight_api.search_flight_details("url", False))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            engine.release.set()
+            results = await asyncio.gather(*searches)
+            return engine, flight_api, results
+
+        engine, flight_api, results = asyncio.run(run())
+        assert engine.searches == [("url", False)]
+        assert (flight_api.searches_started, flight_api.searches_coalesced) == (1, 2)
+        assert results[0] == results[1] == results[2]
+        assert flight_api.in_flight == {}
+
+    def test_direct_only_filtered_per_caller(self):
+        """Test direct-only and all-flight callers share the unfiltered search."""
+
+        async def run():
+            engine = blocked_engine()
+            flight_api = CoalescingFlightSearchResponseApi(engine)
+            direct = asyncio.ensure_future(
+                flight_api.search_flight_details("url", True)
+            )
+            every = asyncio.ensure_future(
+                flight_api.search_flight_details("url", False)
+            )
+            await asyncio.sleep(0)
+            engine.release.set()
+            return engine, await direct, await every
+
+        engine, direct, every = asyncio.run(run())
+        assert engine.searches == [("url", False)]
+        assert len(every) == 2
+        assert len(direct) < len(every)
+        assert all(len(flight.segments) == 1 for flight in direct)
+
+    def test_cancelled_first_awaiter_keeps_shared_search(self):
+        """Test cancelling the caller that started a search spares the others."""
+
+        async def run():
+            engine = blocked_engine()
+            flight_api = CoalescingFlightSearchResponseApi(engine)
+            first = asyncio.ensure_future(
+                flight_api.search_flight_details("url", False)
+            )
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(
+                flight_api.search_flight_details("url", False)
+            )
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            engine.release.set()
+            return engine, first, await second
+
+        engine, first, flights = asyncio.run(run())
+        assert first.cancelled()
+        assert len(flights) == 2
+        assert len(engine.searches) == 1
+
+    def test_failure_shared_then_forgotten(self):
+        """Test every awaiter gets the failure and the next search starts over."""
+
+        async def run():
+            engine = blocked_engine()
+            engine.errors.append(ValueError("blocked"))
+            flight_api = CoalescingFlightSearchResponseApi(engine)
+            searches = [
+                asyncio.ensure_future(flight_api.search_flight_details("url", False))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            engine.release.set()
+            results = await asyncio.gather(*searches, return_exceptions=True)
+            retried = await flight_api.search_flight_details("url", False)
+            return engine, results, retried
+
+        engine, results, retried = asyncio.run(run())
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(engine.searches) == 2
+        assert len(retried) == 2
+
+    def test_shared_search_outlives_first_caller_deadline(self):
+        """Test a caller with little budget left does not fail the ones joining."""
+
+        async def run():
+            engine = DeadlineBoundFlightSearchResponseApi(latency=0.05)
+            flight_api = CoalescingFlightSearchResponseApi(engine)
+            short = asyncio.ensure_future(search_within(flight_api, 0.01))
+            await asyncio.sleep(0)
+            long = asyncio.ensure_future(search_within(flight_api, 10))
+            return engine, await asyncio.gather(short, long, return_exceptions=True)
+
+        engine, (short, long) = asyncio.run(run())
+        assert isinstance(short, DeadlineExceededError)
+        assert len(long) == 2
+        assert engine.timeouts == [30]
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import date
+from typing import Set
+
+import pytest
+from conftest import FakeFlightSearchResponseApi
+
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.api.flight_search_request import FlightSearchRequest
+from scraperninja.scraper.date_sweep import DateSweep
+
+TODAY = date(2025, 12, 13)
+
+
+class FakeDateFlightSearchResponseApi(FakeFlightSearchResponseApi):
+    """Answers every date with the fixture slices, failing the `failing_dates`."""
+
+    def __init__(self, failing_dates: Set[str] = frozenset()) -> None:
+        super().__init__()
+        self.failing_dates = failing_dates
+
+    async def search_flight_details(self, search_url: str, direct_only: bool):
+        search_date = FlightSearchRequest.from_url(search_url).date
+        if search_date in self.failing_dates:
+            raise ValueError(f"blocked on {search_date}")
+        return await super().search_flight_details(search_url, direct_only)
+
+
+def date_sweep(
+    flight_api: FakeDateFlightSearchResponseApi, window_days: int = 1, **kwargs
+) -> DateSweep:
+    params = AnalysisParams(origin="LAX", destination="JFK", date="2025-12-15")
+    return DateSweep(flight_api, params, window_days, today=TODAY, **kwargs)
+
+
+class TestDateSweep:
+    def test_sweep_dates_nearest_first(self):
+        """Test dates are swept from the requested date outwards."""
+        sweep = date_sweep(FakeDateFlightSearchResponseApi(), window_days=2)
+        assert sweep.sweep_dates() == [
+            "2025-12-15",
+            "2025-12-14",
+            "2025-12-16",
+            "2025-12-13",
+            "2025-12-17",
+        ]
+
+    def test_sweep_dates_clamped_to_today(self):
+        """Test dates before today are left out."""
+        sweep = date_sweep(FakeDateFlightSearchResponseApi(), window_days=4)
+        assert min(sweep.sweep_dates()) == TODAY.isoformat()
+        assert len(sweep.sweep_dates()) == 7
+
+    def test_failed_date_reported(self):
+        """Test a failed date is reported without failing the sweep."""
+        flight_api = FakeDateFlightSearchResponseApi(failing_dates={"2025-12-14"})
+        result = asyncio.run(date_sweep(flight_api).run())
+
+        assert result.failed_dates == ["2025-12-14"]
+        failed_day = next(day for day in result.days if day.date == "2025-12-14")
+        assert "blocked" in failed_day.error
+        assert not failed_day.revenue_searched
+        assert result.best_flight_records()
+
+    def test_every_date_failed_raises(self):
+        """Test the sweep fails when no date could be searched."""
+        flight_api = FakeDateFlightSearchResponseApi(
+            failing_dates={"2025-12-14", "2025-12-15", "2025-12-16"}
+        )
+        with pytest.raises(ValueError, match="blocked"):
+            asyncio.run(date_sweep(flight_api).run())
+
+    def test_estimated_max_cpp_skips_revenue(self):
+        """Test a date whose estimated max CPP cannot beat the best is skipped."""
+        flight_api = FakeDateFlightSearchResponseApi()
+        result = asyncio.run(
+            date_sweep(flight_api, concurrency=1, cash_margin=0.5).run()
+        )
+
+        first, *others = result.days
+        assert first.revenue_searched
+        # Same fares every date, at half the priciest fare none can do better
+        assert all(day.skipped_reason for day in others)
+        assert all(day.estimated_max_cpp is not None for day in others)
+        assert result.revenue_searches == 1
+
+    def test_target_cpp_stops_sweep(self):
+        """Test the sweep stops once a flight reaches the target CPP."""
+        flight_api = FakeDateFlightSearchResponseApi()
+        result = asyncio.run(
+            date_sweep(flight_api, window_days=3, concurrency=1, target_cpp=1.0).run()
+        )
+
+        assert result.stopped_early
+        assert [day.date for day in result.days] == ["2025-12-15"]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from tenacity import AsyncRetrying, stop_after_attempt, wait_fixed
+
+from scraperninja.scraper.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    remaining_timeout,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDeadline:
+    def test_timeout_capped_by_remaining_budget(self):
+        """Test a step gets its usual timeout until the budget is shorter."""
+        clock = FakeClock()
+        deadline = Deadline(60, clock=clock)
+        assert deadline.timeout(30) == 30
+        clock.now = 45
+        assert deadline.timeout(30) == 15
+        clock.now = 60
+        with pytest.raises(DeadlineExceededError):
+            deadline.timeout(30)
+
+    def test_remaining_timeout_in_scope(self):
+        """Test engines only see the deadline inside the scraper scope."""
+        deadline = Deadline(5, clock=FakeClock())
+        assert remaining_timeout(30) == 30
+        with deadline.scope():
+            assert remaining_timeout(30) == 5
+            assert remaining_timeout() == 5
+        assert remaining_timeout() is None
+
+    def test_wait_cancels_on_expiry(self):
+        """Test an awaitable still running at the deadline is cancelled."""
+        cancelled = []
+
+        async def slow_search():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(Deadline(0.05).wait(slow_search()))
+        assert cancelled == [True]
+
+    def test_no_retry_past_deadline(self):
+        """Test retries stop when the backoff would end past the deadline."""
+        clock = FakeClock()
+        deadline = Deadline(25, clock=clock)
+        attempts = []
+
+        async def fake_sleep(seconds: float):
+            clock.now += seconds
+
+        async def run():
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(5) | deadline.stop_retrying,
+                wait=wait_fixed(10),
+                sleep=fake_sleep,
+                reraise=True,
+            ):
+                with attempt:
+                    attempts.append(clock.now)
+                    raise ValueError("blocked")
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        # A fourth attempt would have to start at 30, past the 25s budget
+        assert attempts == [0, 10, 20]
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.domain.flight import (
+    FlightCashPrice,
+    FlightMilesPrice,
+    FlightTiming,
+)
+from scraperninja.model.domain.flight_record import FlightRecord
+from scraperninja.model.money import Money
+
+
+class TestFlightRecord:
+    @pytest.fixture
+    def flight_record(self):
+        """Create a FlightRecord from the pydantic domain parts."""
+        return FlightRecord.from_parts(
+            FlightTiming(
+                flight_number="AA100",
+                departure_time=datetime(2025, 12, 15, 8, 0),
+                arrival_time=datetime(2025, 12, 15, 16, 30),
+            ),
+            FlightCashPrice(price=Money(amount=305.6, currency="USD")),
+            FlightMilesPrice(points_required=15_000, tax=Money.empty()),
+            product_type=ProductType.COACH,
+        )
+
+    def test_report_matches_pydantic_model(self, flight_record: FlightRecord):
+        """Test the compact record reports exactly like FlightTimingAndPrices."""
+        report = flight_record.to_report()
+        assert report.pop("cabin_class") == ProductType.COACH.value
+        assert report.pop("slice_index") == 0
+        assert report.pop("origin") is None
+        assert report.pop("destination") is None
+        assert report == flight_record.to_model().to_report()
+
+    def test_cpp_without_points(self, flight_record: FlightRecord):
+        """Test CPP is undefined when no points are required."""
+        flight_record.points_required = None
+        assert flight_record.cpp is None
+
+    def test_slotted(self, flight_record: FlightRecord):
+        """Test records do not carry a per-instance __dict__."""
+        assert not hasattr(flight_record, "__dict__")
+
+    def test_for_passengers(self, flight_record: FlightRecord):
+        """Test per passenger records scale to party totals with the same CPP."""
+        party_record = flight_record.for_passengers(3)
+        assert party_record.cash_amount == pytest.approx(916.8)
+        assert party_record.points_required == 45_000
+        assert party_record.cpp == pytest.approx(flight_record.cpp)
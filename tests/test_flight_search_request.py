@@ -0,0 +1,82 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+    SliceRequest,
+    TripType,
+)
+
+
+def build_request(*additional_slices: SliceRequest) -> FlightSearchRequest:
+    return FlightSearchRequest(
+        orig="LAX",
+        dest="JFK",
+        date="2025-12-15",
+        adult=1,
+        search_type=PaymentType.AWARD,
+        additional_slices=list(additional_slices),
+    )
+
+
+class TestFlightSearchRequest:
+    def test_one_way(self):
+        """Test a single slice request is searched as a one way trip."""
+        req = build_request()
+        assert req.resolved_trip_type == TripType.ONE_WAY
+        assert len(req.slices()) == 1
+
+    def test_round_trip(self):
+        """Test a reversed second slice is searched as a round trip."""
+        req = build_request(SliceRequest(orig="JFK", dest="LAX", date="2025-12-20"))
+        query = parse_qs(urlparse(req.to_url("https://www.aa.com")).query)
+
+        assert query["type"] == [TripType.ROUND_TRIP.value]
+        assert [s["date"] for s in json.loads(query["slices"][0])] == [
+            "2025-12-15",
+            "2025-12-20",
+        ]
+
+    def test_multi_city(self):
+        """Test unrelated additional slices are searched as a multi city trip."""
+        req = build_request(
+            SliceRequest(orig="JFK", dest="MIA", date="2025-12-18"),
+            SliceRequest(orig="MIA", dest="LAX", date="2025-12-22"),
+        )
+        assert req.resolved_trip_type == TripType.MULTI_CITY
+        assert [s.orig for s in req.requested_slices] == ["LAX", "JFK", "MIA"]
+
+    def test_from_url(self):
+        """Test a search url parses back into the request that built it."""
+        req = build_request(SliceRequest(orig="JFK", dest="LAX", date="2025-12-20"))
+        req.allow_dest_nearby = True
+        parsed = FlightSearchRequest.from_url(req.to_url("https://www.aa.com"))
+
+        assert parsed.to_url("https://www.aa.com") == req.to_url("https://www.aa.com")
+        assert parsed.requested_slices == req.requested_slices
+        assert parsed.search_type == PaymentType.AWARD
+
+    def test_to_itinerary_payload(self):
+        """Test the itinerary api body carries every slice and the passengers."""
+        req = build_request(SliceRequest(orig="JFK", dest="LAX", date="2025-12-20"))
+        payload = req.to_itinerary_payload()
+
+        assert payload["metadata"]["tripType"] == TripType.ROUND_TRIP.value
+        assert payload["passengers"] == [{"type": "adult", "count": 1}]
+        assert [s["departureDate"] for s in payload["slices"]] == [
+            "2025-12-15",
+            "2025-12-20",
+        ]
+        assert payload["tripOptions"]["searchType"] == PaymentType.AWARD.value
+
+    def test_slice_request(self):
+        """Test a later slice of a multi-slice request is searched one way."""
+        req = build_request(SliceRequest(orig="JFK", dest="LAX", date="2025-12-20"))
+        req.allow_origin_nearby = True
+        return_req = req.slice_request(1)
+
+        assert return_req.requested_slices == [req.requested_slices[1]]
+        assert return_req.resolved_trip_type == TripType.ONE_WAY
+        assert return_req.allow_origin_nearby
+        assert req.slice_request(0).requested_slices == [req.requested_slices[0]]
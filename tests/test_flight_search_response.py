@@ -0,0 +1,53 @@
+from typing import List
+
+import pytest
+from conftest import fixture_slices, parse_slices
+
+from scraperninja.model.api.flight_search_response import (
+    FlightSearchResponse,
+    ProductType,
+)
+
+
+class TestFlightSearchResponse:
+    @pytest.fixture
+    def flights(self) -> List[FlightSearchResponse]:
+        """Parse the recorded itinerary payload fixture."""
+        return parse_slices(fixture_slices())
+
+    def test_cheapest_cash_price(self, flights: List[FlightSearchResponse]):
+        """Test the cheapest fare of the requested cabin is picked."""
+        cash_price = flights[0].get_cheapest_cash_price(ProductType.COACH)
+        assert cash_price is not None
+        assert cash_price.price.amount == 305.6
+
+    def test_seats_remaining_filter(self, flights: List[FlightSearchResponse]):
+        """Test fares without enough seats left for the party are skipped."""
+        connecting_flight = flights[1]
+        assert connecting_flight.get_miles_required(ProductType.COACH) is not None
+        assert (
+            connecting_flight.get_miles_required(ProductType.COACH, min_seats=2) is None
+        )
+        assert (
+            connecting_flight.get_cheapest_cash_price(ProductType.COACH, min_seats=2)
+            is None
+        )
+
+    def test_sold_out_product_skipped(self, flights: List[FlightSearchResponse]):
+        """Test a product no longer available is skipped despite 0 seats left."""
+        assert flights[0].get_cheapest_cash_price(ProductType.FIRST) is None
+        assert flights[0].get_miles_required(ProductType.FIRST) is None
+
+    def test_per_passenger_cash_price(self, flights: List[FlightSearchResponse]):
+        """Test the per passenger cash price is read from the pricing detail."""
+        cash_price = flights[0].get_cheapest_cash_price(
+            ProductType.BUSINESS, per_passenger=True, min_seats=2
+        )
+        assert cash_price is not None
+        assert cash_price.price.amount == 1205.6
+
+    def test_flight_timing_airports(self, flights: List[FlightSearchResponse]):
+        """Test timings carry the airports actually flown for nearby searches."""
+        flight_timing = flights[1].get_flight_timing()
+        assert flight_timing is not None
+        assert (flight_timing.origin, flight_timing.destination) == ("LAX", "JFK")
@@ -0,0 +1,120 @@
+import asyncio
+from typing import List
+
+import pytest
+from conftest import FakeFlightSearchResponseApi
+
+from scraperninja.scraper.flight_search import HedgedFlightSearchResponseApi
+
+HEDGE_DELAY = 0.05
+
+
+def engine(latency: float, *errors: Exception) -> FakeFlightSearchResponseApi:
+    return FakeFlightSearchResponseApi(latency=latency, errors=list(errors))
+
+
+def search(flight_api: HedgedFlightSearchResponseApi, search_url: str = "url"):
+    return asyncio.run(flight_api.search_flight_details(search_url, False))
+
+
+def hedged(
+    primary: FakeFlightSearchResponseApi, hedges: List[FakeFlightSearchResponseApi]
+) -> HedgedFlightSearchResponseApi:
+    return HedgedFlightSearchResponseApi(
+        primary, hedges, min_samples=3, initial_hedge_delay_seconds=HEDGE_DELAY
+    )
+
+
+class TestHedgedFlightSearchResponseApi:
+    def test_hedge_delay_follows_latency_percentile(self):
+        """Test the initial delay is used until enough latencies are recorded."""
+        flight_api = hedged(engine(0), [])
+        assert flight_api.hedge_delay_seconds == HEDGE_DELAY
+
+        flight_api.latencies.extend([1.0, 2.0])
+        assert flight_api.hedge_delay_seconds == HEDGE_DELAY
+
+        flight_api.latencies.extend([3.0, 4.0, 10.0] + [2.5] * 15)
+        assert flight_api.hedge_delay_seconds == 4.0
+
+    def test_fast_primary_not_hedged(self):
+        """Test a primary answering before the hedge delay runs alone."""
+        primary = engine(0)
+        hedge = engine(0)
+        flight_api = hedged(primary, [hedge])
+
+        assert search(flight_api) is primary.cache["url"]
+        assert hedge.searches == []
+        assert flight_api.stats.searches == 1
+        assert flight_api.stats.hedges_started == 0
+        assert len(flight_api.latencies) == 1
+
+    def test_hedge_wins_and_primary_cancelled(self):
+        """Test the hedge of a hanging primary wins and the primary is cancelled."""
+        primary = engine(10)
+        hedge = engine(0)
+        flight_api = hedged(primary, [hedge])
+
+        assert search(flight_api) is hedge.cache["url"]
+        assert primary.cancelled == 1
+        assert flight_api.stats.hedges_started == 1
+        assert flight_api.stats.hedge_wins == 1
+        assert flight_api.stats.hedge_rate == 1.0
+        assert flight_api.stats.estimated_latency_saved_seconds > 0
+
+    def test_repeat_search_goes_to_winner(self):
+        """Test a url the hedge won is searched again on the hedge, unhedged."""
+        primary = engine(10)
+        hedge = engine(0)
+        flight_api = hedged(primary, [hedge])
+        search(flight_api)
+
+        assert search(flight_api) is hedge.cache["url"]
+        assert primary.searched_urls == ["url"]
+        assert hedge.searched_urls == ["url", "url"]
+        assert flight_api.stats.searches == 1
+        assert flight_api.stats.hedges_started == 1
+        assert len(flight_api.latencies) == 1
+
+    def test_primary_wins_and_hedge_cancelled(self):
+        """Test a primary finishing first after the hedge started cancels it."""
+        primary = engine(HEDGE_DELAY * 2)
+        hedge = engine(10)
+        flight_api = hedged(primary, [hedge])
+
+        assert search(flight_api) is primary.cache["url"]
+        assert hedge.cancelled == 1
+        assert flight_api.stats.hedges_started == 1
+        assert flight_api.stats.hedge_wins == 0
+
+    def test_first_success_wins_over_failure(self):
+        """Test a failed side does not fail the search while the other may succeed."""
+        primary = engine(HEDGE_DELAY * 2, ValueError("blocked"))
+        hedge = engine(HEDGE_DELAY * 2)
+        flight_api = hedged(primary, [hedge])
+
+        assert search(flight_api) is hedge.cache["url"]
+        assert flight_api.stats.hedge_wins == 1
+
+    def test_both_sides_failing_raises(self):
+        """Test the search fails once every side has failed."""
+        primary = engine(HEDGE_DELAY * 2, ValueError("primary blocked"))
+        hedge = engine(0, ValueError("blocked"))
+        flight_api = hedged(primary, [hedge])
+
+        with pytest.raises(ValueError):
+            search(flight_api)
+
+    def test_use_sessions_keeps_history(self):
+        """Test swapping the sessions of a retry keeps the latencies and stats."""
+        flight_api = hedged(engine(0), [])
+        search(flight_api)
+
+        retry_primary = engine(10)
+        retry_hedge = engine(0)
+        flight_api.use_sessions(retry_primary, [retry_hedge])
+
+        assert search(flight_api) is retry_hedge.cache["url"]
+        assert flight_api.stats.searches == 2
+        assert flight_api.stats.hedge_wins == 1
+        assert len(flight_api.latencies) == 2
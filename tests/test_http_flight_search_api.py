@@ -0,0 +1,101 @@
+import asyncio
+from typing import Optional
+
+import pytest
+from conftest import FakeFlightSearchResponseApi, fixture_slices
+from curl_cffi.requests import RequestsError
+
+from scraperninja.model.api.flight_search_request import (
+    FlightSearchRequest,
+    PaymentType,
+)
+from scraperninja.scraper.flight_search import HttpFlightSearchResponseApi
+
+SEARCH_URL = FlightSearchRequest(
+    orig="LAX",
+    dest="JFK",
+    date="2025-12-15",
+    adult=1,
+    search_type=PaymentType.REVENUE,
+).to_url("https://www.aa.com/booking/search")
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: Optional[dict]) -> None:
+        self.status_code = status_code
+        self.body = body
+
+    def json(self) -> dict:
+        if self.body is None:
+            raise ValueError("no json")
+        return self.body
+
+
+class FakeClient:
+    def __init__(self, outcome) -> None:
+        self.outcome = outcome
+        self.posts = 0
+
+    async def post(self, url: str, **kwargs) -> FakeResponse:
+        self.posts += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def search(browser: FakeFlightSearchResponseApi, outcome):
+    async def run():
+        async with HttpFlightSearchResponseApi(browser) as flight_api:
+            flight_api.client = FakeClient(outcome)
+            flights = await flight_api.search_flight_details(SEARCH_URL, False)
+            return flight_api, flights
+
+    return asyncio.run(run())
+
+
+class TestHttpFlightSearchResponseApi:
+    def test_search_over_http(self):
+        """Test an itinerary answered over http is parsed without the browser."""
+        browser = FakeFlightSearchResponseApi()
+        flight_api, flights = search(
+            browser, FakeResponse(200, {"slices": fixture_slices()})
+        )
+        assert flights
+        assert flight_api.http_searches == 1
+        assert SEARCH_URL in flight_api.cache
+        assert browser.searched_urls == []
+        assert browser.exited
+
+    @pytest.mark.parametrize(
+        "outcome",
+        [
+            FakeResponse(403, {"error": "blocked"}),
+            FakeResponse(200, None),
+            FakeResponse(200, {"error": "no slices"}),
+            RequestsError("connection reset"),
+        ],
+    )
+    def test_blocked_falls_back_to_browser(self, outcome):
+        """Test a blocked or failed http call is searched by the browser."""
+        browser = FakeFlightSearchResponseApi()
+        flight_api, _ = search(browser, outcome)
+        assert browser.searched_urls == [SEARCH_URL]
+        assert flight_api.browser_fallbacks == 1
+        assert flight_api.http_searches == 0
+        # The next http call harvests a fresh session first
+        assert flight_api.browser_session is None
+
+    def test_harvest_failure_closes_browser(self):
+        """Test the browser is closed when the session harvest fails on enter."""
+        browser = FakeFlightSearchResponseApi(
+            harvest_error=RuntimeError("warm up failed")
+        )
+
+        async def run():
+            async with HttpFlightSearchResponseApi(browser):
+                pass
+
+        with pytest.raises(RuntimeError, match="warm up failed"):
+            asyncio.run(run())
+        assert browser.entered
+        assert browser.exited
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from scraperninja.batch.job_journal import JobJournal, JobStatus
+from scraperninja.model.api.flight_search_response import ProductType
+from scraperninja.model.domain.flight_record import FlightRecord
+
+
+class TestJobJournal:
+    @pytest.fixture
+    def journal_path(self, tmp_path: Path) -> str:
+        """Journal of a crashed run: one job done, one interrupted, one failed."""
+        journal_path = str(tmp_path / "journal.jsonl")
+        record = FlightRecord(
+            flight_number="AA100",
+            departure_time=datetime(2025, 12, 15, 8, 0),
+            arrival_time=datetime(2025, 12, 15, 16, 30),
+            cash_amount=305.6,
+            cash_currency="USD",
+            points_required=15_000,
+            tax_amount=5.6,
+            tax_currency="USD",
+            product_type=ProductType.COACH,
+        )
+        with JobJournal(journal_path) as journal:
+            journal.mark_pending(["done", "running", "failed"])
+            journal.mark_running("done")
+            journal.mark_running("running")
+            journal.mark_done("done", [record])
+            journal.mark_running("failed")
+            journal.mark_failed("failed", ValueError("blocked"))
+        return journal_path
+
+    def test_resume_replays_last_state(self, journal_path: str):
+        """Test resuming only treats jobs journaled as done as completed."""
+        with JobJournal(journal_path, resume=True) as journal:
+            assert journal.is_done("done")
+            assert not journal.is_done("running")
+            assert not journal.is_done("failed")
+            assert journal.entries["running"].status == JobStatus.RUNNING
+            assert journal.entries["failed"].error == "blocked"
+            assert journal.entries["done"].flights[0]["flight_number"] == "AA100"
+
+    def test_resume_skips_torn_line(self, journal_path: str):
+        """Test a line cut short by the crash does not prevent resuming."""
+        with open(journal_path, "a") as journal_file:
+            journal_file.write(json.dumps({"job_id": "running"})[:10])
+
+        with JobJournal(journal_path, resume=True) as journal:
+            assert journal.is_done("done")
+            assert journal.entries["running"].status == JobStatus.RUNNING
+            journal.mark_failed("running", MemoryError("oom"))
+
+        with JobJournal(journal_path, resume=True) as journal:
+            assert journal.entries["running"].status == JobStatus.FAILED
+
+    def test_new_run_truncates(self, journal_path: str):
+        """Test a run without resume starts a fresh journal."""
+        with JobJournal(journal_path) as journal:
+            assert journal.entries == {}
+        assert Path(journal_path).read_text() == ""
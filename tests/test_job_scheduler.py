@@ -0,0 +1,93 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import List
+
+from scraperninja.batch.job_scheduler import (
+    FifoJobScheduler,
+    PriorityJobScheduler,
+    RouteCppHistory,
+)
+from scraperninja.model.analysis_params import AnalysisParams
+from scraperninja.model.batch_job import BatchJob
+
+TODAY = date(2025, 12, 1)
+
+
+def build_job(job_id: str, origin: str, destination: str, date: str) -> BatchJob:
+    return BatchJob(
+        job_id=job_id,
+        params=AnalysisParams(origin=origin, destination=destination, date=date),
+    )
+
+
+def drain(scheduler, finish: bool = True) -> List[str]:
+    job_ids = []
+    while (job := scheduler.next_job()) is not None:
+        job_ids.append(job.job_id)
+        if finish:
+            scheduler.job_finished(job)
+    return job_ids
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestJobScheduler:
+    def test_fifo(self):
+        """Test the default scheduler keeps the jobs file order."""
+        scheduler = FifoJobScheduler()
+        for job_id in ["a", "b", "c"]:
+            scheduler.add(build_job(job_id, "LAX", "JFK", "2025-12-15"))
+        assert drain(scheduler) == ["a", "b", "c"]
+
+    def test_near_departure_first(self):
+        """Test closer departures are searched first."""
+        scheduler = PriorityJobScheduler(today=TODAY, clock=FakeClock())
+        scheduler.add(build_job("far", "LAX", "JFK", "2026-01-20"))
+        scheduler.add(build_job("near", "SFO", "ORD", "2025-12-03"))
+        assert drain(scheduler) == ["near", "far"]
+
+    def test_high_cpp_route_first(self, tmp_path: Path):
+        """Test routes with a high past CPP win at the same departure date."""
+        for route, cpp in [("LAX-JFK", 1.1), ("SFO-ORD", 2.4)]:
+            origin, destination = route.split("-")
+            (tmp_path / f"{route}.json").write_text(
+                json.dumps(
+                    {
+                        "search_metadata": {
+                            "origin": origin,
+                            "destination": destination,
+                        },
+                        "flights": [{"cpp": cpp}, {"cpp": None}],
+                    }
+                )
+            )
+        scheduler = PriorityJobScheduler(
+            RouteCppHistory.from_reports(str(tmp_path)), today=TODAY, clock=FakeClock()
+        )
+        scheduler.add(build_job("low", "LAX", "JFK", "2025-12-20"))
+        scheduler.add(build_job("high", "SFO", "ORD", "2025-12-20"))
+        assert drain(scheduler) == ["high", "low"]
+
+    def test_aging_prevents_starvation(self):
+        """Test a low priority job overtakes newer urgent jobs once it waited."""
+        clock = FakeClock()
+        scheduler = PriorityJobScheduler(today=TODAY, clock=clock)
+        scheduler.add(build_job("old", "LAX", "JFK", "2026-06-01"))
+        clock.now = 3 * 3600
+        scheduler.add(build_job("urgent", "SFO", "ORD", "2025-12-01"))
+        assert drain(scheduler) == ["old", "urgent"]
+
+    def test_route_fairness(self):
+        """Test a running route yields to another route of similar priority."""
+        scheduler = PriorityJobScheduler(today=TODAY, clock=FakeClock())
+        scheduler.add(build_job("lax-1", "LAX", "JFK", "2025-12-02"))
+        scheduler.add(build_job("lax-2", "LAX", "JFK", "2025-12-02"))
+        scheduler.add(build_job("sfo-1", "SFO", "ORD", "2025-12-05"))
+        assert drain(scheduler, finish=False) == ["lax-1", "sfo-1", "lax-2"]
@@ -0,0 +1,175 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from scraperninja.scraper.flight_search.camou_fox_browser_flight_search_api import (
+    PageNetworkSpy,
+)
+
+ITINERARY_URL = "https://www.aa.com/booking/api/search/itinerary"
+
+
+class FakePage:
+    def __init__(self, search_url: Optional[str]) -> None:
+        self.search_url = search_url
+
+
+class FakeFrame:
+    def __init__(self, page: FakePage) -> None:
+        self.page = page
+
+
+class FakeResponse:
+    def __init__(self, url: str, payload: Optional[dict]) -> None:
+        self.url = url
+        self.status = 200
+        self.payload = payload
+        self.body_reads = 0
+
+    async def body(self) -> bytes:
+        self.body_reads += 1
+        if self.payload is None:
+            raise ConnectionError("page closed")
+        return json.dumps(self.payload).encode()
+
+
+class FakeRequest:
+    def __init__(self, page: FakePage, payload: Optional[dict]) -> None:
+        self.url = ITINERARY_URL
+        self.method = "POST"
+        self.post_data_buffer = b'{"slices": []}'
+        self.frame = FakeFrame(page)
+        self.fake_response = FakeResponse(ITINERARY_URL, payload)
+
+    async def response(self) -> FakeResponse:
+        return self.fake_response
+
+
+class FakeRoute:
+    def __init__(self, page: FakePage, payload: Optional[dict] = None) -> None:
+        self.request = FakeRequest(page, payload)
+        self.continued = False
+
+    async def continue_(self):
+        self.continued = True
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.routes: List[tuple] = []
+
+    async def route(self, url_pattern, handler):
+        self.routes.append((url_pattern, handler))
+
+    async def navigate(self, route: FakeRoute):
+        """Send a request through every route matching its url, like the browser."""
+        for url_pattern, handler in self.routes:
+            if url_pattern == route.request.url:
+                await handler(route)
+        # Let the response handlers read the bodies
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+
+def create_spy(**kwargs) -> PageNetworkSpy:
+    return PageNetworkSpy(
+        ITINERARY_URL, page_key=lambda page: page.search_url, **kwargs
+    )
+
+
+class TestPageNetworkSpy:
+    def test_routes_only_the_url_pattern(self):
+        """Test the spy registers a single route filtered on the itinerary url."""
+
+        async def run():
+            context = FakeContext()
+            await create_spy().spy(context)
+            return context.routes
+
+        routes = asyncio.run(run())
+        assert [url_pattern for url_pattern, _ in routes] == [ITINERARY_URL]
+
+    def test_response_goes_to_the_waiter_of_its_page(self):
+        """Test concurrent tabs each get the response of their own search."""
+
+        async def run():
+            context, spy = FakeContext(), create_spy()
+            await spy.spy(context)
+            first, second = spy.expect_response("a"), spy.expect_response("b")
+            await context.navigate(FakeRoute(FakePage("b"), {"search": "b"}))
+            await context.navigate(FakeRoute(FakePage("a"), {"search": "a"}))
+            return (await first).json_payload, (await second).json_payload
+
+        assert asyncio.run(run()) == ({"search": "a"}, {"search": "b"})
+
+    def test_response_without_waiter_is_not_read(self):
+        """Test a request nobody waits for is let through without reading its body."""
+
+        async def run():
+            context, spy = FakeContext(), create_spy()
+            await spy.spy(context)
+            route = FakeRoute(FakePage("a"), {"search": "a"})
+            await context.navigate(route)
+            return spy, route
+
+        spy, route = asyncio.run(run())
+        assert route.continued
+        assert route.request.fake_response.body_reads == 0
+        assert spy.requests_routed == 1
+        assert spy.responses_captured == 0
+        assert spy.requests[0].body == {"slices": []}
+
+    def test_buffers_bounded_and_counters_kept(self):
+        """Test only the newest captures are kept while the counters keep counting."""
+
+        async def run():
+            context, spy = FakeContext(), create_spy(max_captured=2)
+            await spy.spy(context)
+            for index in range(3):
+                spy.expect_response(str(index))
+                await context.navigate(FakeRoute(FakePage(str(index)), {"i": index}))
+                spy.forget(str(index))
+            spy.expect_response("failed")
+            await context.navigate(FakeRoute(FakePage("failed"), None))
+            return spy
+
+        spy = asyncio.run(run())
+        assert len(spy.requests) == 2
+        assert [response.json_payload for response in spy.responses] == [
+            {"i": 1},
+            {"i": 2},
+        ]
+        assert spy.requests_routed == 4
+        assert spy.responses_captured == 3
+        assert spy.responses_failed == 1
+
+    def test_body_decoded_on_first_access(self):
+        """Test a captured body stays raw bytes until its json is read."""
+
+        async def run():
+            context, spy = FakeContext(), create_spy()
+            await spy.spy(context)
+            waiter = spy.expect_response("a")
+            await context.navigate(FakeRoute(FakePage("a"), {"search": "a"}))
+            return await waiter
+
+        response = asyncio.run(run())
+        assert response.body == b'{"search": "a"}'
+        assert "json_payload" not in response.__dict__
+        assert response.json_payload == {"search": "a"}
+        assert "json_payload" in response.__dict__
+
+    def test_forget_cancels_the_waiter(self):
+        """Test a search giving up cancels its waiter and ignores a late response."""
+
+        async def run():
+            context, spy = FakeContext(), create_spy()
+            await spy.spy(context)
+            waiter = spy.expect_response("a")
+            spy.forget("a")
+            await context.navigate(FakeRoute(FakePage("a"), {"search": "a"}))
+            return waiter, spy
+
+        waiter, spy = asyncio.run(run())
+        assert waiter.cancelled()
+        assert spy.responses_captured == 0
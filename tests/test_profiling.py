@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from conftest import fixture_slices, parse_slices
+
+from scraperninja.profiling import profile_phase, profiled_run
+
+
+def parse_fixture(repeat: int):
+    slices = fixture_slices()
+    for _ in range(repeat):
+        with profile_phase("parse"):
+            parse_slices(slices)
+
+
+class TestProfiling:
+    def test_profile_phase_without_profiling(self):
+        """Test phases are a no-op outside of a profiled run."""
+        parse_fixture(repeat=1)
+
+    def test_profiled_run_outputs(self, tmp_path: Path):
+        """Test a profiled run writes folded stacks and a per-phase report."""
+        folded_path = tmp_path / "profile.folded"
+        report_path = tmp_path / "allocations.txt"
+        with profiled_run(str(folded_path), str(report_path)):
+            parse_fixture(repeat=200)
+
+        folded_lines = folded_path.read_text().splitlines()
+        assert folded_lines
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded_lines)
+        assert any(line.startswith("[parse];") for line in folded_lines)
+
+        report = report_path.read_text()
+        assert "## parse: 200 calls" in report
+        assert "KiB retained" in report
+        assert "## still allocated at the end of the run" in report
@@ -1,6 +1,8 @@
+from datetime import datetime, timedelta
+
 import pytest
 
-from scraperninja.scraper.proxy_manager import ProxyManager
+from scraperninja.scraper.proxy_manager import NoProxyAvailableError, ProxyManager
 
 
 class TestProxyManager:
@@ -27,3 +29,38 @@ class TestProxyManager:
             proxies_returned.append(proxy)
             proxy_manager.block_proxy_for_duration(proxy)
         assert set(proxies_returned) == set(proxy_manager.all_available_proxy_urls)
+
+    def test_is_blocked(self, proxy_manager: ProxyManager):
+        """Test a proxy is blocked until its block duration is over."""
+        proxy_manager.block_proxy_for_duration("1")
+        proxy_manager.block_proxy_for_duration("2", seconds=0)
+        assert proxy_manager.is_blocked("1")
+        assert not proxy_manager.is_blocked("2")
+        assert not proxy_manager.is_blocked(None)
+
+    def test_block_expires_on_clock(self):
+        """Test blocks follow the injected clock, e.g. a simulation's virtual time."""
+        now = datetime(2025, 12, 1)
+        proxy_manager = ProxyManager(["1"], clock=lambda: now)
+        proxy_manager.block_proxy_for_duration(None, seconds=60)
+        assert proxy_manager.get_proxy() == "1"
+        now += timedelta(seconds=60)
+        assert proxy_manager.get_proxy() is None
+
+    def test_get_proxy_exclude(self, proxy_manager: ProxyManager):
+        """Test excluded proxies are skipped, e.g. when picking a hedge proxy."""
+        assert proxy_manager.get_proxy(exclude=[None]) == "1"
+        assert proxy_manager.get_proxy(exclude=[None, "1"]) == "2"
+
+    def test_get_proxy_exclude_without_alternative(self, proxy_manager: ProxyManager):
+        """Test excluding every healthy proxy raises instead of returning None."""
+        for proxy in ["1", "2", "3"]:
+            proxy_manager.block_proxy_for_duration(proxy)
+        with pytest.raises(NoProxyAvailableError, match="No unblocked proxy"):
+            proxy_manager.get_proxy(exclude=[None])
+        assert proxy_manager.get_proxy() is None
+
+    def test_get_proxy_exclude_without_proxies(self):
+        """Test excluding the direct connection with no proxy configured raises."""
+        with pytest.raises(NoProxyAvailableError, match="No proxy configured"):
+            ProxyManager([]).get_proxy(exclude=[None])
@@ -0,0 +1,69 @@
+import asyncio
+
+from conftest import FakeFlightApiFactory
+
+from scraperninja.scraper.flight_search import ProxySessionCache
+from scraperninja.scraper.proxy_manager import ProxyManager
+
+
+class TestProxySessionCache:
+    def test_reuses_session_of_proxy(self):
+        """Test a second lookup of a proxy returns its launched session."""
+        factory = FakeFlightApiFactory()
+        cache = ProxySessionCache(factory, ProxyManager(["1"]))
+
+        async def run():
+            return await cache.get("1"), await cache.get("1")
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert first.entered
+        assert len(factory.flight_apis) == 1
+        assert cache.sessions_launched == 1
+        assert cache.sessions_reused == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used session is closed past max_sessions."""
+        factory = FakeFlightApiFactory()
+        cache = ProxySessionCache(factory, ProxyManager(["1", "2"]), max_sessions=2)
+
+        async def run():
+            await cache.get(None)
+            await cache.get("1")
+            await cache.get(None)
+            await cache.get("2")
+
+        asyncio.run(run())
+        direct, first, second = factory.flight_apis
+        assert first.exited
+        assert not direct.exited and not second.exited
+        assert list(cache.sessions) == [None, "2"]
+
+    def test_closes_session_of_blocked_proxy(self):
+        """Test the session of a proxy blocked since its launch is closed."""
+        proxy_manager = ProxyManager(["1"])
+        factory = FakeFlightApiFactory()
+        cache = ProxySessionCache(factory, proxy_manager)
+
+        async def run():
+            await cache.get(None)
+            proxy_manager.block_proxy_for_duration(None)
+            await cache.get("1")
+
+        asyncio.run(run())
+        assert factory.flight_apis[0].exited
+        assert list(cache.sessions) == ["1"]
+
+    def test_exit_closes_every_session(self):
+        """Test leaving the cache closes the sessions still open."""
+        factory = FakeFlightApiFactory()
+
+        async def run():
+            async with ProxySessionCache(factory, ProxyManager(["1"])) as cache:
+                await cache.get(None)
+                await cache.get("1")
+            return cache
+
+        cache = asyncio.run(run())
+        assert all(session.exited for session in factory.flight_apis)
+        assert not cache.sessions
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from conftest import FakeFlightApiFactory
+
+from scraperninja.scraper.deadline import DeadlineExceededError
+from scraperninja.scraper.flight_search import (
+    BrowserMemoryBudget,
+    RecyclingFlightSearchResponseApi,
+)
+from scraperninja.scraper.proxy_manager import ProxyManager
+
+
+async def search(flight_api: RecyclingFlightSearchResponseApi, count: int = 1):
+    return await asyncio.gather(
+        *(flight_api.search_flight_details(f"url-{i}", False) for i in range(count)),
+        return_exceptions=True,
+    )
+
+
+class TestRecyclingFlightSearchResponseApi:
+    def test_failed_search_moves_to_next_proxy(self):
+        """Test a failed search blocks its proxy and relaunches on the next one."""
+        proxy_manager = ProxyManager(["1", "2"])
+        factory = FakeFlightApiFactory(errors=[ValueError("blocked")])
+
+        async def run():
+            async with RecyclingFlightSearchResponseApi(
+                factory, proxy_manager=proxy_manager
+            ) as flight_api:
+                failed = await search(flight_api)
+                await search(flight_api)
+                return flight_api, failed
+
+        flight_api, failed = asyncio.run(run())
+        assert isinstance(failed[0], ValueError)
+        assert proxy_manager.is_blocked(None)
+        assert [browser.proxy_url for browser in factory.flight_apis] == [None, "1"]
+        assert factory.flight_apis[0].exited
+        assert flight_api.recycles == 1
+
+    def test_deadline_does_not_block_proxy(self):
+        """Test running out of budget keeps the proxy and its browser."""
+        proxy_manager = ProxyManager(["1"])
+        factory = FakeFlightApiFactory(errors=[DeadlineExceededError("budget")])
+
+        async def run():
+            async with RecyclingFlightSearchResponseApi(
+                factory, proxy_manager=proxy_manager
+            ) as flight_api:
+                await search(flight_api, count=2)
+
+        asyncio.run(run())
+        assert not proxy_manager.is_blocked(None)
+        assert len(factory.flight_apis) == 1
+
+    def test_stays_when_every_proxy_blocked(self):
+        """Test no relaunch loop once there is no other proxy to move to."""
+        proxy_manager = ProxyManager([])
+        factory = FakeFlightApiFactory(errors=[ValueError("blocked")])
+
+        async def run():
+            async with RecyclingFlightSearchResponseApi(
+                factory, proxy_manager=proxy_manager
+            ) as flight_api:
+                await search(flight_api)
+                await search(flight_api, count=3)
+                return flight_api
+
+        flight_api = asyncio.run(run())
+        assert proxy_manager.is_blocked(None)
+        assert len(factory.flight_apis) == 1
+        assert flight_api.recycles == 0
+
+    def test_without_proxy_manager_runs_direct(self):
+        """Test the browser is launched without a proxy when none is managed."""
+        factory = FakeFlightApiFactory(errors=[ValueError("blocked")])
+
+        async def run():
+            async with RecyclingFlightSearchResponseApi(factory) as flight_api:
+                await search(flight_api, count=2)
+
+        asyncio.run(run())
+        assert [browser.proxy_url for browser in factory.flight_apis] == [None]
+
+    def test_recycles_over_memory_after_drain(self):
+        """Test a browser over its memory cap is replaced once its searches end."""
+        factory = FakeFlightApiFactory()
+        browser_rss = {"bytes": 0}
+
+        async def run():
+            factory.release = asyncio.Event()
+            async with RecyclingFlightSearchResponseApi(
+                factory, max_rss_bytes=100, rss_probe=lambda pids: browser_rss["bytes"]
+            ) as flight_api:
+                in_flight = [
+                    asyncio.ensure_future(flight_api.search_flight_details(url, False))
+                    for url in ["url-0", "url-1"]
+                ]
+                await asyncio.sleep(0)
+                browser_rss["bytes"] = 100
+                waiting = asyncio.ensure_future(
+                    flight_api.search_flight_details("url-2", False)
+                )
+                await asyncio.sleep(0.01)
+                # The old browser drains its searches before being replaced
+                assert len(factory.flight_apis) == 1
+                assert not factory.flight_apis[0].exited
+                browser_rss["bytes"] = 0
+                factory.release.set()
+                await asyncio.gather(*in_flight, waiting)
+                return flight_api
+
+        flight_api = asyncio.run(run())
+        retired, current = factory.flight_apis
+        assert retired.exited
+        assert flight_api.recycles == 1
+        assert flight_api.searches_served == 1
+        # The captured searches are not carried over to the new browser
+        assert set(retired.cache) == {"url-0", "url-1"}
+        assert set(current.cache) == {"url-2"}
+
+    def test_memory_checked_under_launch_lock(self):
+        """Test engines sharing a budget check the memory one launch at a time."""
+        locked_at_probe = []
+
+        def memory_probe() -> int:
+            locked_at_probe.append(budget.launch_lock.locked())
+            return 0
+
+        budget = BrowserMemoryBudget(100, memory_probe=memory_probe)
+
+        async def run():
+            flight_apis = [
+                RecyclingFlightSearchResponseApi(
+                    FakeFlightApiFactory(), memory_budget=budget
+                )
+                for _ in range(2)
+            ]
+            await asyncio.gather(*(search(flight_api) for flight_api in flight_apis))
+
+        asyncio.run(run())
+        assert locked_at_probe == [True, True]
+
+
+class TestBrowserMemoryBudget:
+    def test_waits_until_below_cap(self):
+        """Test a launch waits while the probed memory is over the cap."""
+        probes = iter([200, 150, 50])
+        budget = BrowserMemoryBudget(
+            100, poll_interval_seconds=0, memory_probe=lambda: next(probes)
+        )
+        asyncio.run(budget.wait_for_headroom())
+        assert next(probes, None) is None
+
+    def test_gives_up_after_max_wait(self):
+        """Test the launch fails once memory stays over the cap too long."""
+        budget = BrowserMemoryBudget(
+            100, poll_interval_seconds=0, max_wait_seconds=0, memory_probe=lambda: 200
+        )
+        with pytest.raises(MemoryError):
+            asyncio.run(budget.wait_for_headroom())
+
+    def test_no_cap_skips_probe(self):
+        """Test no cap never measures the memory."""
+        budget = BrowserMemoryBudget(memory_probe=lambda: 1 / 0)
+        asyncio.run(budget.wait_for_headroom())
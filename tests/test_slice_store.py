@@ -0,0 +1,91 @@
+import copy
+import json
+import os
+from pathlib import Path
+
+import pytest
+from conftest import fixture_slices
+
+from scraperninja.scraper.slice_store import SliceStore
+
+
+class TestSliceStore:
+    @pytest.fixture
+    def slice_dict(self) -> dict:
+        """First slice of the recorded itinerary payload fixture."""
+        return fixture_slices()[0]
+
+    def test_unchanged_slice_parsed_once(self, slice_dict: dict):
+        """Test a repeated slice is served from the store."""
+        store = SliceStore()
+        first = store.parse(slice_dict)
+        # solutionID changes on every search without changing the price
+        repeated = copy.deepcopy(slice_dict)
+        repeated["pricingDetail"][0]["solutionID"] = "another-search"
+
+        assert store.parse(repeated) is first
+        assert (store.misses, store.hits) == (1, 1)
+
+    def test_changed_price_parsed_again(self, slice_dict: dict):
+        """Test a price change on the same slice hash is a new entry."""
+        store = SliceStore()
+        first = store.parse(slice_dict)
+        repriced = copy.deepcopy(slice_dict)
+        repriced["pricingDetail"][0]["perPassengerAwardPoints"] += 5_000
+
+        assert store.parse(repriced) is not first
+        assert len(store) == 2
+
+    def test_archive_once_per_slice(self, slice_dict: dict, tmp_path: Path):
+        """Test every distinct slice payload is archived exactly once."""
+        store = SliceStore(archive_dir=str(tmp_path))
+        store.parse(slice_dict)
+        store.parse(copy.deepcopy(slice_dict))
+
+        archived = list(tmp_path.rglob("*.json"))
+        assert len(archived) == 1
+        assert json.loads(archived[0].read_text()) == slice_dict
+
+    def test_bounded(self, slice_dict: dict):
+        """Test the least recently used slices are dropped past max_slices."""
+        store = SliceStore(max_slices=2)
+        for index in range(3):
+            other_slice = copy.deepcopy(slice_dict)
+            other_slice["hash"] = f"slice-{index}"
+            store.parse(other_slice)
+
+        assert len(store) == 2
+
+    def test_index_archive(self, slice_dict: dict, tmp_path: Path):
+        """Test a new store indexes what a previous run archived without parsing it."""
+        SliceStore(archive_dir=str(tmp_path)).parse(slice_dict)
+        (tmp_path / "ab").mkdir(exist_ok=True)
+        (tmp_path / "ab" / "truncated.json").write_text('{"hash": ')
+
+        store = SliceStore(archive_dir=str(tmp_path))
+        assert store.index_archive() == 2
+        assert len(store) == 0
+        store.parse(copy.deepcopy(slice_dict))
+        assert (store.misses, store.hits) == (1, 0)
+        # Parsing an already archived slice does not archive it again
+        assert len(list(tmp_path.rglob("*.json"))) == 2
+
+    def test_archive_bounded(self, slice_dict: dict, tmp_path: Path):
+        """Test the oldest archived slices are pruned past max_archived_slices."""
+        store = SliceStore(archive_dir=str(tmp_path), max_archived_slices=2)
+        for index in range(3):
+            other_slice = copy.deepcopy(slice_dict)
+            other_slice["hash"] = f"slice-{index}"
+            store.parse(other_slice)
+        archived = {
+            json.loads(archive_path.read_text())["hash"]: archive_path
+            for archive_path in tmp_path.rglob("*.json")
+        }
+        assert set(archived) == {"slice-1", "slice-2"}
+
+        os.utime(archived["slice-1"], (0, 0))
+        store = SliceStore(archive_dir=str(tmp_path), max_archived_slices=1)
+        assert store.index_archive() == 1
+        assert [path.name for path in tmp_path.rglob("*.json")] == [
+            archived["slice-2"].name
+        ]